@@ -1,26 +1,50 @@
 import tkinter as tk
-from tkinter import filedialog, ttk
+from tkinter import filedialog, messagebox, ttk
+import argparse
 import os
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
-# Matplotlib 버전에 따라 적절한 import 사용
-try:
-    # 최신 버전 Matplotlib (>=3.6)
-    from matplotlib import colormaps
-    def get_cmap(name):
-        return colormaps[name]
-except ImportError:
+import sqlite3
+import threading
+from linedose import CurveCache, CurveStore, extract_csv_data, extract_txt_data, find_x_for_y
+from linedose import profiling
+from linedose.batch import collect_files
+from linedose.loader import BackgroundLoader
+from linedose.results import ResultsDB
+from linedose.table import TABLE_COLUMNS, ComparisonTable, VirtualTable, match_plans
+from linedose.watch import FolderWatcher
+from linedose.render import Crosshair, CurveRenderer, OverlayBlitter, format_readout
+
+
+def import_plot_modules():
+    """
+    그래프에 필요한 matplotlib 모듈 불러오기 (창을 먼저 띄운 뒤 작업 스레드에서 호출)
+    
+    pyplot 없이 Figure 와 TkAgg 캔버스만 사용한다.
+    
+    Returns:
+    tuple: (Figure 클래스, FigureCanvasTkAgg 클래스, 'tab10' colormap)
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    # Matplotlib 버전에 따라 적절한 import 사용
     try:
-        # 중간 버전 Matplotlib
-        from matplotlib.pyplot import get_cmap
+        # 최신 버전 Matplotlib (>=3.6)
+        from matplotlib import colormaps
+        colormap = colormaps['tab10']
     except ImportError:
-        # 구 버전 Matplotlib
-        from matplotlib.cm import get_cmap
+        try:
+            # 중간 버전 Matplotlib
+            from matplotlib.pyplot import get_cmap
+        except ImportError:
+            # 구 버전 Matplotlib
+            from matplotlib.cm import get_cmap
+        colormap = get_cmap('tab10')
+    return Figure, FigureCanvasTkAgg, colormap
 
 class DepthDoseGUI:
-    def __init__(self, root):
+    def __init__(self, root, profile_path=None):
         self.root = root
+        # 계측 결과 저장 경로 (--profile, 종료할 때 저장)
+        self.profile_path = profile_path
         self.root.title("Line-dose (range & SOBP)")
         self.root.geometry("900x600")
         
@@ -28,9 +52,31 @@ class DepthDoseGUI:
         self.current_directory = os.path.dirname(os.path.abspath(__file__))
         
         # 데이터 저장 변수
-        self.depth_data = {}  # 키: 파일명, 값: depth 배열
-        self.dose_data = {}   # 키: 파일명, 값: dose 배열
-        self.file_types = {}  # 키: 파일명, 값: 'plan' 또는 'measurement'
+        # 곡선 저장소 - 키: 파일 전체 경로, 값: depth/dose view, 종류/출처, 지표
+        self.curves = CurveStore()
+        
+        # 파싱된 곡선 디스크 캐시 (같은 파일을 다시 열 때 파싱 생략)
+        try:
+            self.cache = CurveCache()
+        except OSError as e:
+            print(f"캐시를 사용할 수 없습니다: {e}")
+            self.cache = None
+        
+        # 분석 결과 데이터베이스 (불러온 파일의 지표를 숫자로 보관 - 추세 조회용)
+        try:
+            self.results = ResultsDB()
+        except (OSError, sqlite3.Error) as e:
+            print(f"결과 데이터베이스를 사용할 수 없습니다: {e}")
+            self.results = None
+        
+        # 백그라운드 로더 (파싱/지표 계산은 작업 스레드에서 실행)
+        # 결과 데이터베이스에 넣을 내용 해시/메타데이터도 작업자에서 구한다 (GUI 스레드에서 파일을 다시 읽지 않음)
+        self.loader = BackgroundLoader(cache=self.cache, describe=self.results is not None)
+        # 감시 폴더 (새로 들어온 파일만 분석)
+        self.watcher = None
+        # 보고서 저장용 오프스크린 Figure (처음 저장할 때 만든다)
+        self.report_renderer = None
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # 메인 프레임 생성
         self.main_frame = tk.Frame(root)
@@ -57,15 +103,50 @@ class DepthDoseGUI:
         self.open_button.bind("<Enter>", lambda e: on_enter(e, self.open_button))
         self.open_button.bind("<Leave>", lambda e: on_leave(e, self.open_button))
         
-        # Save Screen 버튼 (외곽선 제거)
-        self.save_screen_button = tk.Button(self.button_frame, text="Save\nscreen", 
-                                        command=self.save_full_screen, width=8, height=2,
+        # Save Report 버튼 (외곽선 제거)
+        self.save_report_button = tk.Button(self.button_frame, text="Save\nreport", 
+                                        command=self.save_report, width=8, height=2,
                                         relief=tk.RIDGE, bd=2)
-        self.save_screen_button.pack(side=tk.LEFT, padx=10, pady=5)
+        self.save_report_button.pack(side=tk.LEFT, padx=10, pady=5)
         
         # 마우스 오버 이벤트 연결
-        self.save_screen_button.bind("<Enter>", lambda e: on_enter(e, self.save_screen_button))
-        self.save_screen_button.bind("<Leave>", lambda e: on_leave(e, self.save_screen_button))
+        self.save_report_button.bind("<Enter>", lambda e: on_enter(e, self.save_report_button))
+        self.save_report_button.bind("<Leave>", lambda e: on_leave(e, self.save_report_button))
+        
+        # 세션 저장/불러오기 버튼 (곡선과 지표 전체를 파일 하나로)
+        self.save_session_button = tk.Button(self.button_frame, text="Save\nsession", 
+                                             command=self.save_session, width=8, height=2,
+                                             relief=tk.RIDGE, bd=2)
+        self.save_session_button.pack(side=tk.LEFT, padx=10, pady=5)
+        self.save_session_button.bind("<Enter>", lambda e: on_enter(e, self.save_session_button))
+        self.save_session_button.bind("<Leave>", lambda e: on_leave(e, self.save_session_button))
+        
+        self.load_session_button = tk.Button(self.button_frame, text="Load\nsession", 
+                                             command=self.load_session, width=8, height=2,
+                                             relief=tk.RIDGE, bd=2)
+        self.load_session_button.pack(side=tk.LEFT, padx=10, pady=5)
+        self.load_session_button.bind("<Enter>", lambda e: on_enter(e, self.load_session_button))
+        self.load_session_button.bind("<Leave>", lambda e: on_leave(e, self.load_session_button))
+        
+        # 감시 폴더 시작/중지 버튼
+        self.watch_button = tk.Button(self.button_frame, text="Watch\nfolder", 
+                                      command=self.toggle_watch, width=8, height=2,
+                                      relief=tk.RIDGE, bd=2)
+        self.watch_button.pack(side=tk.LEFT, padx=10, pady=5)
+        self.watch_button.bind("<Enter>", lambda e: on_enter(e, self.watch_button))
+        self.watch_button.bind("<Leave>", lambda e: on_leave(e, self.watch_button))
+        
+        # Cancel 버튼 (로딩 중에만 활성화)
+        self.cancel_button = tk.Button(self.button_frame, text="Cancel", 
+                                       command=self.cancel_loading, width=8, height=2,
+                                       relief=tk.RIDGE, bd=2, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, padx=10, pady=5)
+        
+        # 로딩 진행 상태 표시
+        self.status_label = tk.Label(self.button_frame, text="", anchor=tk.E)
+        self.status_label.pack(side=tk.RIGHT, padx=10)
+        self.progress_bar = ttk.Progressbar(self.button_frame, mode='determinate', length=200)
+        self.progress_bar.pack(side=tk.RIGHT, padx=10)
         
         # 콘텐츠 프레임
         self.content_frame = tk.Frame(self.main_frame)
@@ -75,10 +156,14 @@ class DepthDoseGUI:
         self.graph_frame = tk.LabelFrame(self.content_frame, text="Depth-dose curves")
         self.graph_frame.place(relx=0, rely=0, relwidth=0.7, relheight=1.0)
                 
-        # 그래프 초기화
-        self.figure, self.ax = plt.subplots(figsize=(5, 4))
-        self.canvas = FigureCanvasTkAgg(self.figure, self.graph_frame)
-        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        # 그래프는 matplotlib 을 불러온 뒤 만든다 (창은 먼저 표시)
+        self.figure = self.ax = self.canvas = None
+        self.renderer = self.overlays = self.crosshair = None
+        self.plot_placeholder = tk.Label(self.graph_frame, text="Loading plot...")
+        self.plot_placeholder.pack(expand=True)
+        self.plot_modules = None
+        threading.Thread(target=self.load_plot_modules, daemon=True).start()
+        self.root.after(50, self.poll_plot_modules)
         
         # 파일 정보 프레임 (오른쪽, 비율 30%)
         self.info_frame = tk.LabelFrame(self.content_frame, text="Range & SOBP")
@@ -110,15 +195,13 @@ class DepthDoseGUI:
         scrollbar_x = ttk.Scrollbar(self.info_frame_inner, orient="horizontal")
         scrollbar_x.pack(side=tk.BOTTOM, fill=tk.X)
         
-        # 파일 정보 표시 트리뷰 - 열 너비 자동 조정
+        # 파일 정보 표시 트리뷰 - 파일당 한 행, 세로 스크롤은 VirtualTable 이 처리
         self.info_tree = ttk.Treeview(self.info_frame_inner, 
-                                     columns=("param", "plan", "measured"), 
+                                     columns=TABLE_COLUMNS, 
                                      show="headings",
-                                     yscrollcommand=scrollbar_y.set,
                                      xscrollcommand=scrollbar_x.set)
         
-        # 스크롤바 연결
-        scrollbar_y.config(command=self.info_tree.yview)
+        # 가로 스크롤바 연결
         scrollbar_x.config(command=self.info_tree.xview)
         
         # 클립보드 복사 기능 추가
@@ -126,372 +209,352 @@ class DepthDoseGUI:
         # 마우스 우클릭 메뉴 추가
         self.info_tree.bind('<Button-3>', self.show_context_menu)
         
-        # 컬럼 설정
-        self.info_tree.heading("param", text="Values")
-        self.info_tree.heading("plan", text="Plan")
-        self.info_tree.heading("measured", text="Measured")
-        
-        # 컬럼 너비 설정
-        self.info_tree.column("param", width=100, minwidth=80)
-        self.info_tree.column("plan", width=70, minwidth=50)
-        self.info_tree.column("measured", width=70, minwidth=50)
-        
         # 그리드 활성화 (행/열 구분선 표시)
         self.info_tree.tag_configure('evenrow', background='#f0f0f0')
         self.info_tree.tag_configure('oddrow', background='#ffffff')
         
         self.info_tree.pack(fill=tk.BOTH, expand=True)
         
-        # 초기 샘플 데이터 추가
-        self.info_tree.insert("", tk.END, values=("", "", ""), tags=('evenrow',))
-        self.info_tree.insert("", tk.END, values=("D90", "", ""), tags=('oddrow',))
-        self.info_tree.insert("", tk.END, values=("D95", "", ""), tags=('evenrow',))
-        self.info_tree.insert("", tk.END, values=("SOBP", "", ""), tags=('oddrow',))
-        self.info_tree.insert("", tk.END, values=("D20", "", ""), tags=('evenrow',))
-        self.info_tree.insert("", tk.END, values=("D10", "", ""), tags=('oddrow',))
+        # 표 모델 (바뀐 행만 다시 계산) 과 화면에 보이는 행만 그리는 뷰 (컬럼 머리글/너비 설정 포함)
+        self.table = ComparisonTable()
+        self.table_view = VirtualTable(self.info_tree, scrollbar_y, self.table, row_height=25)
     
     
-    def save_full_screen(self):
-        """전체 화면 저장 기능"""
-        if not self.selected_files:
-            tk.messagebox.showinfo("알림", "저장할 화면이 없습니다. 먼저 파일을 열어주세요.")
+    def load_plot_modules(self):
+        """matplotlib 불러오기 (작업 스레드 - Tk 는 건드리지 않음)"""
+        try:
+            self.plot_modules = import_plot_modules()
+        except Exception as e:
+            self.plot_modules = e
+    
+    def poll_plot_modules(self):
+        """matplotlib 을 다 불러왔으면 그래프 초기화 (root.after 로 주기적으로 호출)"""
+        if self.plot_modules is None:
+            self.root.after(50, self.poll_plot_modules)
+        elif isinstance(self.plot_modules, Exception):
+            print(f"그래프를 초기화할 수 없습니다: {self.plot_modules}")
+            self.plot_placeholder.config(text=f"Plot unavailable: {self.plot_modules}")
+        else:
+            self.init_plot(*self.plot_modules)
+    
+    def init_plot(self, Figure, FigureCanvasTkAgg, colormap):
+        """그래프 초기화 - 그 사이에 불러온 곡선도 그린다"""
+        self.plot_placeholder.destroy()
+        self.figure = Figure(figsize=(5, 4))
+        self.ax = self.figure.add_subplot()
+        self.canvas = FigureCanvasTkAgg(self.figure, self.graph_frame)
+        # 실제 그리기 (draw_idle 이후 Tk 유휴 시간에 실행) 시간 계측
+        self.canvas.draw = profiling.profiled('plot.draw')(self.canvas.draw)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        # 축 설정은 한 번만 하고, 곡선은 파일별 artist 로 렌더러가 관리
+        self.ax.set_xlabel('depth (mm)')
+        self.ax.set_ylabel('dose (%)')
+        self.ax.grid(True)
+        # x축 범위를 0-300mm로 제한
+        self.ax.set_xlim(0, 300)
+        self.renderer = CurveRenderer(self.ax, colormap)
+        self.overlays = OverlayBlitter(self.canvas)
+        # 마우스 위치의 곡선별 선량/distal 깊이 - 글자는 캔버스 대신 그래프 위 Label 에 표시
+        self.crosshair = Crosshair(self.ax, self.overlays, callback=self.show_readout)
+        self.readout_label = tk.Label(self.graph_frame, font=('Courier', 8), justify=tk.LEFT,
+                                      anchor='nw', bg='white', relief=tk.SOLID, bd=1)
+        self.plot_depth_dose_curves()
+    
+    def save_report(self):
+        """그래프와 Range & SOBP 표를 보고서 (PNG/PDF) 로 저장 - 화면 캡처 없이 오프스크린으로 그림"""
+        if not len(self.curves):
+            tk.messagebox.showinfo("알림", "저장할 곡선이 없습니다. 먼저 파일을 열어주세요.")
             return
         
         file_path = filedialog.asksaveasfilename(
             initialdir=self.current_directory,
-            title="전체 화면 저장",
-            filetypes=(("PNG 파일", "*.png"), ("모든 파일", "*.*")),
+            title="보고서 저장",
+            filetypes=(("PNG 파일", "*.png"), ("PDF 파일", "*.pdf"), ("모든 파일", "*.*")),
             defaultextension=".png"
         )
         
         if file_path:
             try:
-                # 1. PIL 라이브러리 사용 방식
-                from PIL import ImageGrab
-                
-                # 현재 창의 위치와 크기 가져오기
-                x = self.root.winfo_rootx()
-                y = self.root.winfo_rooty()
-                width = self.root.winfo_width()
-                height = self.root.winfo_height()
+                from linedose.report import ReportRenderer, table_values
                 
-                # 화면 캡처
-                screenshot = ImageGrab.grab(bbox=(x, y, x+width, y+height))
-                screenshot.save(file_path)
+                # Figure 는 처음 한 번만 만들고 다시 사용
+                if self.report_renderer is None:
+                    self.report_renderer = ReportRenderer()
+                pairs = self.report_pairs()
+                stem, ext = os.path.splitext(file_path)
+                saved = []
+                errors = []
+                for pair in pairs:
+                    # 짝이 여럿이면 선택한 이름 뒤에 짝 이름을 붙여 하나씩 저장
+                    names = [self.curves.display_name(key) for key in pair if key is not None]
+                    output_path = file_path
+                    if len(pairs) > 1:
+                        output_path = f"{stem}_{os.path.splitext(names[-1])[0]}{ext}"
+                        if output_path in saved:
+                            output_path = f"{stem}_{os.path.splitext(names[-1])[0]}_{len(saved)}{ext}"
+                    
+                    # 표의 한 행과 같은 계획/측정 곡선으로 표 값 계산
+                    curves = []
+                    columns = []
+                    for key in pair:
+                        if key is None:
+                            columns.append(None)
+                            continue
+                        depth, dose = self.curves.curve(key)
+                        name = self.curves.display_name(key)
+                        curves.append((name, depth, dose, self.curves.meta(key).kind))
+                        columns.append((name, depth, dose, self.curves.metrics(key)))
+                    plan_values, measured_values = table_values(*columns)
+                    errors.extend(values['error'] for values in (plan_values, measured_values)
+                                  if values.get('error'))
+                    self.report_renderer.render([output_path], curves, plan_values,
+                                                measured_values, ' / '.join(names))
+                    saved.append(output_path)
                 
                 # 성공 메시지
-                tk.messagebox.showinfo("성공", f"전체 화면이 저장되었습니다.\n{file_path}")
+                listed = '\n'.join(saved[:10]) + (f"\n... 외 {len(saved) - 10}개" if len(saved) > 10 else '')
+                if errors:
+                    listed += "\n\n계산하지 못한 값 (빈 칸으로 저장):\n" + '\n'.join(errors[:10])
+                tk.messagebox.showinfo("성공", f"보고서 {len(saved)}개가 저장되었습니다.\n{listed}")
             except Exception as e:
-                tk.messagebox.showerror("오류", f"화면 저장 중 오류가 발생했습니다.\n{e}") 
+                tk.messagebox.showerror("오류", f"보고서 저장 중 오류가 발생했습니다.\n{e}") 
             
+    def report_pairs(self):
+        """
+        보고서로 저장할 (계획 키, 측정 키) 목록 - 표에서 선택한 행, 선택이 없으면 모든 행
+
+        측정 행은 표와 같이 짝지은 계획과 함께 (match_plans), 계획 행은 그 계획과 짝지은
+        측정마다 하나씩 (짝이 없으면 계획만) 보고서를 만든다. 없는 쪽은 None.
+        """
+        keys = self.table_view.selected_keys() or list(self.table.keys)
+        plans = match_plans(self.curves)
+        pairs = []
+        for key in keys:
+            if key not in self.curves:
+                continue
+            if self.curves.meta(key).kind == 'plan':
+                matched = [(key, measured) for measured, plan in plans.items() if plan == key]
+                pairs.extend(matched or [(key, None)])
+            else:
+                pairs.append((plans.get(key), key))
+        # 계획과 그 측정을 함께 선택한 경우 같은 짝은 한 번만
+        return list(dict.fromkeys(pairs))
+    
     def open_files(self):
         """파일 열기 다이얼로그를 실행하고 선택된 파일들을 처리"""
         file_paths = filedialog.askopenfilenames(
             initialdir = self.current_directory,
             title="파일 선택",
-            filetypes=(("Data files", "*.txt;*.csv"), ("All files", "*.*"))
+            filetypes=(("Data files", "*.txt;*.csv;*.zip;*.tar;*.tar.gz;*.tgz"),
+                       ("All files", "*.*"))
         )
         
         if file_paths:
-            self.selected_files = list(file_paths)
-            self.extract_data()
-            print("extract OK")
-            self.plot_depth_dose_curves()
-            print("draw dd curve")
-            self.update_file_info()
-            
-    def extract_data(self):
-        """파일에서 데이터를 추출하여 depth와 dose 변수에 저장"""
-        # 데이터 저장소 초기화
-        self.depth_data = {}
-        self.dose_data = {}
-        self.file_types = {}
-        
-        for file_path in self.selected_files:
-            file_name = os.path.basename(file_path)
-            ext = os.path.splitext(file_path)[1].lower()
-            
+            # zip/tar 파일은 풀지 않고 안의 TXT/CSV 파일 키로 바꾼다
             try:
-                # 확장자에 따라 다른 데이터 추출 함수 사용
-                if ext == '.csv':
-                    depth, dose = self.extract_csv_data(file_path)
-                    self.file_types[file_name] = 'measurement'
-                elif ext == '.txt':
-                    depth, dose = self.extract_txt_data(file_path)
-                    self.file_types[file_name] = 'plan'
-                else:
-                    raise ValueError(f"지원되지 않는 파일 형식: {ext}")
-                
-                # 데이터 정규화 (최대값을 100으로)
-                dose = (np.array(dose) / np.max(dose)) * 100
-                
-                tmp_d90_ind = np.where(dose >= 90 )[0]
-                tmp_d90_depth = depth[tmp_d90_ind.max()] if tmp_d90_ind.size > 0 else 0
-                
-                tmp_p95_ind = np.where(dose >= 95 )[0]
-                tmp_p95_depth = depth[tmp_p95_ind.min()] if tmp_p95_ind.size > 0 else 0
-                
-                mid_sobp_index = int((tmp_d90_ind.max() + tmp_p95_ind.min())/2)
-                
-                # 추출된 데이터 저장
-                self.depth_data[file_name] = depth
-                self.dose_data[file_name] = 100*dose/np.mean(dose[mid_sobp_index-1:mid_sobp_index+1])
-
-                
-                print(f"파일 '{file_name}' 데이터 추출 완료 ({self.file_types[file_name]})")
-                
+                self.selected_files = collect_files(file_paths)
             except Exception as e:
-                print(f"파일 '{file_name}' 데이터 추출 오류: {e}")
+                tk.messagebox.showerror("오류", f"압축 파일을 읽는 중 오류가 발생했습니다.\n{e}")
+                return
+            self.start_loading()
+            
+    def start_loading(self):
+        """선택된 파일들을 백그라운드에서 불러오기 시작 (완료되는 파일부터 화면에 반영)"""
+        self.curves.clear()
+        
+        self.plot_depth_dose_curves()
+        self.update_file_info()
+        
+        self.loader.start(self.selected_files)
+        self.progress_bar.config(maximum=len(self.selected_files), value=0)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.status_label.config(text=f"0 / {len(self.selected_files)}")
+        self.root.after(50, self.poll_loading)
     
-    def extract_csv_data(self, csv_file):
-        """CSV 파일에서 깊이와 선량 데이터 추출"""
-        depth = []
-        dose = []
-        with open(csv_file, "r", encoding="utf-8") as file:
-            lines = file.readlines()
+    def poll_loading(self):
+        """작업자에서 완료된 파일을 그래프와 테이블에 반영 (root.after 로 주기적으로 호출)"""
+        entries = self.loader.poll()
+        loaded = []
+        for entry in entries:
+            if entry.get('error'):
+                print(f"파일 '{entry.get('file', '')}' 데이터 추출 오류: {entry['error']}")
+                continue
+            self.add_loaded_entry(entry)
+            loaded.append(entry)
+        
+        if loaded:
+            self.finish_plot()
+            self.update_file_info()
+            self.store_results(loaded)
+        
+        done, total = self.loader.progress
+        self.progress_bar.config(value=done)
+        self.status_label.config(text=f"{done} / {total}")
+        
+        if self.loader.busy:
+            self.root.after(50, self.poll_loading)
+        else:
+            self.cancel_button.config(state=tk.DISABLED)
     
-        reading_depth = False
-        reading_dose = False
+    def toggle_watch(self):
+        """감시 폴더 시작/중지 - 감시 중에는 새로 생기거나 바뀐 파일만 불러와 그래프와 테이블에 추가"""
+        if self.watcher is not None:
+            self.watcher = None
+            self.watch_button.config(text="Watch\nfolder", relief=tk.RIDGE)
+            self.status_label.config(text="감시 중지")
+            return
+        
+        directory = filedialog.askdirectory(initialdir=self.current_directory,
+                                            title="감시할 폴더 선택")
+        if not directory:
+            return
+        self.current_directory = directory
+        self.watcher = FolderWatcher(directory)
+        self.watch_button.config(text="Stop\nwatch", relief=tk.SUNKEN)
+        self.status_label.config(text=f"감시 중: {os.path.basename(directory)}")
+        self.root.after(1000, self.poll_watch)
     
-        for line in lines:
-            line = line.strip()
+    def poll_watch(self):
+        """감시 폴더 확인 (root.after 로 주기적으로 호출) - 준비된 파일을 백그라운드 로더에 추가"""
+        if self.watcher is None:
+            return
+        ready = self.watcher.poll()
+        if ready:
+            polling = self.loader.busy
+            self.selected_files.extend(path for path in ready if path not in self.selected_files)
+            self.loader.add(ready)
+            done, total = self.loader.progress
+            self.progress_bar.config(maximum=total, value=done)
+            self.cancel_button.config(state=tk.NORMAL)
+            if not polling:
+                self.root.after(50, self.poll_loading)
+        self.root.after(1000, self.poll_watch)
     
-            if "Curve depth: [mm]" in line:
-                reading_depth = True
-                reading_dose = False
-                continue
+    def add_loaded_entry(self, entry):
+        """작업자 결과 하나를 데이터 저장소와 그래프에 추가"""
+        key = entry['path']
+        self.curves.add(key, entry['depth'], entry['dose'], entry['kind'],
+                        metrics=entry['metrics'])
+        self.add_depth_dose_curve(key)
+        print(f"파일 '{entry['file']}' 데이터 추출 완료 ({entry['kind']})")
     
-            if "Curve gains: [counts]" in line:
-                reading_dose = True
-                reading_depth = False
+    def store_results(self, entries):
+        """
+        불러온 파일의 지표를 결과 데이터베이스에 한 번에 저장 (같은 내용의 파일은 한 번만)
+        
+        내용 해시와 메타데이터는 작업자에서 구한 값을 쓴다 (구하지 못한 파일은 저장하지 않음).
+        """
+        if self.results is None:
+            return
+        rows = []
+        for entry in entries:
+            if 'content_hash' not in entry:
                 continue
+            row = {'path': entry['path'], 'file': entry['file'], 'kind': entry['kind'],
+                   'content_hash': entry['content_hash'], 'meta': entry['meta'],
+                   'error': entry.get('metrics_error', '')}
+            row.update(entry['metrics'])
+            rows.append(row)
+        if not rows:
+            return
+        try:
+            self.results.add(rows)
+        except (OSError, sqlite3.Error) as e:
+            print(f"결과 저장 오류: {e}")
     
-            if reading_depth and line:
-                depth.extend(map(float, line.split(";")))
-    
-            if reading_dose and line:
-                dose.extend(map(float, line.split(";")))
+    def cancel_loading(self):
+        """진행 중인 로딩 취소 (이미 불러온 곡선은 유지)"""
+        self.loader.cancel()
+        done, total = self.loader.progress
+        self.cancel_button.config(state=tk.DISABLED)
+        self.status_label.config(text=f"취소됨 ({done}개 로드)")
     
-            if reading_dose and line == "":
-                break
+    def on_close(self):
+        """창 닫기 - 작업자 정리 후 종료"""
+        self.export_profile()
+        self.watcher = None
+        self.loader.shutdown()
+        if self.results is not None:
+            self.results.close()
+        self.root.destroy()
+            
+    def export_profile(self):
+        """계측이 켜져 있으면 (--profile) 기록을 저장하고 단계별 합계 출력"""
+        profiler = profiling.get_profiler()
+        if profiler is None or not self.profile_path:
+            return
+        try:
+            profiler.export(self.profile_path)
+            print(profiler.report())
+            print(f"계측 결과 저장: {self.profile_path}")
+        except OSError as e:
+            print(f"계측 결과 저장 오류: {e}")
     
-        return depth, dose
+    def extract_csv_data(self, csv_file):
+        """CSV 파일에서 깊이와 선량 데이터 추출"""
+        return extract_csv_data(csv_file)
     
     def extract_txt_data(self, txt_file):
         """TXT 파일에서 깊이와 선량 데이터 추출"""
-        depth = []
-        dose = []
-        reading_data = False
-    
-        with open(txt_file, "r", encoding="utf-8") as file:
-            lines = file.readlines()
-    
-        for line in lines:
-            line = line.strip()
-    
-            if "Distance(cm)   Dose (cGy)" in line:
-                reading_data = True
-                continue
-    
-            if reading_data:
-                parts = line.split()
-                if len(parts) == 2:
-                    # cm to mm 변환
-                    depth.append(float(parts[0]) * 10)
-                    dose.append(float(parts[1]))
-    
-        return depth, dose
+        return extract_txt_data(txt_file)
     
+    @profiling.profiled('plot')
     def plot_depth_dose_curves(self):
-        """깊이-선량 곡선 그래프 생성"""
-        self.ax.clear()
-        
-        if not self.selected_files:
-            self.canvas.draw()
+        """깊이-선량 곡선 그래프 갱신 (바뀐 곡선만 추가/갱신/삭제)"""
+        if self.renderer is None:
+            # 그래프 초기화 전 - init_plot 에서 저장소의 곡선을 모두 그린다
             return
-        
-        # 색상 맵 설정 (다중 파일 구분을 위한 색상)
-        colormap = get_cmap('tab10')
-        colors = [colormap(i % 10) for i in range(len(self.selected_files))]
-        
-        # 파일별 그래프 플로팅
-        for i, file_name in enumerate(self.depth_data.keys()):
-            depth = self.depth_data[file_name]
-            dose = self.dose_data[file_name]
-            file_type = self.file_types[file_name]
-            
-            # 파일 유형에 따라 라인 스타일 다르게 설정
-            if file_type == 'plan':
-                linestyle = '-'
-            else:  # measurement
-                linestyle = '--'
-            
-            self.ax.plot(depth, dose, label=file_name, color=colors[i], linestyle=linestyle)
-        
-        self.ax.set_xlabel('depth (mm)')
-        self.ax.set_ylabel('dose (%)')
-        self.ax.grid(True)
-        self.ax.legend()
-        
-        # x축 범위를 0-300mm로 제한
-        self.ax.set_xlim(0, 300)
-        
-        self.canvas.draw()
+        curves = {}
+        for key in self.curves:
+            depth, dose = self.curves.curve(key)
+            curves[key] = (depth, dose, self.curve_style(key))
+        self.renderer.sync(curves)
+        self.crosshair.set_curves({key: (depth, dose, style['label'])
+                                   for key, (depth, dose, style) in curves.items()})
+        self.renderer.draw()
+    
+    def show_readout(self, depth, level, rows):
+        """크로스헤어 값 표시 (depth 가 None 이면 숨김)"""
+        if depth is None or not rows:
+            self.readout_label.place_forget()
+            return
+        fixed = self.crosshair.level is not None
+        self.readout_label.config(text=format_readout(depth, level, rows, fixed))
+        self.readout_label.place(relx=1.0, x=-20, y=20, anchor='ne')
+        
+    def curve_style(self, key):
+        """파일 유형에 따른 라인 스타일 (plan: 실선, measurement: 점선)"""
+        linestyle = '-' if self.curves.meta(key).kind == 'plan' else '--'
+        return {'label': self.curves.display_name(key), 'linestyle': linestyle}
+        
+    @profiling.profiled('plot')
+    def add_depth_dose_curve(self, key):
+        """곡선 하나를 기존 그래프에 추가 (전체 다시 그리지 않음)"""
+        if self.renderer is None:
+            return
+        depth, dose = self.curves.curve(key)
+        self.renderer.set_curve(key, depth, dose, **self.curve_style(key))
+    
+    def finish_plot(self):
+        """곡선 추가 후 범례 갱신 및 화면 갱신 예약"""
+        # 같은 이름의 파일이 추가되면 기존 곡선 이름도 바뀌므로 전체를 맞춘다 (바뀐 것만 갱신됨)
+        self.plot_depth_dose_curves()
         
     def find_x_for_y(self, x_values, y_values, target_y):
-        """
-        주어진 x와 y 데이터에서 목표 y값에 해당하는 x값을 내삽법으로 찾는 함수
-        numpy.interp만 사용하여 구현
-        
-        Parameters:
-        x_values (list/array): x 좌표값 리스트
-        y_values (list/array): y 좌표값 리스트
-        target_y (float): 찾고자 하는 y 값
-        
-        Returns:
-        float: 목표 y값에 해당하는 x값
-        """
-        # y값으로 x값을 찾아야 하므로 x와 y를 반대로 입력
-        # numpy.interp는 오름차순 데이터를 요구하므로 정렬 필요
-        
-        # 만약 target_y가 y_values의 범위를 벗어나면 예외 처리
-        if target_y < min(y_values) or target_y > max(y_values):
-            raise ValueError(f"목표값 {target_y}가 데이터 범위({min(y_values)}-{max(y_values)}) 밖에 있습니다.")
-        
-        # y 기준으로 정렬 (오름차순)
-        sorted_indices = np.argsort(y_values)
-        sorted_y = np.array(y_values)[sorted_indices]
-        sorted_x = np.array(x_values)[sorted_indices]
-        
-        # numpy.interp를 사용하여 x값 계산 (x와 y 역할 바꿈)
-        target_x = float(np.interp(target_y, sorted_y, sorted_x))
-        
-        return target_x        
+        """목표 y값에 해당하는 x값을 내삽법으로 찾기 (linedose.find_x_for_y 참조)"""
+        return find_x_for_y(x_values, y_values, target_y)
         
         
+    @profiling.profiled('table')
     def update_file_info(self):
-        """파일 정보 표시 업데이트"""
-        # 기존 항목 지우기
-        for item in self.info_tree.get_children():
-            self.info_tree.delete(item)
-        
-        # 선택된 파일들에 대한 정보 저장
-        plan_depth_values = {}
-        measured_depth_values = {}
-        
-        for file_name in self.depth_data.keys():
-            depth = self.depth_data[file_name]
-            dose = self.dose_data[file_name]
-            file_type = self.file_types[file_name]
-            
-            try:
-                # 선량 지표 계산
-                # max_dose = 100  # 이미 정규화되어 있음
-                
-                # D90 (90% 선량 깊이)
-                d90_indices = np.where(dose >= 90)[0]
-                d90_maxind = d90_indices.max()
-                    
-                if d90_indices.size > 0:                    
-                    d90_depth = self.find_x_for_y(depth[d90_maxind:d90_maxind + 3],
-                                                  dose[d90_maxind:d90_maxind + 3], 90)                 
-                else: 0
-                                
-                # D50 (50% 선량 깊이)
-                d50_indices = np.where(dose >= 50)[0]
-                if d50_indices.size > 0:                    
-                    d50_depth = self.find_x_for_y(depth[d50_indices.max():d50_indices.max()+3],
-                                                  dose[d50_indices.max():d50_indices.max()+3], 50)                 
-                else: 0
-                
-                # D20 (20% 선량 깊이)
-                d20_indices = np.where(dose >= 20)[0]
-                if d20_indices.size > 0:                    
-                    d20_depth = self.find_x_for_y(depth[d20_indices.max():d20_indices.max()+3],
-                                                  dose[d20_indices.max():d20_indices.max()+3], 20)                 
-                else: 0
-                
-                # D10 (10% 선량 깊이)
-                d10_indices = np.where(dose >= 10)[0]
-                if d10_indices.size > 0:                    
-                    d10_depth = self.find_x_for_y(depth[d10_indices.max():d10_indices.max()+3],
-                                                  dose[d10_indices.max():d10_indices.max()+3], 10)                 
-                else: 0                
-                                
-                # P95 (95% proximal 선량 깊이)
-                p95_indices = np.where(dose >= 95)[0]
-                if p95_indices.size > 0:                    
-                    p95_depth = self.find_x_for_y(depth[p95_indices.min()-2:p95_indices.min()+1],
-                                                  dose[p95_indices.min()-2:p95_indices.min()+1], 95)                 
-                else: 0
-                
-                # SOBP                                
-                sobp_width = d90_depth - p95_depth
-                
-                # 파일 유형에 따라 값 저장
-                if file_type == 'plan':
-                    plan_depth_values = {
-                        'file': file_name,
-                        'D90': f"{d90_depth:.2f} mm",
-                        'SOBP': f"{sobp_width:.2f} mm",
-                        'D50': f"{d50_depth:.2f} mm",
-                        'D20': f"{d20_depth:.2f} mm",
-                        'D10': f"{d10_depth:.2f} mm"
-                    }
-                else:  # measurement
-                    measured_depth_values = {
-                        'file': file_name,
-                        'D90': f"{d90_depth:.2f} mm",
-                        'SOBP': f"{sobp_width:.2f} mm",
-                        'D50': f"{d50_depth:.2f} mm",
-                        'D20': f"{d20_depth:.2f} mm",
-                        'D10': f"{d10_depth:.2f} mm"
-                    }
-            
-            except Exception as e:
-                print(f"파일 분석 오류 ({file_name}): {e}")
-        
-        # 계산된 값들을 테이블에 추가
-        row_count = 0
-        depth_params = ['file', 'D90', 'SOBP', 'D50', 'D20', 'D10']
-        
-        for param in depth_params:
-            row_tag = 'evenrow' if row_count % 2 == 0 else 'oddrow'
-            row_count += 1
-            
-            plan_value = plan_depth_values.get(param, '')
-            measured_value = measured_depth_values.get(param, '')
-            
-            self.info_tree.insert("", tk.END, 
-                values=(param, plan_value, measured_value), 
-                tags=(row_tag,))
-        
-        # 테이블 값에 따라 열 너비 자동 조정
-        self.adjust_column_widths()      
-        
-    def adjust_column_widths(self):
-        """테이블 컬럼 너비 자동 조정"""
-        for column in ("param", "plan", "measured"):
-            # 헤더 텍스트 길이
-            header_width = len(self.info_tree.heading(column)['text']) * 10
-            
-            # 모든 행에서 해당 열의 값 길이 확인
-            max_width = header_width
-            for item in self.info_tree.get_children():
-                cell_value = str(self.info_tree.set(item, column))
-                cell_width = len(cell_value) * 8  # 픽셀 단위 대략적인 계산
-                max_width = max(max_width, cell_width)
-            
-            # 최소 너비 설정 및 20% 여유 공간 추가
-            min_width = 50
-            column_width = max(min_width, int(max_width * 1.2))
-            
-            # 열 너비 설정
-            self.info_tree.column(column, width=column_width, minwidth=min_width)
+        """파일별 지표 표 갱신 (바뀐 행만 다시 계산하고, 보이는 항목 중 바뀐 것만 다시 씀)"""
+        if any(self.table.update(self.curves)):
+            self.table_view.refresh()
     
     def save_figure(self):
         """그래프 저장"""
-        if not self.selected_files:
+        if not self.selected_files or self.figure is None:
             tk.messagebox.showinfo("알림", "저장할 그래프가 없습니다. 먼저 파일을 열어주세요.")
             return
         
@@ -509,25 +572,64 @@ class DepthDoseGUI:
             except Exception as e:
                 tk.messagebox.showerror("오류", f"그래프 저장 중 오류가 발생했습니다.\n{e}")
     
-    # 데이터 추출 함수를 위한 공간 (향후 추가할 예정)
+    def save_session(self):
+        """불러온 곡선과 지표 전체를 세션 파일 하나로 저장"""
+        if not len(self.curves):
+            tk.messagebox.showinfo("알림", "저장할 곡선이 없습니다. 먼저 파일을 열어주세요.")
+            return
+        
+        file_path = filedialog.asksaveasfilename(
+            initialdir=self.current_directory,
+            title="세션 저장",
+            filetypes=(("Line-dose 세션", "*.lds"), ("모든 파일", "*.*")),
+            defaultextension=".lds"
+        )
+        
+        if file_path:
+            try:
+                self.curves.save(file_path)
+            except Exception as e:
+                tk.messagebox.showerror("오류", f"세션 저장 중 오류가 발생했습니다.\n{e}")
+    
+    def load_session(self):
+        """세션 파일 불러오기 (파일을 다시 파싱하지 않음)"""
+        file_path = filedialog.askopenfilename(
+            initialdir=self.current_directory,
+            title="세션 불러오기",
+            filetypes=(("Line-dose 세션", "*.lds"), ("모든 파일", "*.*"))
+        )
+        
+        if file_path:
+            try:
+                curves = CurveStore.load(file_path)
+            except Exception as e:
+                tk.messagebox.showerror("오류", f"세션을 불러오는 중 오류가 발생했습니다.\n{e}")
+                return
+            self.loader.cancel()
+            self.curves = curves
+            self.selected_files = curves.keys()
+            self.plot_depth_dose_curves()
+            self.update_file_info()
+    
     def get_extracted_data(self):
-        """추출된 데이터 반환 (depth와 dose)"""
-        return self.depth_data, self.dose_data, self.file_types
+        """추출된 데이터 반환 (표시 이름별 depth, dose, 파일 유형 dict)"""
+        depth_data, dose_data, file_types = {}, {}, {}
+        for key in self.curves:
+            name = self.curves.display_name(key)
+            depth_data[name], dose_data[name] = self.curves.curve(key)
+            file_types[name] = self.curves.meta(key).kind
+        return depth_data, dose_data, file_types
     
     def copy_selection(self, event=None):
-        """선택된 항목을 클립보드에 복사"""
-        # 선택된 항목 가져오기
-        selected_items = self.info_tree.selection()
+        """선택된 행을 클립보드에 복사 (스크롤해서 화면 밖에 있는 선택 행 포함)"""
+        selected_rows = self.table_view.selected_rows()
         
-        if not selected_items:
+        if not selected_rows:
             return
             
-        # 클립보드에 복사할 텍스트 준비
-        copy_text = ""
-        
         # 선택된 각 행의 값을 탭으로 구분하여 추가
-        for item in selected_items:
-            values = self.info_tree.item(item, 'values')
+        copy_text = ""
+        for values in selected_rows:
             row_text = "\t".join([str(val) for val in values])
             copy_text += row_text + "\n"
             
@@ -537,7 +639,7 @@ class DepthDoseGUI:
         self.root.update()  # 클립보드 업데이트 적용
         
         # 상태 메시지 (옵션)
-        print(f"{len(selected_items)}개 항목이 클립보드에 복사됨")
+        print(f"{len(selected_rows)}개 항목이 클립보드에 복사됨")
     
     def show_context_menu(self, event):
         """마우스 우클릭 시 컨텍스트 메뉴 표시"""
@@ -547,9 +649,10 @@ class DepthDoseGUI:
             # 이미 선택된 항목 유지하면서 추가 선택
             if item not in self.info_tree.selection():
                 self.info_tree.selection_set(item)
+                self.table_view.on_select()
         
         # 선택된 항목이 있는 경우에만 메뉴 표시
-        if self.info_tree.selection():
+        if self.table_view.selected:
             # 컨텍스트 메뉴 생성
             context_menu = tk.Menu(self.root, tearoff=0)
             context_menu.add_command(label="복사", command=self.copy_selection)
@@ -558,6 +661,15 @@ class DepthDoseGUI:
             context_menu.post(event.x_root, event.y_root)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Line-dose (range & SOBP)")
+    parser.add_argument('--profile', metavar='PATH', default=None,
+                        help='단계별 계측 결과를 종료할 때 저장 (.trace.json 이면 Chrome trace, 그 외 JSON)')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='계측에 단계별 메모리 할당 포함 (느려짐)')
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable(memory=args.profile_memory)
+    
     root = tk.Tk()
-    app = DepthDoseGUI(root)
+    app = DepthDoseGUI(root, profile_path=args.profile)
     root.mainloop()
\ No newline at end of file
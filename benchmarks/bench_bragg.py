@@ -0,0 +1,54 @@
+"""
+Pristine peak 분석 벤치마크: 곡선마다 따로 계산 vs 모든 곡선을 묶어 한 번에 계산
+
+사용법:
+    python benchmarks/bench_bragg.py [--energies 300] [--repeat 5]
+
+합성 pristine peak 파일 (에너지 70-230 MeV) 을 읽어 둔 뒤 지표 계산 시간만 측정한다.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from linedose.bragg import PEAK_METRICS, peak_metrics, stack_curves  # noqa: E402
+from linedose.parsers import read_file  # noqa: E402
+from linedose.synthetic import generate_peaks  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--energies', type=int, default=300, help='에너지 (곡선) 수')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = generate_peaks(directory, np.linspace(70.0, 230.0, args.energies))
+        curves = [read_file(path)[:2] for path in paths]
+
+    def per_curve():
+        return [peak_metrics(depth, dose) for depth, dose in curves]
+
+    def batched():
+        depth, dose = stack_curves(*zip(*curves))
+        return peak_metrics(depth, dose)
+
+    # 두 방식의 결과가 같은지 확인
+    single, stacked = per_curve(), batched()
+    for name in PEAK_METRICS:
+        np.testing.assert_allclose([row[name] for row in single], stacked[name], rtol=1e-12)
+
+    print(f"{'method':<12}{'ms':>10}{'curves/s':>12}")
+    for name, func in (('per curve', per_curve), ('batched', batched)):
+        seconds = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        print(f"{name:<12}{seconds * 1e3:>10.1f}{len(curves) / seconds:>12.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+파서 마이크로 벤치마크: 기존 줄 단위 파서와 linedose.parsers 비교
+
+decode_numbers 의 값 개수 확인 (NumPy 1.x 경로) 비용도 함께 잰다: np.fromstring 만, split() 으로
+세는 경우, _count_values (공백 -> 값 경계를 세는 방식).
+
+사용법:
+    python benchmarks/bench_parsers.py [--points 3000 30000 300000] [--repeat 7]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from linedose.parsers import _count_values, extract_csv_data, extract_txt_data  # noqa: E402
+
+
+def legacy_extract_csv_data(csv_file):
+    """기존 (readlines 기반) CSV 파서 - 비교 기준"""
+    depth = []
+    dose = []
+    with open(csv_file, "r", encoding="utf-8") as file:
+        lines = file.readlines()
+    reading_depth = False
+    reading_dose = False
+    for line in lines:
+        line = line.strip()
+        if "Curve depth: [mm]" in line:
+            reading_depth = True
+            reading_dose = False
+            continue
+        if "Curve gains: [counts]" in line:
+            reading_dose = True
+            reading_depth = False
+            continue
+        if reading_depth and line:
+            depth.extend(map(float, line.split(";")))
+        if reading_dose and line:
+            dose.extend(map(float, line.split(";")))
+        if reading_dose and line == "":
+            break
+    return np.array(depth), np.array(dose)
+
+
+def legacy_extract_txt_data(txt_file):
+    """기존 (readlines 기반) TXT 파서 - 비교 기준"""
+    depth = []
+    dose = []
+    reading_data = False
+    with open(txt_file, "r", encoding="utf-8") as file:
+        lines = file.readlines()
+    for line in lines:
+        line = line.strip()
+        if "Distance(cm)   Dose (cGy)" in line:
+            reading_data = True
+            continue
+        if reading_data:
+            parts = line.split()
+            if len(parts) == 2:
+                depth.append(float(parts[0]) * 10)
+                dose.append(float(parts[1]))
+    return np.array(depth), np.array(dose)
+
+
+def write_files(directory, points):
+    """points 개 샘플을 가진 CSV/TXT 파일 작성"""
+    rng = np.random.default_rng(points)
+    depth = np.linspace(0, 300, points)
+    dose = rng.uniform(0, 1000, points)
+
+    csv_path = os.path.join(directory, f"scan_{points}.csv")
+    with open(csv_path, "w", encoding="utf-8") as file:
+        file.write("Measurement;Zebra\n\nCurve depth: [mm]\n")
+        file.write(";".join(f"{v:.2f}" for v in depth))
+        file.write("\n\nCurve gains: [counts]\n")
+        file.write(";".join(f"{v:.3f}" for v in dose))
+        file.write("\n\nEnd\n")
+
+    txt_path = os.path.join(directory, f"plan_{points}.txt")
+    with open(txt_path, "w", encoding="utf-8") as file:
+        file.write("RayStation line dose\n\nDistance(cm)   Dose (cGy)\n")
+        file.writelines(f"{a / 10:.4f}   {b:.4f}\n" for a, b in zip(depth, dose))
+
+    return csv_path, txt_path
+
+
+def best_time(func, path, repeat):
+    return min(timeit.repeat(lambda: func(path), number=1, repeat=repeat))
+
+
+def bench_decode(points, repeat):
+    """CSV 선량 블록 하나 (points 개 값) 의 변환과 값 개수 확인 시간 (ms)"""
+    rng = np.random.default_rng(points)
+    block = ";".join(f"{v:.3f}" for v in rng.uniform(0, 1000, points)).encode().replace(b';', b' ')
+    assert _count_values(block) == len(block.split()) == points
+    cases = (
+        ('fromstring', lambda: np.fromstring(block, sep=' ')),
+        ('+ split()', lambda: (np.fromstring(block, sep=' '), len(block.split()))),
+        ('+ _count_values', lambda: (np.fromstring(block, sep=' '), _count_values(block))),
+    )
+    return [(name, best_time(lambda _: func(), None, repeat) * 1e3) for name, func in cases]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+', default=[3000, 30000, 300000])
+    parser.add_argument('--repeat', type=int, default=7)
+    args = parser.parse_args(argv)
+
+    cases = (
+        ('csv', legacy_extract_csv_data, extract_csv_data, 0),
+        ('txt', legacy_extract_txt_data, extract_txt_data, 1),
+    )
+
+    print(f"{'format':<7}{'points':>9}{'legacy [ms]':>14}{'new [ms]':>11}{'speedup':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for points in args.points:
+            paths = write_files(directory, points)
+            for name, legacy, new, index in cases:
+                path = paths[index]
+                # 결과가 같은지 먼저 확인
+                for a, b in zip(legacy(path), new(path)):
+                    np.testing.assert_allclose(a, b, rtol=1e-12)
+                t_legacy = best_time(legacy, path, args.repeat)
+                t_new = best_time(new, path, args.repeat)
+                print(f"{name:<7}{points:>9}{t_legacy * 1e3:>14.2f}{t_new * 1e3:>11.2f}"
+                      f"{t_legacy / t_new:>9.1f}x")
+
+    print(f"\n{'decode':<17}" + ''.join(f"{points:>11}" for points in args.points) + '  [ms]')
+    rows = list(zip(*(bench_decode(points, args.repeat) for points in args.points)))
+    for row in rows:
+        print(f"{row[0][0]:<17}" + ''.join(f"{t:>11.2f}" for _, t in row))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
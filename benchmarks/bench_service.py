@@ -0,0 +1,97 @@
+"""
+분석 서비스 벤치마크: 여러 스테이션이 동시에 파일을 올릴 때의 처리량과 응답 시간
+
+사용법:
+    python benchmarks/bench_service.py [--stations 8] [--files 50] [--batch-size 1 16]
+
+localhost 의 빈 포트에 서비스를 띄우고, 스테이션마다 스레드 하나가 /upload 로 파일을 하나씩
+보낸다. batch-size 값마다 서비스를 새로 띄워 (결과 캐시가 비어 있는 상태) 측정한다.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from linedose.service import AnalysisService, make_server  # noqa: E402
+from linedose.synthetic import generate_dataset  # noqa: E402
+
+
+def upload(base, path):
+    """파일 하나 업로드 - 응답 시간 (초)"""
+    with open(path, 'rb') as file:
+        data = file.read()
+    request = urllib.request.Request(f"{base}/upload?name={os.path.basename(path)}&curves=0",
+                                     data=data, method='POST')
+    start = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        result = json.loads(response.read())
+    if result['error']:
+        raise RuntimeError(result['error'])
+    return time.perf_counter() - start
+
+
+def run(paths, stations, batch_size, workers):
+    """(전체 초, 응답 시간 목록, 서비스 통계)"""
+    service = AnalysisService(workers=workers, batch_size=batch_size)
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    latencies = []
+    lock = threading.Lock()
+
+    def station(index):
+        for path in paths[index::stations]:
+            seconds = upload(base, path)
+            with lock:
+                latencies.append(seconds)
+
+    try:
+        # 작업 프로세스 시작 비용은 빼고 측정
+        upload(base, paths[0])
+        latencies.clear()
+        start = time.perf_counter()
+        threads = [threading.Thread(target=station, args=(i,)) for i in range(stations)]
+        for item in threads:
+            item.start()
+        for item in threads:
+            item.join()
+        return time.perf_counter() - start, latencies, dict(service.stats)
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--stations', type=int, default=8, help='동시에 보내는 스테이션 수')
+    parser.add_argument('--files', type=int, default=50, help='계획/측정 파일 쌍의 수')
+    parser.add_argument('--batch-size', type=int, nargs='+', default=[1, 16])
+    parser.add_argument('-j', '--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        pairs = generate_dataset(directory, args.files)
+        # 첫 파일은 작업자 준비에 쓰므로 결과 캐시에 걸리지 않도록 뺀다
+        paths = [path for pair in pairs for path in pair][1:]
+        print(f"{'batch size':<12}{'files/s':>10}{'median [ms]':>13}{'p95 [ms]':>10}{'batches':>9}")
+        for batch_size in args.batch_size:
+            seconds, latencies, stats = run(paths, args.stations, batch_size, args.workers)
+            latencies.sort()
+            p95 = latencies[int(0.95 * (len(latencies) - 1))]
+            print(f"{batch_size:<12}{len(paths) / seconds:>10.0f}"
+                  f"{statistics.median(latencies) * 1e3:>13.1f}{p95 * 1e3:>10.1f}"
+                  f"{stats['batches']:>9}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
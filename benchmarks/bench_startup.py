@@ -0,0 +1,129 @@
+"""
+시작 시간 벤치마크: 새 Python 프로세스에서 import 와 첫 결과까지 걸리는 시간 측정
+
+사용법:
+    python benchmarks/bench_startup.py [--runs 7]
+
+측정 항목 (각 항목을 새 프로세스에서 runs 번 실행, 중앙값/최소값):
+- import linedose
+- 첫 지표 계산 (import + 파일 하나 파싱/정규화/지표)
+- import Line_dose (GUI 모듈, matplotlib 은 불러오지 않음)
+- GUI 창 표시 / 그래프 준비 (화면이 있을 때만)
+
+시간은 프로세스 안에서 잰 값 (인터프리터 시작 제외) 과 프로세스 전체 실행 시간.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+sys.path.insert(0, ROOT)
+
+from linedose.synthetic import generate_dataset  # noqa: E402
+
+# 각 스크립트는 'name seconds' 줄을 출력한다 (t0 부터의 시간)
+_PRELUDE = "import sys, time; t0 = time.perf_counter(); sys.path.insert(0, {root!r})\n"
+
+SCRIPTS = {
+    'import linedose': """
+import linedose
+print('import linedose', time.perf_counter() - t0)
+""",
+    'first metrics': """
+from linedose import compute_metrics, load_curve
+depth, dose, kind = load_curve({path!r})
+compute_metrics(depth, dose)
+print('first metrics', time.perf_counter() - t0)
+""",
+    'import Line_dose': """
+import Line_dose
+print('import Line_dose', time.perf_counter() - t0)
+print('matplotlib imported', float('matplotlib' in sys.modules))
+""",
+    'gui': """
+import tkinter as tk
+import Line_dose
+root = tk.Tk()
+app = Line_dose.DepthDoseGUI(root)
+root.update()
+print('window shown', time.perf_counter() - t0)
+while app.renderer is None and app.plot_placeholder.winfo_exists():
+    root.update()
+    time.sleep(0.005)
+root.update()
+print('plot ready', time.perf_counter() - t0)
+app.on_close()
+""",
+}
+
+
+def has_display():
+    """Tk 창을 만들 수 있으면 True"""
+    if sys.platform.startswith('linux') and not os.environ.get('DISPLAY') \
+            and not os.environ.get('WAYLAND_DISPLAY'):
+        return False
+    result = subprocess.run([sys.executable, '-c', 'import tkinter; tkinter.Tk().destroy()'],
+                            capture_output=True)
+    return result.returncode == 0
+
+
+def run_script(source):
+    """스크립트를 새 프로세스에서 실행 - ({항목: 초}, 프로세스 전체 초)"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', source], capture_output=True, text=True,
+                            cwd=ROOT)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    values = {}
+    for line in result.stdout.splitlines():
+        name, _, value = line.rpartition(' ')
+        try:
+            values[name] = float(value)
+        except ValueError:
+            continue
+    return values, wall
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=7)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        plan_path, _ = generate_dataset(directory, 1)[0]
+        names = ['import linedose', 'first metrics', 'import Line_dose']
+        if has_display():
+            names.append('gui')
+        else:
+            print("화면이 없어 GUI 창 표시 시간은 측정하지 않습니다.")
+
+        print(f"{'step':<22}{'median [ms]':>13}{'min [ms]':>10}{'process [ms]':>14}")
+        for name in names:
+            source = _PRELUDE.format(root=ROOT) + SCRIPTS[name].format(path=plan_path)
+            samples = {}
+            walls = []
+            for _ in range(args.runs):
+                try:
+                    values, wall = run_script(source)
+                except RuntimeError as e:
+                    print(f"{name:<22}실패: {e}")
+                    break
+                walls.append(wall)
+                for key, value in values.items():
+                    samples.setdefault(key, []).append(value)
+            for key, values in samples.items():
+                if key == 'matplotlib imported':
+                    print(f"  (matplotlib imported: {'yes' if max(values) else 'no'})")
+                    continue
+                print(f"{key:<22}{statistics.median(values) * 1e3:>13.1f}"
+                      f"{min(values) * 1e3:>10.1f}{statistics.median(walls) * 1e3:>14.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+전체 처리 단계 벤치마크: 합성 SOBP 파일로 파싱, 정규화, 지표 계산, 오프스크린 그리기 시간 측정
+
+사용법:
+    python benchmarks/bench_suite.py [--files 10 100] [--resolution 0.5 0.1] [--repeat 3]
+    python benchmarks/bench_suite.py --save-baseline      # 현재 결과를 기준으로 저장
+    python benchmarks/bench_suite.py --baseline base.json # 기준보다 느려진 단계 표시
+
+기준 파일의 단계 시간보다 (1 + tolerance) 배 이상 느리면 REGRESSION 으로 표시하고 종료 코드 1.
+기준 파일이 없으면 이번 결과를 기준으로 저장한다 (저장소의 benchmarks/baseline.json 은 기본 인자로
+만든 참고용 기준이며, 다른 컴퓨터에서는 --save-baseline 으로 다시 만들어 비교할 것).
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from linedose.analysis import METRIC_NAMES, compute_metrics, find_x_for_y, normalize_dose  # noqa: E402
+from linedose.parsers import read_file  # noqa: E402
+from linedose.render import CurveRenderer  # noqa: E402
+from linedose.synthetic import generate_dataset  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+STAGES = ('parse', 'normalize', 'metrics', 'find_x_for_y', 'plot')
+
+
+def stage_functions(paths):
+    """단계 이름 -> 인자 없는 함수 (앞 단계 결과는 미리 계산해 두고 해당 단계만 측정)"""
+    parsed = [read_file(path)[:2] for path in paths]
+    normalized = [normalize_dose(depth, dose) for depth, dose in parsed]
+
+    def parse():
+        for path in paths:
+            read_file(path)
+
+    def normalize():
+        # Line_dose.extract_data 에서 파일마다 하는 정규화
+        for depth, dose in parsed:
+            normalize_dose(depth, dose)
+
+    def metrics():
+        # update_file_info 에서 파일마다 하는 지표 계산
+        for depth, dose in normalized:
+            compute_metrics(depth, dose)
+
+    def find_x():
+        # 예전 방식: 수준마다 find_x_for_y 를 따로 호출
+        for depth, dose in normalized:
+            for level in (90, 50, 20, 10):
+                find_x_for_y(depth, dose, level)
+
+    def plot():
+        figure, ax = plt.subplots(figsize=(5, 4), dpi=100)
+        ax.set_xlim(0, 300)
+        renderer = CurveRenderer(ax, plt.get_cmap('tab10'))
+        for index, (depth, dose) in enumerate(normalized):
+            renderer.set_curve(index, depth, dose, label=str(index))
+        renderer.update_legend()
+        figure.canvas.draw()
+        plt.close(figure)
+
+    return {'parse': parse, 'normalize': normalize, 'metrics': metrics,
+            'find_x_for_y': find_x, 'plot': plot}
+
+
+def peak_memory(func):
+    """func 실행 중 Python/NumPy 메모리 할당 최대값 (bytes)"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(directory, n_files, resolution, args):
+    """합성 파일을 만들고 단계별 (최소 시간, 처리량, 최대 메모리) 측정"""
+    case_dir = os.path.join(directory, f"{n_files}_{resolution}")
+    pairs = generate_dataset(case_dir, n_files, ranges=args.ranges, widths=args.widths,
+                             resolution=resolution, noise=args.noise, seed=args.seed)
+    paths = [path for pair in pairs for path in pair]
+    megabytes = sum(os.path.getsize(path) for path in paths) / 1e6
+
+    results = {}
+    for stage, func in stage_functions(paths).items():
+        seconds = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        results[stage] = {
+            'seconds': seconds,
+            'files_per_s': len(paths) / seconds,
+            'mb_per_s': megabytes / seconds if stage == 'parse' else None,
+            'peak_mb': peak_memory(func) / 1e6,
+        }
+    return len(paths), megabytes, results
+
+
+def case_name(n_files, resolution):
+    return f"files={2 * n_files},res={resolution}mm"
+
+
+def compare(results, baseline, tolerance):
+    """기준보다 느려진 (case, stage, 현재/기준 비율) 목록"""
+    regressions = []
+    for case, stages in results.items():
+        for stage, values in stages.items():
+            reference = baseline.get(case, {}).get(stage)
+            if reference and values['seconds'] > reference * (1 + tolerance):
+                regressions.append((case, stage, values['seconds'] / reference))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, nargs='+', default=[10, 100],
+                        help='계획/측정 파일 쌍의 수')
+    parser.add_argument('--resolution', type=float, nargs='+', default=[0.5, 0.1],
+                        help='깊이 간격 (mm)')
+    parser.add_argument('--ranges', type=float, nargs=2, default=[80.0, 250.0],
+                        help='비정 범위 (mm)')
+    parser.add_argument('--widths', type=float, nargs=2, default=[20.0, 100.0],
+                        help='SOBP 폭 범위 (mm)')
+    parser.add_argument('--noise', type=float, default=0.005, help='측정 곡선 상대 잡음')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='기준 결과 JSON')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='이번 결과를 --baseline 경로에 저장')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='허용하는 상대 속도 저하 (기본값: 0.25 = 25%%)')
+    parser.add_argument('--keep', metavar='DIR', default=None,
+                        help='합성 파일을 지우지 않고 이 폴더에 남김')
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'case':<24}{'stage':<14}{'time [ms]':>11}{'files/s':>11}{'MB/s':>9}{'peak MB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = args.keep or tmp
+        for n_files in args.files:
+            for resolution in args.resolution:
+                name = case_name(n_files, resolution)
+                _, _, stages = run_case(directory, n_files, resolution, args)
+                results[name] = stages
+                for stage, values in stages.items():
+                    mb_per_s = f"{values['mb_per_s']:.1f}" if values['mb_per_s'] else '-'
+                    print(f"{name:<24}{stage:<14}{values['seconds'] * 1e3:>11.2f}"
+                          f"{values['files_per_s']:>11.0f}{mb_per_s:>9}{values['peak_mb']:>10.2f}")
+
+    timings = {case: {stage: values['seconds'] for stage, values in stages.items()}
+               for case, stages in results.items()}
+    if args.save_baseline or not os.path.exists(args.baseline):
+        # 기준 파일이 없으면 이번 결과를 기준으로 만들고, 다음 실행부터 비교한다
+        if not args.save_baseline:
+            print("기준 파일이 없어 이번 결과를 기준으로 저장합니다.")
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            json.dump(timings, file, indent=2, sort_keys=True)
+            file.write('\n')
+        print(f"기준 저장: {args.baseline}")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as file:
+        baseline = json.load(file)
+    regressions = compare(results, baseline, args.tolerance)
+    for case, stage, ratio in regressions:
+        print(f"REGRESSION {case} {stage}: 기준의 {ratio:.2f}배")
+    if not regressions:
+        print(f"기준 대비 느려진 단계 없음 (허용 {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
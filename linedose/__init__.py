@@ -0,0 +1,69 @@
+"""
+Line-dose (range & SOBP) 분석 핵심 모듈 - tkinter 없이 사용 가능
+
+하위 모듈은 아래 이름을 처음 사용할 때 불러온다 (import linedose 자체는 가볍게 유지).
+"""
+import importlib
+
+# 공개 이름 -> 정의된 하위 모듈
+_EXPORTS = {
+    'METRIC_NAMES': 'analysis',
+    'analyze_curves': 'analysis',
+    'analyze_file': 'analysis',
+    'compute_metrics': 'analysis',
+    'find_x_for_y': 'analysis',
+    'load_curve': 'analysis',
+    'normalize_dose': 'analysis',
+    'list_members': 'archive',
+    'read_member': 'archive',
+    'RangeEnergyFit': 'bragg',
+    'analyze_peaks': 'bragg',
+    'fit_range_energy': 'bragg',
+    'peak_metrics': 'bragg',
+    'CurveCache': 'cache',
+    'Envelope': 'ensemble',
+    'common_grid': 'ensemble',
+    'envelope': 'ensemble',
+    'find_outliers': 'ensemble',
+    'normalize_batch': 'ensemble',
+    'outlier_scores': 'ensemble',
+    'resample': 'ensemble',
+    'GammaResult': 'gamma',
+    'gamma_1d': 'gamma',
+    'gamma_batch': 'gamma',
+    'BatchJournal': 'journal',
+    'BackgroundLoader': 'loader',
+    'load_entry': 'loader',
+    'distal_depths': 'metrics',
+    'distal_falloff_width': 'metrics',
+    'level_depths': 'metrics',
+    'proximal_depths': 'metrics',
+    'CurveRecord': 'parsers',
+    'extract_csv_data': 'parsers',
+    'extract_txt_data': 'parsers',
+    'file_kind': 'parsers',
+    'file_modality': 'parsers',
+    'iter_curves': 'parsers',
+    'read_file': 'parsers',
+    'pair_files': 'pairs',
+    'ReportRenderer': 'report',
+    'render_reports': 'report',
+    'ResultsDB': 'results',
+    'CurveMeta': 'store',
+    'CurveStore': 'store',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
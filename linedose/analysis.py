@@ -0,0 +1,170 @@
+"""GUI 없이 사용할 수 있는 depth-dose 분석 함수"""
+import os
+
+import numpy as np
+
+from . import profiling
+from .metrics import level_depths
+from .parsers import file_kind, iter_curves, read_file
+
+# 정규화/지표 계산 버전 - 결과가 달라지는 변경을 하면 올릴 것 (캐시 무효화)
+ANALYSIS_VERSION = 2
+
+# 결과 테이블에 표시되는 지표 (update_file_info 와 동일한 순서)
+METRIC_NAMES = ('D90', 'SOBP', 'D50', 'D20', 'D10')
+
+# 원위부(distal) 지표와 해당 선량 레벨(%)
+DISTAL_LEVELS = {'D90': 90, 'D50': 50, 'D20': 20, 'D10': 10}
+
+# 근위부(proximal) 지표와 해당 선량 레벨(%)
+PROXIMAL_LEVELS = {'P95': 95}
+
+
+def normalize_dose(depth, dose):
+    """
+    선량을 SOBP 중심에서 100%가 되도록 정규화
+
+    최대값 기준으로 먼저 정규화한 뒤, distal 90% 와 proximal 95% 지점의
+    중간 인덱스 주변 평균값으로 다시 정규화한다.
+
+    Parameters:
+    depth (list/array): 깊이 (mm)
+    dose (list/array): 선량
+
+    Returns:
+    tuple: (depth, dose) float64 배열
+    """
+    depth = np.asarray(depth, dtype=float)
+    dose = np.asarray(dose, dtype=float)
+    if dose.size == 0:
+        raise ValueError("선량 데이터가 없습니다.")
+
+    # 데이터 정규화 (최대값을 100으로)
+    dose = (dose / np.max(dose)) * 100
+
+    d90_ind = np.where(dose >= 90)[0]
+    p95_ind = np.where(dose >= 95)[0]
+    if d90_ind.size == 0 or p95_ind.size == 0:
+        raise ValueError("SOBP 영역(90%/95%)을 찾을 수 없습니다.")
+
+    mid_sobp_index = int((d90_ind.max() + p95_ind.min()) / 2)
+    lo = max(mid_sobp_index - 1, 0)
+    dose = 100 * dose / np.mean(dose[lo:mid_sobp_index + 1])
+    return depth, dose
+
+
+def find_x_for_y(x_values, y_values, target_y):
+    """
+    주어진 x와 y 데이터에서 목표 y값에 해당하는 x값을 내삽법으로 찾는 함수
+    numpy.interp만 사용하여 구현
+
+    Parameters:
+    x_values (list/array): x 좌표값 리스트
+    y_values (list/array): y 좌표값 리스트
+    target_y (float): 찾고자 하는 y 값
+
+    Returns:
+    float: 목표 y값에 해당하는 x값
+    """
+    x_values = np.asarray(x_values, dtype=float)
+    y_values = np.asarray(y_values, dtype=float)
+    if y_values.size == 0:
+        raise ValueError(f"목표값 {target_y}에 대한 데이터가 없습니다.")
+
+    # 만약 target_y가 y_values의 범위를 벗어나면 예외 처리
+    y_min, y_max = y_values.min(), y_values.max()
+    if target_y < y_min or target_y > y_max:
+        raise ValueError(f"목표값 {target_y}가 데이터 범위({y_min}-{y_max}) 밖에 있습니다.")
+
+    # y 기준으로 정렬 (오름차순), numpy.interp는 오름차순 데이터를 요구
+    sorted_indices = np.argsort(y_values)
+    return float(np.interp(target_y, y_values[sorted_indices], x_values[sorted_indices]))
+
+
+def compute_metrics(depth, dose):
+    """
+    정규화된 곡선에서 D90, P95, SOBP, D50, D20, D10 (mm) 계산
+
+    모든 레벨은 linedose.metrics 에서 한 번의 벡터 연산으로 계산된다.
+
+    Returns:
+    dict: 지표 이름 -> 깊이 (mm)
+    """
+    with profiling.stage('metrics'):
+        metrics = level_depths(depth, dose,
+                               distal=list(DISTAL_LEVELS.values()),
+                               proximal=list(PROXIMAL_LEVELS.values()))
+        for name, value in metrics.items():
+            if np.isnan(value):
+                raise ValueError(f"{name}: 선량 곡선에서 교차점을 찾을 수 없습니다.")
+            metrics[name] = float(value)
+
+        metrics['SOBP'] = metrics['D90'] - metrics['P95']
+    return metrics
+
+
+def load_curve(file_path):
+    """파일을 읽어 정규화된 (depth, dose, kind) 반환"""
+    depth, dose, kind = read_file(file_path)
+    with profiling.stage('normalize'):
+        depth, dose = normalize_dose(depth, dose)
+    return depth, dose, kind
+
+
+def analyze_file(file_path, cache=None):
+    """
+    파일 하나를 분석하여 결과 행(dict) 반환
+
+    오류가 발생해도 예외를 던지지 않고 'error' 항목에 메시지를 기록한다.
+    (프로세스 풀에서 한 파일의 오류가 전체 배치를 멈추지 않도록)
+
+    Parameters:
+    file_path (str): 분석할 파일
+    cache (CurveCache): 지정하면 캐시된 곡선과 지표를 사용하고, 없으면 저장
+    """
+    row = {'path': file_path, 'file': os.path.basename(file_path),
+           'kind': '', 'error': ''}
+    with profiling.file_context(file_path), profiling.stage('file'):
+        try:
+            if cache is not None:
+                depth, dose, kind, metrics = cache.load(file_path)
+            else:
+                depth, dose, kind = load_curve(file_path)
+                metrics = None
+            row['kind'] = kind
+            # 캐시에 지표가 없으면 (계산 실패) 다시 계산하여 오류 메시지를 얻는다
+            row.update(metrics or compute_metrics(depth, dose))
+        except Exception as e:
+            row['error'] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def analyze_curves(file_path, select=None):
+    """
+    곡선이 여러 개인 파일의 곡선마다 결과 행(dict) 을 하나씩 돌려주는 generator
+
+    곡선은 iter_curves 로 하나씩 읽으므로 파일 전체를 메모리에 올리지 않는다.
+    오류는 analyze_file 과 같이 해당 행의 'error' 항목에 기록한다.
+
+    Parameters:
+    file_path (str): 분석할 파일
+    select (callable): CurveRecord -> bool, False 인 곡선은 정규화/지표 계산 없이 건너뜀
+        (예: lambda curve: curve.meta.get('Beam') == '2')
+
+    Returns:
+    generator: 'path', 'file', 'curve' (파일 안의 순서), 'kind', 'meta', 지표, 'error' 를 담은 dict
+    """
+    kind = file_kind(file_path)
+    for curve in iter_curves(file_path, kind):
+        if select is not None and not select(curve):
+            continue
+        row = {'path': file_path, 'file': os.path.basename(file_path), 'curve': curve.index,
+               'kind': kind, 'meta': curve.meta, 'error': ''}
+        with profiling.file_context(file_path), profiling.stage('curve'):
+            try:
+                with profiling.stage('normalize'):
+                    depth, dose = normalize_dose(curve.depth, curve.dose)
+                row.update(compute_metrics(depth, dose))
+            except Exception as e:
+                row['error'] = f"{type(e).__name__}: {e}"
+        yield row
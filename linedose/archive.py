@@ -0,0 +1,199 @@
+"""
+zip/tar 압축 파일 안의 데이터 파일을 풀지 않고 읽기
+
+압축 파일 안의 파일은 압축 파일을 폴더처럼 쓴 '압축 파일 경로/내부 경로' 키로 다룬다
+(zipimport 와 같은 방식, 예: 'qa/2024-05.zip/day1/m_001.csv'). 파일 이름/폴더 처리 (os.path.basename 등)
+가 일반 파일과 같게 동작하므로 이 키를 read_file/iter_curves/캐시/배치 분석에 그대로 쓸 수 있다.
+
+내부 파일 목록은 zip 의 중앙 디렉터리 (tar 는 파일 헤더) 만 읽어 이름으로 거르고, 고른 파일만
+메모리에서 압축을 푼다 (임시 파일 없음). 열린 압축 파일은 프로세스마다 몇 개를 열어 두고
+재사용하므로, 작업자마다 압축 파일을 한 번만 열고 내부 파일을 나누어 읽는다.
+목록에서 밀려나거나 파일이 바뀐 압축 파일은 읽는 중인 스레드가 모두 끝나면 닫는다.
+압축된 tar (.tar.gz 등) 는 내부 파일을 건너뛰며 읽을 수 없어 앞에서부터 풀어야 하므로,
+많은 파일을 골라 읽을 때는 zip 이나 압축하지 않은 tar 가 빠르다.
+"""
+import fnmatch
+import os
+import re
+import tarfile
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from contextlib import contextmanager
+
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+# 키 안에서 압축 파일 경로가 끝나는 위치 (확장자 바로 뒤에 경로 구분자)
+_ARCHIVE_IN_PATH = re.compile(
+    '(?:' + '|'.join(re.escape(suffix) for suffix in ARCHIVE_SUFFIXES) + r')(?=[/\\])',
+    re.IGNORECASE)
+# 프로세스마다 열어 두는 압축 파일 수
+MAX_OPEN_ARCHIVES = 8
+
+# 경로 -> _OpenArchive - 오래 안 쓴 것부터 뺀다
+_open_archives = OrderedDict()
+_open_lock = threading.Lock()
+
+
+def is_archive(path):
+    """압축 파일 (확장자 기준) 이면 True"""
+    return path.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def member_key(archive, member):
+    """압축 파일 안의 파일 키"""
+    return os.path.join(archive, member)
+
+
+def split_member(path):
+    """
+    키를 (압축 파일 경로, 내부 경로) 로 나눈다 - 일반 파일 경로이면 (path, None)
+
+    경로 중간에 압축 파일 확장자로 끝나는 부분이 있고 그 부분이 실제 파일일 때만 압축 파일 안으로 본다
+    (이름이 'x.zip' 인 폴더는 일반 폴더).
+    """
+    for match in _ARCHIVE_IN_PATH.finditer(path):
+        archive = path[:match.end()]
+        if os.path.isfile(archive):
+            return archive, path[match.end() + 1:].replace(os.sep, '/')
+    return path, None
+
+
+def match_name(name, patterns):
+    """이름 또는 파일 이름 부분이 패턴 (fnmatch) 중 하나와 맞으면 True (패턴이 없으면 항상 True)"""
+    if not patterns:
+        return True
+    base = os.path.basename(name)
+    return any(fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(base, pattern)
+               for pattern in patterns)
+
+
+class _OpenArchive:
+    """
+    열어 둔 압축 파일
+
+    identity: (크기, 수정 시각, 프로세스), handle: ZipFile 또는 TarFile, lock: 읽기 lock,
+    users: 쓰는 중인 스레드 수, evicted: 목록에서 빠짐 (마지막 사용자가 닫는다)
+    """
+
+    def __init__(self, identity, handle):
+        self.identity = identity
+        self.handle = handle
+        self.lock = threading.Lock()
+        self.users = 0
+        self.evicted = False
+
+
+def _evict(entry):
+    """목록에서 뺀 압축 파일 - 쓰는 스레드가 없으면 바로 닫는다 (_open_lock 을 잡은 상태에서 호출)"""
+    entry.evicted = True
+    if not entry.users:
+        entry.handle.close()
+
+
+def _acquire(path):
+    """열어 둔 압축 파일 (사용자 수를 올림) - 파일이 바뀌었으면 다시 연다"""
+    stat = os.stat(path)
+    # fork 된 작업 프로세스는 부모와 파일 위치를 공유하지 않도록 따로 연다
+    identity = (stat.st_size, stat.st_mtime_ns, os.getpid())
+    with _open_lock:
+        entry = _open_archives.get(path)
+        if entry is not None and entry.identity == identity:
+            _open_archives.move_to_end(path)
+        else:
+            if zipfile.is_zipfile(path):
+                handle = zipfile.ZipFile(path)
+            else:
+                handle = tarfile.open(path, 'r:*')
+            if entry is not None:
+                _evict(entry)
+            entry = _open_archives[path] = _OpenArchive(identity, handle)
+            while len(_open_archives) > MAX_OPEN_ARCHIVES:
+                _evict(_open_archives.popitem(last=False)[1])
+        entry.users += 1
+        return entry
+
+
+def _release(entry):
+    with _open_lock:
+        entry.users -= 1
+        if entry.evicted and not entry.users:
+            entry.handle.close()
+
+
+@contextmanager
+def _archive(path):
+    """열어 둔 압축 파일 객체 (내부 파일 읽기는 한 번에 한 스레드, 쓰는 동안에는 닫지 않음)"""
+    entry = _acquire(path)
+    try:
+        with entry.lock:
+            yield entry.handle
+    finally:
+        _release(entry)
+
+
+def close_archives():
+    """열어 둔 압축 파일을 모두 닫는다 (읽는 중인 파일은 읽기가 끝난 뒤)"""
+    with _open_lock:
+        while _open_archives:
+            _evict(_open_archives.popitem(last=False)[1])
+
+
+def _tar_member(handle, member):
+    """tar 안의 TarInfo ('./' 로 시작하는 이름도 찾음), 없으면 KeyError"""
+    try:
+        return handle.getmember(member)
+    except KeyError:
+        return handle.getmember('./' + member)
+
+
+def list_members(archive, patterns=None, extensions=None):
+    """
+    압축 파일 안의 데이터 파일 키 목록 (정렬된 순서, 압축을 풀지 않음)
+
+    Parameters:
+    archive (str): zip/tar 파일 경로
+    patterns (list): 파일 이름 패턴 (fnmatch, 예: '*_150MeV*.csv'), None 이면 모두
+    extensions (iterable): 허용하는 확장자 (소문자, 예: ('.csv', '.txt')), None 이면 모두
+
+    Returns:
+    list: member_key 목록
+    """
+    with _archive(archive) as handle:
+        if isinstance(handle, zipfile.ZipFile):
+            names = [info.filename for info in handle.infolist() if not info.is_dir()]
+        else:
+            # tar 는 './' 로 시작하는 이름이 많다 - 키에서는 떼고 읽을 때 다시 찾는다
+            names = [info.name[2:] if info.name.startswith('./') else info.name
+                     for info in handle.getmembers() if info.isfile()]
+    if extensions is not None:
+        extensions = tuple(extensions)
+        names = [name for name in names if os.path.splitext(name)[1].lower() in extensions]
+    return sorted(member_key(archive, name) for name in names if match_name(name, patterns))
+
+
+def read_member(path):
+    """압축 파일 안의 파일 내용 (bytes)"""
+    archive, member = split_member(path)
+    with _archive(archive) as handle:
+        try:
+            if isinstance(handle, zipfile.ZipFile):
+                return handle.read(member)
+            file = handle.extractfile(_tar_member(handle, member))
+        except KeyError:
+            file = None
+        if file is None:
+            raise FileNotFoundError(f"압축 파일 안에 '{member}' 이(가) 없습니다: {archive}")
+        with file:
+            return file.read()
+
+
+def getmtime(path):
+    """수정 시각 (초) - 압축 파일 안의 파일은 압축 파일에 기록된 시각"""
+    archive, member = split_member(path)
+    if member is None:
+        return os.path.getmtime(path)
+    with _archive(archive) as handle:
+        if isinstance(handle, zipfile.ZipFile):
+            return time.mktime(handle.getinfo(member).date_time + (0, 0, -1))
+        return float(_tar_member(handle, member).mtime)
@@ -0,0 +1,315 @@
+"""
+헤드리스 배치 분석
+
+사용법:
+    python -m linedose.batch [-j N] [-o results.csv] [--journal run.jsonl] 파일 또는 폴더 ...
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from . import profiling
+from .analysis import analyze_file
+from .archive import is_archive, list_members, match_name
+from .cache import CurveCache, try_content_hash
+from .parsers import FILE_KINDS
+
+# 결과 테이블 컬럼 순서
+RESULT_COLUMNS = ('file', 'kind', 'D90', 'P95', 'SOBP', 'D50', 'D20', 'D10', 'error', 'path')
+
+# 진행 상황 출력 간격 (초) - 터미널이면 한 줄을 덮어쓰고, 로그 파일이면 줄을 덧붙인다
+PROGRESS_INTERVAL = 1.0
+PROGRESS_LOG_INTERVAL = 30.0
+
+
+def collect_files(inputs, recursive=False, patterns=None):
+    """
+    파일/폴더/압축 파일 목록에서 지원되는 데이터 파일 경로를 정렬된 순서로 수집
+
+    zip/tar 파일은 안의 데이터 파일 키 ('압축 파일/내부 경로') 로 바꾼다 (압축을 풀지 않음).
+    patterns (fnmatch, 예: '*150MeV*') 를 지정하면 폴더와 압축 파일 안에서 이름이 맞는 파일만 고른다.
+    """
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            if recursive:
+                walker = os.walk(item)
+            else:
+                walker = [(item, [], os.listdir(item))]
+            for dir_path, _, names in walker:
+                for name in names:
+                    if os.path.splitext(name)[1].lower() in FILE_KINDS and match_name(name, patterns):
+                        files.append(os.path.join(dir_path, name))
+        elif is_archive(item):
+            files.extend(list_members(item, patterns, FILE_KINDS))
+        else:
+            files.append(item)
+    return sorted(files)
+
+
+def default_workers():
+    """기본 작업자 수 (CPU 코어 수)"""
+    return os.cpu_count() or 1
+
+
+def _analyze_chunk(tasks, cache=None, memory=None, digest=False):
+    """
+    작업 프로세스에서 (순서, 파일 경로) 묶음 분석
+
+    memory 가 None 이 아니면 계측을 켜고 이 묶음의 계측 이벤트도 돌려준다.
+    digest 가 True 이면 파일 내용 해시도 작업 프로세스에서 구한다 (journal 기록용).
+
+    Returns:
+    tuple: ([(순서, 결과 행, 걸린 초, 내용 해시 또는 None)], 계측 이벤트 목록 또는 None)
+    """
+    profiler = profiling.enable(memory=memory) if memory is not None else None
+    mark = len(profiler.events) if profiler is not None else 0
+    results = []
+    for index, file_path in tasks:
+        start = time.perf_counter()
+        row = analyze_file(file_path, cache)
+        seconds = time.perf_counter() - start
+        results.append((index, row, seconds, try_content_hash(file_path) if digest else None))
+    if profiler is None:
+        return results, None
+    events = profiler.events[mark:]
+    del profiler.events[mark:]
+    return results, events
+
+
+def iter_batch(file_paths, workers=None, chunksize=None, cache=None, digest=False):
+    """
+    파일들을 프로세스 풀에서 분석하며 끝나는 대로 (순서, 결과 행, 걸린 초, 내용 해시) 를 내는 generator
+
+    묶음이 끝나는 순서로 내므로 (입력 순서가 아님) 앞의 느린 파일이 뒤의 결과 기록을 막지 않는다.
+    digest 가 True 이면 내용 해시를 분석과 함께 작업 프로세스에서 구한다 (False 이면 None).
+    나머지 매개변수는 run_batch 와 같다.
+    """
+    file_paths = list(file_paths)
+    if not file_paths:
+        return
+    workers = workers or default_workers()
+    workers = max(1, min(workers, len(file_paths)))
+    tasks = list(enumerate(file_paths))
+    profiler = profiling.get_profiler()
+
+    if workers == 1:
+        for task in tasks:
+            yield from _analyze_chunk([task], cache, digest=digest)[0]
+        return
+
+    if chunksize is None:
+        # 작업자당 4 덩어리 정도로 나누어 프로세스 간 통신 비용과 부하 균형을 맞춤
+        chunksize = max(1, len(file_paths) // (workers * 4))
+
+    # 계측이 켜져 있으면 작업 프로세스의 이벤트를 받아 합친다
+    memory = profiler.memory if profiler is not None else None
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_analyze_chunk, tasks[start:start + chunksize], cache, memory,
+                                   digest)
+                   for start in range(0, len(tasks), chunksize)]
+        for future in as_completed(futures):
+            results, events = future.result()
+            if events is not None:
+                profiler.merge(events)
+            yield from results
+
+
+def run_batch(file_paths, workers=None, chunksize=None, cache=None):
+    """
+    파일들을 프로세스 풀에서 분석하여 입력 순서대로 결과 행 목록을 반환
+
+    Parameters:
+    file_paths (list): 분석할 파일 경로
+    workers (int): 작업 프로세스 수 (None 이면 CPU 코어 수, 1 이면 현재 프로세스에서 실행)
+    chunksize (int): 작업자에게 한 번에 넘길 파일 수 (None 이면 자동)
+    cache (CurveCache): 지정하면 캐시된 곡선과 지표를 사용
+
+    Returns:
+    list: analyze_file 결과 dict 목록
+    """
+    file_paths = list(file_paths)
+    rows = [None] * len(file_paths)
+    for index, row, _, _ in iter_batch(file_paths, workers, chunksize, cache):
+        rows[index] = row
+    return rows
+
+
+class Progress:
+    """
+    진행 상황과 남은 시간 출력 (표준 오류)
+
+    남은 시간은 이번 실행에서 분석한 파일의 평균 처리 속도로 추정한다.
+
+    Parameters:
+    total (int): 분석할 파일 수
+    stream: 출력 스트림 (None 이면 sys.stderr)
+    """
+
+    def __init__(self, total, stream=None):
+        self.total = total
+        self.stream = stream if stream is not None else sys.stderr
+        self.done = 0
+        self.failed = 0
+        self.start = time.monotonic()
+        self._tty = hasattr(self.stream, 'isatty') and self.stream.isatty()
+        self._interval = PROGRESS_INTERVAL if self._tty else PROGRESS_LOG_INTERVAL
+        self._last = self.start
+
+    def update(self, failed=False):
+        self.done += 1
+        self.failed += bool(failed)
+        now = time.monotonic()
+        if now - self._last >= self._interval or self.done == self.total:
+            self._last = now
+            self._write(now)
+
+    def status(self, now=None):
+        """'완료/전체 (비율), 오류, 처리 속도, 남은 시간' 글자"""
+        elapsed = (now if now is not None else time.monotonic()) - self.start
+        percent = 100.0 * self.done / self.total if self.total else 100.0
+        text = f"{self.done}/{self.total} ({percent:.1f}%), 오류 {self.failed}"
+        if self.done and elapsed > 0:
+            rate = self.done / elapsed
+            remaining = (self.total - self.done) / rate
+            text += f", {rate:.1f} 파일/s, 남은 시간 {_format_seconds(remaining)}"
+        return text
+
+    def _write(self, now):
+        if self._tty:
+            end = '\n' if self.done == self.total else ''
+            print(f"\r{self.status(now)}\033[K", end=end, file=self.stream, flush=True)
+        else:
+            print(self.status(now), file=self.stream, flush=True)
+
+
+def _format_seconds(seconds):
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def write_results(rows, output, append=False, header=True):
+    """
+    결과 행을 CSV 테이블로 저장 (output 이 '-' 이면 표준 출력)
+
+    append=True 이면 기존 파일 뒤에 이어 쓰며, 파일이 비어 있을 때만 헤더를 쓴다.
+    """
+    if output == '-':
+        _write_csv(rows, sys.stdout, header)
+        sys.stdout.flush()
+    else:
+        if append and os.path.exists(output) and os.path.getsize(output) > 0:
+            header = False
+        with open(output, 'a' if append else 'w', newline='', encoding='utf-8') as file:
+            _write_csv(rows, file, header)
+
+
+def _write_csv(rows, file, header=True):
+    writer = csv.DictWriter(file, fieldnames=RESULT_COLUMNS, extrasaction='ignore')
+    if header:
+        writer.writeheader()
+    for row in rows:
+        writer.writerow({key: _format_value(row.get(key, '')) for key in RESULT_COLUMNS})
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return f"{value:.4f}"
+    return value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m linedose.batch',
+        description='Line-dose (range & SOBP) 배치 분석')
+    parser.add_argument('inputs', nargs='+', help='분석할 TXT/CSV 파일, 폴더 또는 zip/tar 파일')
+    parser.add_argument('-o', '--output', default='-',
+                        help="결과 CSV 경로 (기본값: 표준 출력 '-')")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='작업 프로세스 수 (기본값: CPU 코어 수)')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='작업자에게 한 번에 넘길 파일 수 (기본값: 자동)')
+    parser.add_argument('-r', '--recursive', action='store_true',
+                        help='하위 폴더까지 검색')
+    parser.add_argument('--include', metavar='PATTERN', action='append', default=None,
+                        help='폴더/압축 파일에서 이름이 맞는 파일만 분석 (예: "*150MeV*.csv", 여러 번 지정 가능)')
+    parser.add_argument('--cache', metavar='DIR', nargs='?', const='', default=None,
+                        help='파싱 결과 캐시 사용 (폴더 생략 시 기본 사용자 캐시 폴더)')
+    parser.add_argument('--db', metavar='PATH', nargs='?', const='', default=None,
+                        help='결과를 데이터베이스에도 저장 (경로 생략 시 기본 사용자 데이터 폴더)')
+    parser.add_argument('--journal', metavar='PATH', default=None,
+                        help='파일별 결과를 기록하고, 같은 journal 로 다시 실행하면 끝난 파일은 건너뜀 '
+                             '(오류가 났거나 바뀐 파일만 다시 분석)')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='진행 상황을 출력하지 않음')
+    parser.add_argument('--profile', metavar='PATH', default=None,
+                        help='단계별 계측 결과 저장 (.trace.json 이면 Chrome trace, 그 외 JSON)')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='계측에 단계별 메모리 할당 포함 (느려짐)')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    files = collect_files(args.inputs, recursive=args.recursive, patterns=args.include)
+    if not files:
+        print("분석할 파일이 없습니다.", file=sys.stderr)
+        return 1
+
+    cache = CurveCache(args.cache or None) if args.cache is not None else None
+    journal = None
+    rows = [None] * len(files)
+    todo = list(range(len(files)))
+    if args.journal:
+        from .journal import BatchJournal
+        journal = BatchJournal(args.journal)
+        if journal.skipped_lines:
+            print(f"journal 에서 읽지 못한 줄 {journal.skipped_lines}개는 무시합니다.", file=sys.stderr)
+        todo = []
+        for index, file_path in enumerate(files):
+            rows[index] = journal.lookup(file_path)
+            if rows[index] is None:
+                todo.append(index)
+        if len(todo) < len(files):
+            print(f"{len(files) - len(todo)}개 파일은 journal 의 결과를 사용합니다.", file=sys.stderr)
+
+    if args.profile:
+        profiling.enable(memory=args.profile_memory)
+    progress = Progress(len(todo)) if todo and not args.quiet else None
+    changed = 0
+    try:
+        with profiling.stage('batch', files=len(todo)):
+            batch = iter_batch([files[index] for index in todo], workers=args.workers,
+                               chunksize=args.chunksize, cache=cache, digest=journal is not None)
+            for index, row, seconds, digest in batch:
+                rows[todo[index]] = row
+                if journal is not None:
+                    changed += journal.record(row, seconds, digest)
+                if progress is not None:
+                    progress.update(failed=row['error'])
+    finally:
+        if journal is not None:
+            journal.close()
+    write_results(rows, args.output)
+    if args.db is not None:
+        from .results import ResultsDB
+        with ResultsDB(args.db or None) as db:
+            db.add(rows)
+
+    if args.profile:
+        profiler = profiling.disable()
+        profiler.export(args.profile)
+        print(profiler.report(), file=sys.stderr)
+
+    failed = sum(1 for row in rows if row['error'])
+    print(f"{len(rows)}개 파일 분석 완료 (오류 {failed}개)", file=sys.stderr)
+    if changed:
+        print(f"다시 분석한 파일 중 {changed}개는 이전 journal 결과와 다릅니다.", file=sys.stderr)
+    return 0 if failed == 0 else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,316 @@
+"""
+Pristine Bragg peak 커미셔닝 분석
+
+사용법:
+    python -m linedose.bragg [-j N] [-o peaks.csv] 파일 또는 폴더 ...
+
+SOBP 와 달리 pristine peak 은 peak 최대값에서 100% 로 정규화하고, peak 위치, distal R90/R80,
+distal fall-off 폭 (R20 - R80), peak-to-plateau 비를 계산한다. 에너지 층마다 곡선 하나인 수백 개의
+곡선을 NaN 으로 채운 (곡선 수, 점 수) 배열 하나로 묶어 모든 지표를 한 번에 계산하고,
+비정-에너지 관계 (Bragg-Kleeman R = alpha * E^p) 도 모든 에너지와 비정 지표에 대해 한 번에 맞춘다.
+"""
+import argparse
+import csv
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import profiling
+from .batch import collect_files, default_workers
+from .metrics import distal_depths, level_name
+from .parsers import file_kind, iter_curves
+from .results import find_energy
+
+# distal 비정 레벨 (%) - R80/R20 은 fall-off 폭에도 쓰인다
+RANGE_LEVELS = (90, 80, 50, 20)
+# distal fall-off 폭 (R{lower} - R{upper})
+FALLOFF_LEVELS = (80, 20)
+# 평탄 영역 (plateau): 가장 얕은 점부터 R80 의 이 비율까지의 평균 선량
+PLATEAU_FRACTION = 0.2
+# 곡선별 지표 (peak 위치, 비정, fall-off, peak-to-plateau 비)
+PEAK_METRICS = ('peak',) + tuple(level_name('R', level) for level in RANGE_LEVELS) + ('DFO', 'PPR')
+# 비정-에너지 관계를 맞추는 지표
+FIT_METRICS = ('peak', 'R90', 'R80')
+# 비정-에너지 표 컬럼
+PEAK_COLUMNS = (('file', 'curve', 'energy') + PEAK_METRICS + ('R80_fit', 'R80_residual', 'error', 'path'))
+
+# Bragg-Kleeman 관계 맞춤 결과 (R = alpha * E^exponent, rms: 잔차 제곱평균제곱근 mm, count: 사용한 에너지 수)
+RangeEnergyFit = namedtuple('RangeEnergyFit', ['alpha', 'exponent', 'rms', 'count'])
+
+
+def stack_curves(depths, doses):
+    """
+    길이가 다른 곡선들을 NaN 으로 채운 (곡선 수, 최대 점 수) depth/dose 배열로 묶는다
+
+    Returns:
+    tuple: (depth, dose) 2차원 float64 배열
+    """
+    lengths = [len(dose) for dose in doses]
+    shape = (len(doses), max(lengths, default=0))
+    depth_stack = np.full(shape, np.nan)
+    dose_stack = np.full(shape, np.nan)
+    for row, (depth, dose, length) in enumerate(zip(depths, doses, lengths)):
+        depth_stack[row, :length] = depth
+        dose_stack[row, :length] = dose
+    return depth_stack, dose_stack
+
+
+def peak_positions(depth, dose):
+    """
+    곡선별 peak 깊이와 선량
+
+    최대 점과 양옆 점을 지나는 포물선의 꼭짓점으로 보정한다 (측정 간격보다 정밀한 peak 위치).
+    꼭짓점이 양옆 점 밖에 있거나 포물선이 위로 볼록하지 않으면 최대 점을 그대로 쓴다.
+
+    Parameters:
+    depth, dose (array): (곡선 수, 점 수), NaN 채움 허용
+
+    Returns:
+    tuple: (peak 깊이, peak 선량) (곡선 수,) 배열
+    """
+    depth = np.asarray(depth, dtype=float)
+    dose = np.asarray(dose, dtype=float)
+    rows = np.arange(dose.shape[0])
+    index = np.argmax(np.where(np.isnan(dose), -np.inf, dose), axis=1)
+    inner = np.clip(index, 1, max(dose.shape[1] - 2, 1))
+    x0, x1, x2 = (depth[rows, inner + k] for k in (-1, 0, 1))
+    y0, y1, y2 = (dose[rows, inner + k] for k in (-1, 0, 1))
+
+    # 세 점 (x0, y0), (x1, y1), (x2, y2) 를 지나는 y = a x^2 + b x + c
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denom = (x0 - x1) * (x0 - x2) * (x1 - x2)
+        a = (x2 * (y1 - y0) + x1 * (y0 - y2) + x0 * (y2 - y1)) / denom
+        b = (x2 ** 2 * (y0 - y1) + x1 ** 2 * (y2 - y0) + x0 ** 2 * (y1 - y2)) / denom
+        c = y1 - a * x1 ** 2 - b * x1
+        vertex = -b / (2 * a)
+        refined = (inner == index) & (a < 0) & (vertex >= x0) & (vertex <= x2)
+        peak_depth = np.where(refined, vertex, depth[rows, index])
+        peak_dose = np.where(refined, c - b ** 2 / (4 * a), dose[rows, index])
+    return peak_depth, peak_dose
+
+
+def peak_metrics(depth, dose):
+    """
+    pristine peak 지표를 모든 곡선에 대해 한 번에 계산
+
+    선량은 곡선별 peak 선량이 100% 가 되도록 정규화한 뒤 계산한다 (입력은 정규화 전 값이어도 됨).
+
+    Parameters:
+    depth, dose (array): (점 수,) 또는 (곡선 수, 점 수), NaN 채움 허용
+
+    Returns:
+    dict: PEAK_METRICS 이름 -> (곡선 수,) 배열 (1차원 입력이면 float), 찾을 수 없는 값은 NaN
+        peak: peak 깊이 (mm), R90/R80/R50/R20: distal 깊이 (mm),
+        DFO: distal fall-off 폭 R20 - R80 (mm), PPR: peak-to-plateau 비
+    """
+    dose = np.asarray(dose, dtype=float)
+    single = dose.ndim == 1
+    depth = np.atleast_2d(np.asarray(depth, dtype=float))
+    dose = np.atleast_2d(dose)
+    if depth.shape != dose.shape:
+        depth = np.broadcast_to(depth, dose.shape)
+
+    with profiling.stage('bragg.metrics', curves=dose.shape[0]):
+        peak_depth, peak_dose = peak_positions(depth, dose)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dose = 100.0 * dose / peak_dose[:, None]
+        ranges = distal_depths(depth, dose, RANGE_LEVELS)
+
+        metrics = {'peak': peak_depth}
+        for level, value in zip(RANGE_LEVELS, ranges):
+            metrics[level_name('R', level)] = value
+        upper, lower = (metrics[level_name('R', level)] for level in FALLOFF_LEVELS)
+        metrics['DFO'] = lower - upper
+
+        # plateau: 가장 얕은 점부터 PLATEAU_FRACTION * R80 까지 (최소 한 점)
+        start = np.nanmin(depth, axis=1)
+        limit = start + PLATEAU_FRACTION * (metrics['R80'] - start)
+        window = depth <= limit[:, None]
+        window[:, 0] |= ~window.any(axis=1)
+        window &= ~np.isnan(dose)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            plateau = np.where(window, dose, 0.0).sum(axis=1) / window.sum(axis=1)
+            metrics['PPR'] = 100.0 / plateau
+
+    if single:
+        return {name: float(value[0]) for name, value in metrics.items()}
+    return metrics
+
+
+def fit_range_energy(energies, ranges):
+    """
+    Bragg-Kleeman 관계 R = alpha * E^p 를 여러 비정 지표에 대해 한 번에 맞춘다
+
+    log R = log alpha + p log E 의 최소제곱 해를 지표마다 따로 구하되, 정규방정식의 합을
+    (지표 수,) 배열로 한 번에 계산한다. 에너지나 비정이 NaN/0 이하인 곡선은 그 지표에서만 제외한다.
+
+    Parameters:
+    energies (array): (곡선 수,) 에너지 (MeV)
+    ranges (dict): 지표 이름 -> (곡선 수,) 비정 (mm)
+
+    Returns:
+    dict: 지표 이름 -> RangeEnergyFit (맞출 수 없으면 alpha/exponent/rms 가 NaN)
+    """
+    names = list(ranges)
+    energies = np.asarray(energies, dtype=float)
+    values = np.array([np.asarray(ranges[name], dtype=float) for name in names]).reshape(
+        len(names), energies.size)
+    valid = (energies > 0) & (values > 0) & np.isfinite(values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = np.where(valid, np.log(energies), 0.0)
+        y = np.where(valid, np.log(values), 0.0)
+        n = valid.sum(axis=1)
+        sx, sy = x.sum(axis=1), y.sum(axis=1)
+        sxx, sxy = (x * x).sum(axis=1), (x * y).sum(axis=1)
+        exponent = (n * sxy - sx * sy) / (n * sxx - sx ** 2)
+        log_alpha = (sy - exponent * sx) / n
+        predicted = np.exp(log_alpha[:, None]) * energies[None, :] ** exponent[:, None]
+        residual = np.where(valid, values - predicted, 0.0)
+        rms = np.sqrt((residual ** 2).sum(axis=1) / n)
+    fitted = (n >= 2) & np.isfinite(exponent)
+    return {name: RangeEnergyFit(float(np.exp(log_alpha[i])) if fitted[i] else float('nan'),
+                                 float(exponent[i]) if fitted[i] else float('nan'),
+                                 float(rms[i]) if fitted[i] else float('nan'), int(n[i]))
+            for i, name in enumerate(names)}
+
+
+def bragg_kleeman(energy, fit):
+    """맞춘 관계로 계산한 비정 (mm)"""
+    return fit.alpha * np.asarray(energy, dtype=float) ** fit.exponent
+
+
+def _read_curves(file_path):
+    """작업 프로세스: 파일의 곡선별 (행 dict, depth, dose) 목록 - 지표는 모아서 한 번에 계산"""
+    name = os.path.basename(file_path)
+    items = []
+    try:
+        for curve in iter_curves(file_path, file_kind(file_path)):
+            energy = find_energy(curve.meta, name)
+            row = {'path': file_path, 'file': name, 'curve': curve.index,
+                   'energy': energy, 'error': ''}
+            items.append((row, np.asarray(curve.depth, dtype=float),
+                          np.asarray(curve.dose, dtype=float)))
+    except Exception as e:
+        items.append(({'path': file_path, 'file': name, 'curve': '', 'energy': None,
+                       'error': f"{type(e).__name__}: {e}"}, None, None))
+    return items
+
+
+def analyze_peaks(file_paths, workers=None):
+    """
+    pristine peak 파일들을 분석하여 에너지 순서의 표와 비정-에너지 관계를 반환
+
+    파일 읽기는 프로세스 풀에서 하고, 지표와 관계 맞춤은 모든 곡선을 묶어 한 번에 계산한다.
+
+    Parameters:
+    file_paths (list): 파일 경로 (파일 하나에 곡선이 여러 개여도 됨)
+    workers (int): 작업 프로세스 수 (None 이면 CPU 코어 수, 1 이면 현재 프로세스)
+
+    Returns:
+    tuple: (PEAK_COLUMNS 키를 가진 행 dict 목록, 지표 이름 -> RangeEnergyFit)
+    """
+    file_paths = list(file_paths)
+    workers = max(1, min(workers or default_workers(), len(file_paths) or 1))
+    with profiling.stage('bragg.read', files=len(file_paths)):
+        if workers == 1:
+            results = [_read_curves(path) for path in file_paths]
+        else:
+            chunksize = max(1, len(file_paths) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_read_curves, file_paths, chunksize=chunksize))
+
+    items = [item for items in results for item in items]
+    rows = [row for row, _, _ in items]
+    loaded = [(row, depth, dose) for row, depth, dose in items if dose is not None]
+    fits = {}
+    if loaded:
+        depth, dose = stack_curves([item[1] for item in loaded], [item[2] for item in loaded])
+        metrics = peak_metrics(depth, dose)
+        energies = np.array([np.nan if row['energy'] is None else row['energy']
+                             for row, _, _ in loaded])
+        fits = fit_range_energy(energies, {name: metrics[name] for name in FIT_METRICS})
+        fitted = bragg_kleeman(energies, fits['R80'])
+        for i, (row, _, _) in enumerate(loaded):
+            for name in PEAK_METRICS:
+                value = float(metrics[name][i])
+                row[name] = value if np.isfinite(value) else None
+            if row['R80'] is not None and np.isfinite(fitted[i]):
+                row['R80_fit'] = float(fitted[i])
+                row['R80_residual'] = row['R80'] - row['R80_fit']
+            if row['energy'] is None:
+                row['error'] = "에너지를 찾을 수 없습니다 (메타데이터 또는 파일 이름의 'MeV')."
+            elif row['R80'] is None:
+                row['error'] = "R80: 선량 곡선에서 교차점을 찾을 수 없습니다."
+
+    rows.sort(key=lambda row: (row['energy'] is None, row['energy'] or 0.0, row['path']))
+    return rows, fits
+
+
+def write_table(rows, output):
+    """비정-에너지 표를 CSV 로 저장 (output 이 '-' 이면 표준 출력)"""
+    if output == '-':
+        _write_csv(rows, sys.stdout)
+        sys.stdout.flush()
+    else:
+        with open(output, 'w', newline='', encoding='utf-8') as file:
+            _write_csv(rows, file)
+
+
+def _write_csv(rows, file):
+    writer = csv.DictWriter(file, fieldnames=PEAK_COLUMNS, extrasaction='ignore')
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({key: _format_value(row.get(key)) for key in PEAK_COLUMNS})
+
+
+def _format_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        return f"{value:.4f}"
+    return value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m linedose.bragg',
+        description='Pristine Bragg peak 커미셔닝 분석 (비정-에너지 표)')
+    parser.add_argument('inputs', nargs='+', help='분석할 TXT/CSV 파일, 폴더 또는 zip/tar 파일')
+    parser.add_argument('-o', '--output', default='-',
+                        help="표 CSV 경로 (기본값: 표준 출력 '-')")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='작업 프로세스 수 (기본값: CPU 코어 수)')
+    parser.add_argument('-r', '--recursive', action='store_true',
+                        help='하위 폴더까지 검색')
+    parser.add_argument('--include', metavar='PATTERN', action='append', default=None,
+                        help='폴더/압축 파일에서 이름이 맞는 파일만 (예: "*150MeV*.csv", 여러 번 지정 가능)')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    files = collect_files(args.inputs, recursive=args.recursive, patterns=args.include)
+    if not files:
+        print("분석할 파일이 없습니다.", file=sys.stderr)
+        return 1
+
+    rows, fits = analyze_peaks(files, workers=args.workers)
+    write_table(rows, args.output)
+    for name, fit in fits.items():
+        if np.isfinite(fit.exponent):
+            print(f"{name} = {fit.alpha:.5g} * E^{fit.exponent:.4f} "
+                  f"(rms {fit.rms:.3f} mm, 에너지 {fit.count}개)", file=sys.stderr)
+        else:
+            print(f"{name}: 비정-에너지 관계를 맞출 수 없습니다 (에너지 {fit.count}개)",
+                  file=sys.stderr)
+
+    failed = sum(1 for row in rows if row['error'])
+    print(f"{len(rows)}개 곡선 분석 완료 (오류 {failed}개)", file=sys.stderr)
+    return 0 if failed == 0 else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+파싱된 곡선과 지표의 디스크 캐시
+
+항목 키는 (파일 경로, 크기, 수정 시각) 또는 파일 내용 해시와, 해당 파일 종류의 파서 버전으로 만든다.
+파일이나 파서가 바뀌면 그 파일의 키만 달라지므로 다른 항목은 그대로 사용된다.
+각 항목은 작은 JSON 헤더와 float64 배열 (depth, dose, 지표 값) 로 된 이진 파일 하나이며,
+전체 크기가 상한을 넘으면 가장 오래 사용하지 않은 항목부터 삭제한다 (LRU, 파일 수정 시각 기준).
+"""
+import hashlib
+import json
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+from . import profiling
+from .analysis import ANALYSIS_VERSION, compute_metrics, load_curve
+from .archive import read_member, split_member
+from .parsers import PARSER_VERSIONS, file_kind
+
+# 기본 캐시 크기 상한 (bytes)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_ENTRY_SUFFIX = '.ldc'
+_MAGIC = b'LDC1'
+_HEADER = struct.Struct('<4sI')  # magic, JSON 헤더 길이
+
+
+def default_cache_dir():
+    """운영체제별 사용자 캐시 폴더 아래 linedose 폴더"""
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME') \
+        or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'linedose')
+
+
+def content_hash(file_path, block_size=1 << 20):
+    """파일 내용의 SHA-256 해시 (압축 파일 안의 파일 키이면 그 파일 내용)"""
+    digest = hashlib.sha256()
+    if split_member(file_path)[1] is not None:
+        digest.update(read_member(file_path))
+        return digest.hexdigest()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def try_content_hash(file_path):
+    """content_hash 와 같지만 파일 (또는 압축 파일 안의 파일) 을 읽을 수 없으면 None"""
+    try:
+        return content_hash(file_path)
+    except (OSError, KeyError):
+        return None
+
+
+def _encode_entry(depth, dose, kind, metrics):
+    """캐시 항목을 bytes 로 변환: 헤더 + JSON(kind, 점 수, 지표 이름) + float64 배열"""
+    depth = np.ascontiguousarray(depth, dtype='<f8')
+    dose = np.ascontiguousarray(dose, dtype='<f8')
+    header = json.dumps({'kind': kind, 'points': depth.size,
+                         'metrics': list(metrics)}).encode('utf-8')
+    values = np.array(list(metrics.values()), dtype='<f8')
+    return b''.join((_HEADER.pack(_MAGIC, len(header)), header,
+                     depth.tobytes(), dose.tobytes(), values.tobytes()))
+
+
+def _decode_entry(data):
+    """_encode_entry 의 역변환, 형식이 맞지 않으면 ValueError"""
+    magic, header_len = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise ValueError("캐시 항목 형식이 아닙니다.")
+    offset = _HEADER.size + header_len
+    header = json.loads(data[_HEADER.size:offset])
+    points = header['points']
+    names = header['metrics']
+    values = np.frombuffer(data, dtype='<f8', offset=offset)
+    if values.size != 2 * points + len(names):
+        raise ValueError("캐시 항목 크기가 맞지 않습니다.")
+    depth = values[:points].copy()
+    dose = values[points:2 * points].copy()
+    metrics = dict(zip(names, values[2 * points:].tolist()))
+    return depth, dose, header['kind'], metrics
+
+
+class CurveCache:
+    """
+    정규화된 곡선 (depth, dose, kind) 과 지표를 저장하는 디스크 캐시
+
+    Parameters:
+    directory (str): 캐시 폴더 (None 이면 default_cache_dir())
+    max_bytes (int): 캐시 전체 크기 상한
+    use_content_hash (bool): True 이면 경로/크기/수정 시각 대신 파일 내용 해시를 키로 사용
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES, use_content_hash=False):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.use_content_hash = use_content_hash
+        os.makedirs(self.directory, exist_ok=True)
+        self._total_bytes = None  # 처음 저장할 때 계산
+
+    def key(self, file_path):
+        """파일의 캐시 키 (파일 종류의 파서 버전과 분석 버전 포함)"""
+        kind = file_kind(file_path)
+        if self.use_content_hash:
+            identity = content_hash(file_path)
+        else:
+            # 압축 파일 안의 파일은 압축 파일의 크기/수정 시각과 내부 경로로 구분
+            stat = os.stat(split_member(file_path)[0])
+            identity = f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        version = f"{kind}:{PARSER_VERSIONS[kind]}:{ANALYSIS_VERSION}"
+        return hashlib.sha1(f"{version}|{identity}".encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, key + _ENTRY_SUFFIX)
+
+    def get(self, file_path):
+        """
+        캐시된 (depth, dose, kind, metrics) 반환, 없으면 None
+
+        metrics 는 지표 계산에 실패했던 곡선이면 빈 dict.
+        """
+        with profiling.stage('cache.get'):
+            path = self._entry_path(self.key(file_path))
+            try:
+                with open(path, 'rb') as file:
+                    data = file.read()
+                depth, dose, kind, metrics = _decode_entry(data)
+            except (OSError, ValueError, struct.error):
+                # 없거나 손상된 항목
+                return None
+
+        # LRU 순서 갱신
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return depth, dose, kind, metrics
+
+    def put(self, file_path, depth, dose, kind, metrics=None):
+        """곡선과 지표 저장 (임시 파일에 쓴 뒤 이름을 바꾸어 다른 프로세스와 충돌하지 않게 함)"""
+        with profiling.stage('cache.put'):
+            self._put(file_path, depth, dose, kind, metrics or {})
+
+    def _put(self, file_path, depth, dose, kind, metrics):
+        path = self._entry_path(self.key(file_path))
+        # 같은 키를 덮어쓰면 이전 항목의 크기는 전체 크기에서 뺀다
+        try:
+            old_bytes = os.path.getsize(path)
+        except OSError:
+            old_bytes = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(_encode_entry(depth, dose, kind, metrics))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self._add_bytes(os.path.getsize(path) - old_bytes)
+
+    def load(self, file_path):
+        """
+        캐시에서 (depth, dose, kind, metrics) 를 읽고, 없으면 파싱/분석 후 저장
+
+        파싱 오류는 그대로 예외로 전달되며 캐시에 저장하지 않는다.
+        """
+        cached = self.get(file_path)
+        if cached is not None:
+            return cached
+
+        depth, dose, kind = load_curve(file_path)
+        try:
+            metrics = compute_metrics(depth, dose)
+        except ValueError:
+            metrics = {}
+        self.put(file_path, depth, dose, kind, metrics)
+        return depth, dose, kind, metrics
+
+    def _entries(self):
+        """(수정 시각, 크기, 경로) 목록"""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for item in it:
+                if not item.name.endswith(_ENTRY_SUFFIX):
+                    continue
+                try:
+                    stat = item.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, item.path))
+        return entries
+
+    def size(self):
+        """캐시 전체 크기 (bytes)"""
+        return sum(size for _, size, _ in self._entries())
+
+    def _add_bytes(self, nbytes):
+        """전체 크기에 nbytes (덮어쓴 경우 음수일 수 있음) 를 더하고 상한을 넘으면 정리"""
+        if self._total_bytes is None:
+            self._total_bytes = self.size()
+        else:
+            self._total_bytes += nbytes
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self, target_bytes=None):
+        """가장 오래 사용하지 않은 항목부터 삭제하여 target_bytes (기본: 상한의 90%) 이하로 줄임"""
+        if target_bytes is None:
+            target_bytes = int(self.max_bytes * 0.9)
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= target_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        self._total_bytes = total
+
+    def clear(self):
+        """모든 항목 삭제"""
+        self.evict(target_bytes=0)
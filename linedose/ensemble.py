@@ -0,0 +1,215 @@
+"""
+공통 깊이 격자 재표본화와 반복 측정 곡선의 통계
+
+곡선마다 깊이 샘플링이 다르므로, 모든 곡선을 하나의 깊이 격자 위 (곡선 수, 격자 점 수)
+2차원 배열로 내삽한 뒤 배열 전체에 대해 한 번에 평균/표준편차/최소/최대 envelope 와
+이상 곡선을 계산한다.
+곡선의 측정 범위 밖 격자 점은 NaN (linedose.metrics 의 함수에 그대로 넣을 수 있음).
+
+길이가 서로 다른 곡선의 SOBP 중심 정규화 (normalize_dose 와 같은 계산) 도 한 번에 처리한다.
+"""
+import warnings
+from collections import namedtuple
+
+import numpy as np
+
+# 격자 점별 통계 (count: 값이 있는 (NaN 이 아닌) 곡선 수)
+Envelope = namedtuple('Envelope', ['grid', 'mean', 'std', 'min', 'max', 'count'])
+
+
+def _flatten(arrays):
+    """배열 목록을 하나로 이어 붙이고 (값, 곡선별 시작 위치, 길이) 반환"""
+    lengths = np.array([len(array) for array in arrays], dtype=np.intp)
+    starts = np.zeros(len(arrays), dtype=np.intp)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    values = np.concatenate([np.asarray(array, dtype=float) for array in arrays]) \
+        if len(arrays) else np.empty(0)
+    return values, starts, lengths
+
+
+def common_grid(depths, step=None, start=None, stop=None, union=False):
+    """
+    곡선들에 공통인 깊이 격자
+
+    Parameters:
+    depths (list): 곡선별 깊이 배열 (mm)
+    step (float): 격자 간격 (None 이면 곡선 샘플 간격 중앙값 중 가장 작은 값)
+    start, stop (float): 격자 범위 (None 이면 모든 곡선이 겹치는 범위)
+    union (bool): True 이면 기본 범위를 겹치는 범위 대신 전체 범위로
+
+    Returns:
+    array: 오름차순 깊이 격자 (mm)
+    """
+    depths = [np.asarray(depth, dtype=float) for depth in depths if len(depth) > 1]
+    if not depths:
+        raise ValueError("격자를 만들 곡선이 없습니다.")
+    mins = np.array([np.min(depth) for depth in depths])
+    maxs = np.array([np.max(depth) for depth in depths])
+    if start is None:
+        start = mins.min() if union else mins.max()
+    if stop is None:
+        stop = maxs.max() if union else maxs.min()
+    if stop <= start:
+        raise ValueError("곡선들의 깊이 범위가 겹치지 않습니다.")
+    if step is None:
+        step = min(np.median(np.abs(np.diff(depth))) for depth in depths)
+    if not step > 0:
+        raise ValueError("격자 간격은 0보다 커야 합니다.")
+    n_points = int(np.floor((stop - start) / step + 1e-9)) + 1
+    return start + step * np.arange(n_points)
+
+
+def resample(depths, doses, grid):
+    """
+    여러 곡선을 하나의 깊이 격자 위로 선형 내삽
+
+    결과 2차원 배열을 한 번 할당하고 곡선마다 np.interp 로 한 행씩 채운다
+    (모든 곡선을 이어 붙여 searchsorted 한 번으로 처리하는 방식보다 빠름).
+
+    Parameters:
+    depths (list): 곡선별 깊이 배열 (오름차순이 아니면 정렬해서 사용)
+    doses (list 또는 2D array): 곡선별 선량 배열
+    grid (array): 깊이 격자
+
+    Returns:
+    array: (곡선 수, 격자 점 수) 선량 - 곡선 범위 밖은 NaN
+    """
+    grid = np.asarray(grid, dtype=float)
+    if len(depths) != len(doses):
+        raise ValueError("depth 와 dose 곡선 수가 다릅니다.")
+
+    stack = np.full((len(depths), grid.size), np.nan)
+    for row, depth, dose in zip(stack, depths, doses):
+        depth = np.asarray(depth, dtype=float)
+        dose = np.asarray(dose, dtype=float)
+        if depth.shape != dose.shape:
+            raise ValueError("depth 와 dose 는 길이가 같아야 합니다.")
+        if depth.size == 0:
+            continue
+        if depth.size > 1 and np.any(depth[1:] < depth[:-1]):
+            order = np.argsort(depth, kind='stable')
+            depth, dose = depth[order], dose[order]
+        row[:] = np.interp(grid, depth, dose, left=np.nan, right=np.nan)
+    return stack
+
+
+def normalize_batch(doses):
+    """
+    여러 곡선의 SOBP 중심 정규화를 한 번에 계산 (normalize_dose 와 같은 결과)
+
+    Parameters:
+    doses (list 또는 2D array): 곡선별 선량 (길이가 달라도 됨)
+
+    Returns:
+    tuple: (정규화된 선량 - 입력과 같은 형태의 list 또는 2D array,
+            정규화에 성공한 곡선 bool 배열 - 실패한 곡선은 NaN)
+    """
+    stacked = isinstance(doses, np.ndarray) and doses.ndim == 2
+    arrays = list(doses)
+    if not arrays:
+        return (np.empty((0, 0)) if stacked else []), np.zeros(0, dtype=bool)
+    dose, starts, lengths = _flatten(arrays)
+    n_curves = len(arrays)
+    if not dose.size:
+        # 모든 곡선이 비어 있음 (reduceat 은 빈 배열에 쓸 수 없다)
+        empty = np.full(np.shape(doses), np.nan) if stacked else [np.empty(0) for _ in arrays]
+        return empty, np.zeros(n_curves, dtype=bool)
+    nonempty = lengths > 0
+    safe_starts = np.minimum(starts, max(dose.size - 1, 0))
+    index = np.arange(dose.size)
+
+    # 최대값을 100으로 (NaN 은 무시 - resample() 결과의 범위 밖 값)
+    filled = np.where(np.isnan(dose), -np.inf, dose)
+    maxs = np.maximum.reduceat(filled, safe_starts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # 최대값이 0 인 곡선은 NaN - 아래에서 실패로 표시
+        scaled = (dose / np.repeat(maxs, lengths)) * 100
+
+    # distal 90% 의 마지막 인덱스와 proximal 95% 의 첫 인덱스 (곡선 안의 위치)
+    with np.errstate(invalid='ignore'):
+        last90 = np.maximum.reduceat(np.where(scaled >= 90, index, -1), safe_starts) - starts
+        first95 = np.minimum.reduceat(np.where(scaled >= 95, index, dose.size), safe_starts) - starts
+    valid = nonempty & (last90 >= 0) & (first95 < lengths) & (maxs > 0)
+
+    mid = ((last90 + first95) / 2).astype(np.intp)
+    lo = np.maximum(mid - 1, 0)
+    # dose[lo:mid + 1] 의 평균 (1개 또는 2개 값)
+    first = scaled[np.clip(starts + lo, 0, max(dose.size - 1, 0))]
+    second = scaled[np.clip(starts + mid, 0, max(dose.size - 1, 0))]
+    center = np.where(mid > lo, (first + second) / 2, first)
+    valid &= np.isfinite(center) & (center != 0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        normalized = 100 * scaled / np.repeat(np.where(valid, center, np.nan), lengths)
+
+    if stacked:
+        return normalized.reshape(np.shape(doses)), valid
+    return np.split(normalized, starts[1:]), valid
+
+
+def envelope(grid, stack):
+    """
+    격자 점별 평균/표준편차/최소/최대 (NaN 은 제외)
+
+    Parameters:
+    grid (array): 깊이 격자
+    stack (array): resample() 결과 (곡선 수, 격자 점 수)
+
+    Returns:
+    Envelope
+    """
+    stack = np.asarray(stack, dtype=float)
+    count = np.sum(~np.isnan(stack), axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        total = np.nansum(stack, axis=0)
+        mean = np.where(count > 0, total / np.maximum(count, 1), np.nan)
+        deviation = np.where(np.isnan(stack), 0.0, stack - mean)
+        variance = np.sum(deviation ** 2, axis=0) / np.maximum(count - 1, 1)
+        std = np.where(count > 1, np.sqrt(variance), np.where(count == 1, 0.0, np.nan))
+        filled_low = np.where(np.isnan(stack), np.inf, stack)
+        filled_high = np.where(np.isnan(stack), -np.inf, stack)
+        minimum = np.where(count > 0, filled_low.min(axis=0, initial=np.inf), np.nan)
+        maximum = np.where(count > 0, filled_high.max(axis=0, initial=-np.inf), np.nan)
+    return Envelope(np.asarray(grid, dtype=float), mean, std, minimum, maximum, count)
+
+
+def outlier_scores(stack):
+    """
+    곡선별 이상 정도 - 중앙값 곡선과의 RMS 차이를 곡선들의 중앙값/MAD 로 표준화한 값
+
+    Returns:
+    array: (곡선 수,) robust z-score (곡선에 값이 없으면 NaN)
+    """
+    stack = np.asarray(stack, dtype=float)
+    if stack.shape[0] == 0:
+        return np.empty(0)
+    if not np.isnan(stack).any():
+        # NaN 이 없으면 (보통 겹치는 범위의 격자) nan 함수보다 훨씬 빠르다
+        median_curve = np.median(stack, axis=0)
+        rms = np.sqrt(np.mean((stack - median_curve) ** 2, axis=1))
+    else:
+        with np.errstate(invalid='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            median_curve = np.nanmedian(stack, axis=0)
+            rms = np.sqrt(np.nanmean((stack - median_curve) ** 2, axis=1))
+    center = np.nanmedian(rms)
+    mad = 1.4826 * np.nanmedian(np.abs(rms - center))
+    if not mad > 0:
+        # 거의 같은 곡선들 - 평균 차이로 대신한다
+        mad = max(np.nanmean(np.abs(rms - center)), np.finfo(float).eps)
+    return (rms - center) / mad
+
+
+def find_outliers(stack, threshold=3.5):
+    """
+    다른 반복 측정과 많이 다른 곡선
+
+    Parameters:
+    stack (array): resample() 결과 (곡선 수, 격자 점 수)
+    threshold (float): outlier_scores 가 이 값을 넘으면 이상 곡선
+
+    Returns:
+    array: (곡선 수,) bool
+    """
+    scores = outlier_scores(stack)
+    return np.nan_to_num(scores, nan=np.inf) > threshold
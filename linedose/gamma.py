@@ -0,0 +1,197 @@
+"""
+1D 감마 분석 (Low et al.), 선량차, distance-to-agreement (DTA)
+
+기준(reference) 곡선의 각 점에 대해 평가(evaluated) 곡선을 선분들로 보고, 탐색 반경 안의
+선분만 (searchsorted 로 찾은 창) 닫힌 형태의 최소값으로 계산한다. 모든 점 쌍을
+비교하는 O(N·M) 계산은 하지 않는다.
+
+깊이는 mm, 선량은 % (정규화된 곡선) 라고 가정한다.
+"""
+import os
+from collections import namedtuple
+
+import numpy as np
+
+GammaResult = namedtuple('GammaResult',
+                         ['x', 'gamma', 'pass_rate', 'dose_diff', 'dta', 'evaluated'])
+GammaResult.__doc__ = """
+감마 분석 결과 (모든 배열은 기준 곡선의 점 x 에서의 값)
+
+x: 기준 곡선 깊이 (mm)
+gamma: 감마 값 (max_gamma 를 넘는 값은 max_gamma 로 표시)
+pass_rate: evaluated 점 중 gamma <= 1 인 비율 (%)
+dose_diff: 평가 - 기준 선량 (정규화 선량의 %)
+dta: 같은 선량을 갖는 평가 곡선 위 점까지의 최소 거리 (mm, 탐색 반경 안에 없으면 NaN)
+evaluated: 통과율 계산에 포함된 점 (선량 문턱값 이상)
+"""
+
+# 한 번에 계산하는 (기준 점 수 x 창 크기) 최대 원소 수
+_CHUNK_ELEMENTS = 1 << 21
+
+
+def _windows(ref_x, eval_x, radius):
+    """각 기준 점에 대해 탐색 반경 (점마다 다를 수 있음) 과 겹치는 평가 선분 [lo, hi) 범위"""
+    n_segments = eval_x.size - 1
+    lo = np.searchsorted(eval_x, ref_x - radius, side='right') - 1
+    hi = np.searchsorted(eval_x, ref_x + radius, side='left')
+    lo = np.clip(lo, 0, n_segments - 1)
+    hi = np.clip(hi, lo + 1, n_segments)
+    return lo, hi
+
+
+def _chunks(lo, hi):
+    """창 크기 순으로 정렬한 기준 점 인덱스를 (점 수 x 가장 큰 창) 이 _CHUNK_ELEMENTS 이하인 묶음으로"""
+    order = np.argsort(hi - lo, kind='stable')
+    widths = (hi - lo)[order]
+    start = 0
+    while start < order.size:
+        cost = (np.arange(1, order.size - start + 1)) * widths[start:]
+        stop = start + max(int(np.searchsorted(cost, _CHUNK_ELEMENTS, side='right')), 1)
+        yield order[start:stop]
+        start = stop
+
+
+def _segments(eval_x, eval_y, lo, hi):
+    """기준 점마다 창 [lo, hi) 의 평가 선분 양 끝 (x0, x1, y0, y1) 과 창 안인지 여부 (점 수 x 창 크기)"""
+    width = int((hi - lo).max())
+    seg = lo[:, None] + np.arange(width)[None, :]
+    valid = seg < hi[:, None]
+    seg = np.minimum(seg, eval_x.size - 2)
+    return eval_x[seg], eval_x[seg + 1], eval_y[seg], eval_y[seg + 1], valid
+
+
+def _gamma_search(ref_x, ref_y, eval_x, eval_y, dose_tol, dta_mm, lo, hi):
+    """창 안의 선분에 대한 감마 최소값 (하나의 chunk)"""
+    x0, x1, y0, y1, valid = _segments(eval_x, eval_y, lo, hi)
+    xr = ref_x[:, None]
+    yr = ref_y[:, None]
+    tol = dose_tol[:, None]
+
+    # 선분 위 점 p(t) = p0 + t (p1 - p0), 정규화된 거리 제곱의 최소값 (t 는 [0, 1] 로 제한)
+    a = (x0 - xr) / dta_mm
+    b = (x1 - x0) / dta_mm
+    c = (y0 - yr) / tol
+    d = (y1 - y0) / tol
+    denom = b * b + d * d
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(denom > 0, -(a * b + c * d) / denom, 0.0)
+    t = np.clip(t, 0.0, 1.0)
+    g2 = (a + b * t) ** 2 + (c + d * t) ** 2
+    return np.sqrt(np.where(valid, g2, np.inf).min(axis=1))
+
+
+def _dta_search(ref_x, ref_y, eval_x, eval_y, lo, hi):
+    """창 안에서 평가 선량이 기준 선량과 같아지는 선분 위 점까지의 최소 거리 (하나의 chunk)"""
+    x0, x1, y0, y1, valid = _segments(eval_x, eval_y, lo, hi)
+    xr = ref_x[:, None]
+    yr = ref_y[:, None]
+    crosses = valid & ((y0 - yr) * (y1 - yr) <= 0) & (y0 != y1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        xc = x0 + (yr - y0) / (y1 - y0) * (x1 - x0)
+    distance = np.where(crosses, np.abs(xc - xr), np.inf)
+    # 선분 양 끝 선량이 기준과 정확히 같은 경우
+    distance = np.where(valid & (y0 == yr), np.minimum(distance, np.abs(x0 - xr)), distance)
+    return distance.min(axis=1)
+
+
+def gamma_1d(ref_x, ref_y, eval_x, eval_y, dose_percent=3.0, dta_mm=3.0,
+             normalization='global', norm_dose=None, threshold=10.0, max_gamma=3.0):
+    """
+    1D 감마 분석
+
+    Parameters:
+    ref_x, ref_y (array): 기준 곡선 (예: 측정)
+    eval_x, eval_y (array): 평가 곡선 (예: 계획), x 는 오름차순
+    dose_percent (float): 선량 기준 (%)
+    dta_mm (float): 거리 기준 (mm)
+    normalization (str): 'global' (norm_dose 의 %) 또는 'local' (각 기준 점 선량의 %)
+    norm_dose (float): global 정규화 선량 (None 이면 기준 곡선 최대값)
+    threshold (float): 기준 최대값의 이 % 미만인 점은 통과율에서 제외
+    max_gamma (float): 탐색 반경 = max_gamma * dta_mm, 이보다 큰 감마는 max_gamma 로 표시
+
+    Returns:
+    GammaResult
+    """
+    ref_x = np.asarray(ref_x, dtype=float)
+    ref_y = np.asarray(ref_y, dtype=float)
+    eval_x = np.asarray(eval_x, dtype=float)
+    eval_y = np.asarray(eval_y, dtype=float)
+    if eval_x.size < 2:
+        raise ValueError("평가 곡선에는 점이 2개 이상 있어야 합니다.")
+    if normalization not in ('global', 'local'):
+        raise ValueError(f"지원되지 않는 정규화 방식: {normalization}")
+
+    ref_max = np.max(ref_y)
+    if norm_dose is None:
+        norm_dose = ref_max
+    if normalization == 'global':
+        dose_tol = np.full(ref_y.shape, dose_percent / 100.0 * norm_dose)
+    else:
+        dose_tol = dose_percent / 100.0 * np.abs(ref_y)
+
+    evaluated = (ref_y >= threshold / 100.0 * ref_max) & (dose_tol > 0)
+    # 허용 오차가 0 인 점 (local 에서 선량 0) 은 계산에서 나눗셈을 피하기 위해 임의 값 사용
+    safe_tol = np.where(dose_tol > 0, dose_tol, 1.0)
+
+    radius = max_gamma * dta_mm
+    # 같은 깊이의 평가 선량으로 얻는 감마 (|선량차| / 허용 오차) 는 감마의 상한이므로,
+    # 그보다 먼 선분은 볼 필요가 없다 -> 선량이 잘 맞는 점일수록 창이 좁아진다
+    eval_at_ref = np.interp(ref_x, eval_x, eval_y, left=np.nan, right=np.nan)
+    upper = np.abs(eval_at_ref - ref_y) / safe_tol
+    point_radius = np.where(np.isnan(upper), radius,
+                            np.minimum(radius, upper * dta_mm * (1 + 1e-9) + 1e-12))
+    lo, hi = _windows(ref_x, eval_x, point_radius)
+    gamma = np.empty(ref_x.size)
+    for chunk in _chunks(lo, hi):
+        gamma[chunk] = _gamma_search(ref_x[chunk], ref_y[chunk], eval_x, eval_y,
+                                     safe_tol[chunk], dta_mm, lo[chunk], hi[chunk])
+
+    # DTA 에는 감마 상한을 쓸 수 없으므로 (선량이 잘 맞아도 같은 선량의 점은 멀 수 있음)
+    # 탐색 반경 전체의 창에서 따로 찾는다
+    lo, hi = _windows(ref_x, eval_x, radius)
+    dta = np.empty(ref_x.size)
+    for chunk in _chunks(lo, hi):
+        dta[chunk] = _dta_search(ref_x[chunk], ref_y[chunk], eval_x, eval_y, lo[chunk], hi[chunk])
+
+    gamma = np.minimum(gamma, max_gamma)
+    dta = np.where(dta <= radius, dta, np.nan)
+
+    # 선량차: 기준 점 위치에서 평가 곡선을 내삽한 값과의 차이 (범위 밖은 NaN)
+    dose_diff = (eval_at_ref - ref_y) / norm_dose * 100.0 if normalization == 'global' \
+        else eval_at_ref - ref_y
+
+    n_evaluated = np.count_nonzero(evaluated)
+    pass_rate = 100.0 * np.count_nonzero(gamma[evaluated] <= 1.0) / n_evaluated \
+        if n_evaluated else float('nan')
+    return GammaResult(ref_x, gamma, pass_rate, dose_diff, dta, evaluated)
+
+
+def _gamma_pair(args):
+    pair, criteria = args
+    return gamma_1d(*pair, **criteria)
+
+
+def gamma_batch(pairs, workers=None, **criteria):
+    """
+    여러 (ref_x, ref_y, eval_x, eval_y) 쌍에 대한 감마 분석
+
+    Parameters:
+    pairs (iterable): (ref_x, ref_y, eval_x, eval_y) 튜플
+    workers (int): 프로세스 수 (None 또는 1 이면 현재 프로세스에서 순서대로 계산)
+    criteria: gamma_1d 의 나머지 인자 (dose_percent, dta_mm, normalization, ...)
+
+    Returns:
+    list: GammaResult 목록 (입력 순서)
+    """
+    pairs = list(pairs)
+    if not workers or workers == 1 or len(pairs) < 2:
+        return [gamma_1d(*pair, **criteria) for pair in pairs]
+
+    # 프로세스 풀은 필요할 때만 불러온다 (multiprocessing import 비용)
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = min(workers, len(pairs), os.cpu_count() or 1)
+    chunksize = max(1, len(pairs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_gamma_pair, [(pair, criteria) for pair in pairs],
+                                 chunksize=chunksize))
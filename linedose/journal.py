@@ -0,0 +1,169 @@
+"""
+배치 분석 체크포인트 기록 (journal)
+
+분석을 마친 파일마다 JSON 한 줄 (경로, 크기/수정 시각, 내용 해시, 파서/분석 버전, 결과 행과 그 해시,
+오류) 을 파일 끝에 덧붙이기만 한다. 같은 journal 로 다시 실행하면 파일마다 마지막 기록을 보고
+
+- 파일 내용과 파서/분석 버전이 같고 오류가 없던 파일은 기록된 결과를 그대로 쓰고 (분석 생략)
+- 오류가 있었거나, 내용이 바뀌었거나, 파서/분석 버전이 올라간 파일만 다시 분석한다.
+
+크기/수정 시각이 같으면 내용 해시를 다시 구하지 않는다 (달라졌을 때만 내용을 읽어 비교).
+다시 분석한 파일의 내용 해시는 분석과 함께 작업 프로세스에서 구해 record 에 넘긴다 (batch --journal).
+기록은 한 줄씩 바로 flush 하므로 프로세스가 중간에 죽어도 그때까지 끝난 파일은 남는다
+(마지막 줄이 잘렸으면 읽을 때 건너뛴다).
+"""
+import hashlib
+import json
+import os
+import time
+
+from .analysis import ANALYSIS_VERSION
+from .archive import split_member
+from .cache import try_content_hash
+from .parsers import FILE_KINDS, PARSER_VERSIONS
+
+# journal 줄 형식 버전 - 형식이 바뀌면 올릴 것 (다른 버전의 줄은 무시)
+JOURNAL_FORMAT = 1
+
+
+def analysis_version(file_path):
+    """파일 종류의 파서 버전과 분석 버전 (지원하지 않는 형식이면 분석 버전만)"""
+    kind = FILE_KINDS.get(os.path.splitext(file_path)[1].lower())
+    if kind is None:
+        return f"-:{ANALYSIS_VERSION}"
+    return f"{kind}:{PARSER_VERSIONS[kind]}:{ANALYSIS_VERSION}"
+
+
+def file_stat(file_path):
+    """[크기, 수정 시각 (ns)] - 압축 파일 안의 파일은 압축 파일의 값, 없으면 None"""
+    try:
+        stat = os.stat(split_member(file_path)[0])
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def result_hash(row):
+    """결과 행의 해시 (경로 제외) - 다시 분석한 결과가 이전과 같은지 비교하는 데 쓴다"""
+    values = {key: value for key, value in row.items() if key != 'path'}
+    text = json.dumps(values, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class BatchJournal:
+    """
+    덧붙이기 전용 배치 분석 기록
+
+    Parameters:
+    path (str): journal 파일 경로 (없으면 만든다)
+
+    Attributes:
+    entries (dict): 절대 경로 -> 마지막 기록 (dict)
+    skipped_lines (int): 읽지 못한 줄 수 (잘린 마지막 줄 등)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.skipped_lines = 0
+        self._hashes = {}  # lookup 에서 구한 내용 해시 (record 에서 다시 읽지 않도록)
+        self._load()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    def _load(self):
+        try:
+            file = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        with file:
+            data = file.read()
+        for line in data.splitlines():
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                self.skipped_lines += 1
+                continue
+            if not isinstance(entry, dict) or entry.get('format') != JOURNAL_FORMAT:
+                self.skipped_lines += 1
+                continue
+            self.entries[entry['path']] = entry
+        if data and not data.endswith(b'\n'):
+            # 잘린 마지막 줄 뒤에 이어 쓰지 않도록 줄을 끝낸다
+            with open(self.path, 'ab') as file:
+                file.write(b'\n')
+
+    def lookup(self, file_path):
+        """
+        다시 분석하지 않아도 되는 파일이면 기록된 결과 행, 아니면 None
+
+        오류로 끝났던 파일, 버전이 바뀐 파일, 내용이 바뀐 파일 (또는 읽을 수 없는 파일) 은 None.
+        """
+        key = os.path.abspath(file_path)
+        entry = self.entries.get(key)
+        if entry is None or entry['error'] or entry['version'] != analysis_version(file_path):
+            return None
+        stat = file_stat(file_path)
+        if stat is None:
+            return None
+        if stat != entry['stat']:
+            # 복사/압축 등으로 수정 시각만 바뀐 경우 - 내용이 같으면 그대로 쓰고 새 크기/시각을 기록
+            digest = try_content_hash(file_path)
+            self._hashes[key] = digest
+            if digest is None or digest != entry['hash']:
+                return None
+            self._append(dict(entry, stat=stat, time=_now()))
+        row = dict(entry['result'])
+        row['path'] = file_path
+        return row
+
+    def record(self, row, seconds=None, digest=None):
+        """
+        분석 결과 행 기록
+
+        Parameters:
+        row (dict): analyze_file 결과 행
+        seconds (float): 분석에 걸린 시간
+        digest (str): 작업 프로세스에서 구한 파일 내용 해시
+            (None 이면 lookup 에서 구한 값을 쓰고, 그것도 없으면 여기서 파일을 읽어 구한다)
+
+        Returns:
+        bool: 같은 파일의 이전 기록 (오류 없음) 과 결과가 다르면 True
+        """
+        file_path = row['path']
+        key = os.path.abspath(file_path)
+        cached = self._hashes.pop(key, None)
+        digest = digest or cached or try_content_hash(file_path)
+        result = {name: value for name, value in row.items() if name != 'path'}
+        entry = {'format': JOURNAL_FORMAT, 'path': key, 'stat': file_stat(file_path),
+                 'hash': digest, 'version': analysis_version(file_path),
+                 'result': result, 'result_hash': result_hash(row),
+                 'error': row.get('error', ''), 'seconds': seconds, 'time': _now()}
+        old = self.entries.get(key)
+        self._append(entry)
+        return (old is not None and not old['error'] and not entry['error']
+                and old['result_hash'] != entry['result_hash'])
+
+    def _append(self, entry):
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()
+        self.entries[entry['path']] = entry
+
+    def errors(self):
+        """마지막 기록이 오류인 (경로, 오류 메시지) 목록"""
+        return [(path, entry['error']) for path, entry in sorted(self.entries.items())
+                if entry['error']]
+
+
+def _now():
+    return time.strftime('%Y-%m-%d %H:%M:%S')
@@ -0,0 +1,242 @@
+"""
+백그라운드 파일 로딩
+
+파싱과 지표 계산을 작업 스레드 (또는 프로세스 풀) 에서 실행하고, 완료된 파일을
+큐에 넣는다. GUI 는 root.after 로 poll() 을 주기적으로 호출하여 결과를 하나씩 반영한다.
+작업자는 파일을 묶음 (최대 LOAD_CHUNK 개) 으로 받아, 캐시에 없는 파일을 모두 읽은 뒤
+SOBP 중심 정규화를 normalize_batch 한 번으로 계산한다.
+"""
+import math
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from . import profiling
+from .analysis import compute_metrics
+from .cache import content_hash
+from .ensemble import normalize_batch
+from .parsers import read_file, read_meta
+
+# 작업자에게 한 번에 넘기는 최대 파일 수 (클수록 정규화 묶음이 커지고, 작을수록 첫 곡선이 빨리 보임)
+LOAD_CHUNK = 16
+
+
+def _set_metrics(entry, metrics):
+    """지표 기록 - 계산할 수 없으면 곡선은 표시하고 지표만 비워 둔다"""
+    try:
+        entry['metrics'] = metrics or compute_metrics(entry['depth'], entry['dose'])
+    except ValueError as e:
+        entry['metrics_error'] = str(e)
+
+
+def _describe(entry):
+    """결과 데이터베이스에 저장할 파일 내용 해시와 헤더 메타데이터 (읽을 수 없으면 넣지 않음)"""
+    try:
+        digest = content_hash(entry['path'])
+        entry['meta'] = read_meta(entry['path'], entry['kind'])
+    except (OSError, KeyError, ValueError):
+        # 곡선은 이미 읽었으므로 표시는 하고, 결과 데이터베이스에만 저장하지 않는다
+        return
+    entry['content_hash'] = digest
+
+
+def load_entries(file_paths, cache=None, describe=False):
+    """
+    파일 여러 개를 읽어 정규화된 곡선과 지표를 dict 목록으로 반환 (작업자에서 실행)
+
+    캐시에 있는 파일은 캐시 값을 쓰고, 나머지는 모두 읽은 뒤 정규화를 한 번에 계산하여
+    캐시에 저장한다. 오류는 예외 대신 파일마다 'error' 항목에 기록한다.
+
+    Parameters:
+    file_paths (list): 파일 경로
+    cache (CurveCache): 곡선 캐시 (선택)
+    describe (bool): True 이면 ResultsDB.add 에 넘길 'content_hash' 와 'meta' 도 구한다
+        (GUI 스레드에서 파일을 다시 읽지 않도록)
+
+    Returns:
+    list: 입력 순서의 dict (path, file, kind, depth, dose, metrics, error [, metrics_error,
+        content_hash, meta])
+    """
+    entries = []
+    raw = []
+    for file_path in file_paths:
+        entry = {'path': file_path, 'file': os.path.basename(file_path),
+                 'kind': '', 'depth': None, 'dose': None, 'metrics': {}, 'error': ''}
+        entries.append(entry)
+        with profiling.file_context(file_path), profiling.stage('file'):
+            try:
+                cached = cache.get(file_path) if cache is not None else None
+                if cached is not None:
+                    depth, dose, kind, metrics = cached
+                    entry.update(kind=kind, depth=depth, dose=dose)
+                    _set_metrics(entry, metrics)
+                    continue
+                depth, dose, kind = read_file(file_path)
+                entry.update(kind=kind, depth=np.asarray(depth, dtype=float), dose=dose)
+                raw.append(entry)
+            except Exception as e:
+                entry['error'] = f"{type(e).__name__}: {e}"
+    if raw:
+        with profiling.stage('normalize', files=len(raw)):
+            normalized, valid = normalize_batch([entry['dose'] for entry in raw])
+        for entry, dose, ok in zip(raw, normalized, valid):
+            if not ok:
+                # normalize_dose 와 같은 오류 메시지
+                reason = "선량 데이터가 없습니다." if not len(entry['dose']) \
+                    else "SOBP 영역(90%/95%)을 찾을 수 없습니다."
+                entry.update(depth=None, dose=None, error=f"ValueError: {reason}")
+                continue
+            entry['dose'] = dose
+            with profiling.file_context(entry['path']):
+                _set_metrics(entry, None)
+                if cache is not None:
+                    cache.put(entry['path'], entry['depth'], dose, entry['kind'], entry['metrics'])
+    if describe:
+        for entry in entries:
+            if not entry['error']:
+                _describe(entry)
+    return entries
+
+
+def load_entry(file_path, cache=None, describe=False):
+    """
+    파일 하나를 읽어 정규화된 곡선과 지표를 dict 로 반환 (작업자에서 실행)
+
+    오류는 예외 대신 'error' 항목에 기록한다 (load_entries 참조).
+    """
+    return load_entries([file_path], cache, describe)[0]
+
+
+class BackgroundLoader:
+    """
+    파일 목록을 작업자에서 불러오는 로더
+
+    Parameters:
+    cache (CurveCache): 작업자가 사용할 곡선 캐시 (선택)
+    workers (int): 작업자 수 (None 이면 CPU 코어 수, 최대 8)
+    use_processes (bool): True 이면 스레드 대신 프로세스 풀 사용
+    describe (bool): True 이면 결과에 내용 해시와 헤더 메타데이터 포함 (load_entries 참조)
+    """
+
+    def __init__(self, cache=None, workers=None, use_processes=False, describe=False):
+        self.cache = cache
+        self.describe = describe
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.use_processes = use_processes
+        self._executor = None
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._job = 0
+        self._futures = []
+        self._total = 0
+        self._done = 0
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.use_processes:
+                # multiprocessing 은 프로세스 풀을 쓸 때만 불러온다
+                from concurrent.futures import ProcessPoolExecutor
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def start(self, file_paths):
+        """새 로딩 작업 시작 (진행 중인 작업은 취소)"""
+        self.cancel()
+        with self._lock:
+            self._job += 1
+            self._total = 0
+            self._done = 0
+            job = self._job
+        self._futures = []
+        self.add(file_paths)
+        return job
+
+    def add(self, file_paths):
+        """진행 중인 작업에 파일 추가 (취소하지 않음, 감시 폴더처럼 파일이 조금씩 들어올 때 사용)"""
+        file_paths = list(file_paths)
+        with self._lock:
+            job = self._job
+            first = self._total
+            self._total += len(file_paths)
+
+        executor = self._get_executor()
+        # 작업자마다 몇 묶음씩 돌아가도록 나누되, 묶음은 LOAD_CHUNK 개 이하
+        size = max(1, min(LOAD_CHUNK, math.ceil(len(file_paths) / (self.workers * 2))))
+        for start in range(0, len(file_paths), size):
+            chunk = file_paths[start:start + size]
+            future = executor.submit(load_entries, chunk, self.cache, self.describe)
+            future.add_done_callback(
+                lambda f, job=job, start=first + start, chunk=chunk:
+                self._on_done(job, start, chunk, f))
+            self._futures.append(future)
+        self._futures = [future for future in self._futures if not future.done()]
+        return job
+
+    def _on_done(self, job, start, chunk, future):
+        # 작업자 스레드에서 호출됨 - 큐에만 넣고 GUI 는 건드리지 않는다
+        if future.cancelled():
+            return
+        exc = future.exception()
+        if exc is not None:
+            entries = [{'path': path, 'file': os.path.basename(path),
+                        'error': f"{type(exc).__name__}: {exc}"} for path in chunk]
+        else:
+            entries = future.result()
+        for index, entry in enumerate(entries, start=start):
+            entry['index'] = index
+            self._results.put((job, entry))
+
+    def poll(self, max_items=None):
+        """
+        완료된 결과를 꺼낸다 (기다리지 않음)
+
+        취소되었거나 이전 작업의 결과는 버린다.
+
+        Returns:
+        list: load_entry 결과 dict 목록 (완료 순서, 'index' 는 입력 순서)
+        """
+        entries = []
+        while max_items is None or len(entries) < max_items:
+            try:
+                job, entry = self._results.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                if job != self._job:
+                    continue
+                self._done += 1
+            entries.append(entry)
+        return entries
+
+    @property
+    def progress(self):
+        """(완료된 파일 수, 전체 파일 수)"""
+        with self._lock:
+            return self._done, self._total
+
+    @property
+    def busy(self):
+        """아직 반영되지 않은 결과가 있으면 True"""
+        done, total = self.progress
+        return done < total
+
+    def cancel(self):
+        """진행 중인 작업 취소 - 시작되지 않은 파일은 건너뛰고, 실행 중인 파일의 결과는 버린다"""
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+        with self._lock:
+            self._job += 1
+            self._total = self._done
+
+    def shutdown(self):
+        """작업자 종료"""
+        self.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,186 @@
+"""
+다중 선량 레벨 distal/proximal 깊이 계산
+
+임의 개수의 선량 레벨을 곡선당 한 번의 벡터 연산으로 계산한다.
+dose 가 1차원이면 (레벨 수,), 2차원 (곡선 수, 점 수) 이면 (레벨 수, 곡선 수) 배열을 반환한다.
+
+- distal L%: L% 이상인 마지막 점 i 와 다음 점 i+1 사이의 선형 내삽
+- proximal L%: L% 이상인 첫 점 j 와 이전 점 j-1 사이의 선형 내삽
+
+해당 교차점이 없으면 NaN.
+"""
+import numpy as np
+
+from . import profiling
+
+
+def level_name(prefix, level):
+    """레벨 이름 (예: 'D', 90 -> 'D90', 'D', 97.5 -> 'D97.5')"""
+    level = float(level)
+    return f"{prefix}{int(level) if level.is_integer() else level:g}"
+
+
+def _as_stack(depth, dose):
+    """depth/dose 를 (곡선 수, 점 수) 배열로 맞추고 dose 가 1차원이었는지 반환"""
+    dose = np.asarray(dose, dtype=float)
+    single = dose.ndim == 1
+    dose = np.atleast_2d(dose)
+    depth = np.asarray(depth, dtype=float)
+    if depth.shape != dose.shape:
+        depth = np.broadcast_to(depth, dose.shape)
+    return depth, dose, single
+
+
+def _batched_searchsorted(rows, levels):
+    """
+    오름차순인 각 행에서 levels 의 삽입 위치 (side='left') 를 한 번에 계산
+
+    행마다 값 범위를 겹치지 않게 이동시켜 평탄화한 배열 하나에 대해 searchsorted 를 호출한다.
+
+    Returns:
+    array: (레벨 수, 곡선 수) 정수 배열
+    """
+    n_curves, n_points = rows.shape
+    lo = min(rows.min(), levels.min()) - 1.0
+    span = max(rows.max(), levels.max()) + 1.0 - lo
+    offsets = np.arange(n_curves)[:, None] * span - lo
+    flat = (rows + offsets).ravel()
+    queries = levels[:, None] + offsets[:, 0][None, :]
+    positions = np.searchsorted(flat, queries.ravel(), side='left').reshape(queries.shape)
+    return positions - np.arange(n_curves)[None, :] * n_points
+
+
+def _interpolate(depth, dose, levels, lower, upper, valid):
+    """lower/upper 인덱스 사이에서 levels 에 해당하는 깊이를 선형 내삽"""
+    cols = np.arange(dose.shape[0])[None, :]
+    lower = np.where(valid, lower, 0)
+    upper = np.where(valid, upper, 0)
+    x0, x1 = depth[cols, lower], depth[cols, upper]
+    y0, y1 = dose[cols, lower], dose[cols, upper]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = x0 + (levels[:, None] - y0) * (x1 - x0) / (y1 - y0)
+    return np.where(valid & np.isfinite(x), x, np.nan)
+
+
+def _single_depths(depth, dose, levels, distal):
+    """
+    곡선 하나 (1차원, NaN 없음) 의 distal/proximal 깊이 - 곡선 여러 개용 평탄화/인덱싱 없이 계산
+
+    곡선 하나에서는 (곡선 수, 점 수) 로 맞추는 준비 비용이 계산보다 커서 따로 처리한다.
+    결과는 distal_depths/proximal_depths 와 같다.
+    """
+    n_points = dose.size
+    if n_points < 2:
+        # 점이 2개 미만이면 교차점이 없다 (아래 인덱싱이 범위를 넘지 않도록 먼저 처리)
+        return np.full(levels.shape, np.nan)
+    if distal:
+        suffix_max = np.maximum.accumulate(dose[::-1])
+        lower = n_points - np.searchsorted(suffix_max, levels, side='left') - 1
+    else:
+        prefix_max = np.maximum.accumulate(dose)
+        lower = np.searchsorted(prefix_max, levels, side='left') - 1
+    valid = (lower >= 0) & (lower < n_points - 1)
+    lower = np.where(valid, lower, 0)
+    x0, x1 = depth[lower], depth[lower + 1]
+    y0, y1 = dose[lower], dose[lower + 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = x0 + (levels - y0) * (x1 - x0) / (y1 - y0)
+    return np.where(valid & np.isfinite(x), x, np.nan)
+
+
+def _is_single(depth, dose):
+    """1차원 곡선 하나이고 NaN 이 없으면 True (_single_depths 사용 가능)"""
+    return (isinstance(dose, np.ndarray) and dose.ndim == 1 and dose.dtype == float
+            and isinstance(depth, np.ndarray) and depth.shape == dose.shape
+            and depth.dtype == float and not np.isnan(dose).any())
+
+
+def _finite_dose(dose):
+    """NaN (예: 길이가 다른 곡선의 채움값) 을 가장 작은 값으로 바꾼 선량 배열"""
+    if np.isnan(dose).any():
+        return np.where(np.isnan(dose), np.nanmin(dose) - 1.0, dose)
+    return dose
+
+
+def distal_depths(depth, dose, levels):
+    """
+    distal 레벨 깊이 계산
+
+    Parameters:
+    depth (array): 깊이 (N,) 또는 (C, N)
+    dose (array): 정규화된 선량 (N,) 또는 (C, N)
+    levels (list/array): 선량 레벨 (%)
+
+    Returns:
+    array: (레벨 수,) 또는 (레벨 수, C) 깊이 (mm)
+    """
+    levels = np.atleast_1d(np.asarray(levels, dtype=float))
+    if _is_single(depth, dose):
+        return _single_depths(depth, dose, levels, distal=True)
+    depth, dose, single = _as_stack(depth, dose)
+    n_points = dose.shape[1]
+    finite = _finite_dose(dose)
+
+    # 뒤에서부터의 누적 최대값은 (뒤집으면) 오름차순이므로
+    # "L 이상인 점의 개수" = N - searchsorted 로 마지막 인덱스를 구할 수 있다
+    suffix_max = np.maximum.accumulate(finite[:, ::-1], axis=1)
+    last = n_points - _batched_searchsorted(suffix_max, levels) - 1
+
+    valid = (last >= 0) & (last < n_points - 1)
+    result = _interpolate(depth, dose, levels, last, last + 1, valid)
+    return result[:, 0] if single else result
+
+
+def proximal_depths(depth, dose, levels):
+    """
+    proximal 레벨 깊이 계산
+
+    Parameters:
+    depth (array): 깊이 (N,) 또는 (C, N)
+    dose (array): 정규화된 선량 (N,) 또는 (C, N)
+    levels (list/array): 선량 레벨 (%)
+
+    Returns:
+    array: (레벨 수,) 또는 (레벨 수, C) 깊이 (mm)
+    """
+    levels = np.atleast_1d(np.asarray(levels, dtype=float))
+    if _is_single(depth, dose):
+        return _single_depths(depth, dose, levels, distal=False)
+    depth, dose, single = _as_stack(depth, dose)
+    n_points = dose.shape[1]
+    finite = _finite_dose(dose)
+
+    # 앞에서부터의 누적 최대값은 오름차순 -> L 이상인 첫 인덱스
+    prefix_max = np.maximum.accumulate(finite, axis=1)
+    first = _batched_searchsorted(prefix_max, levels)
+
+    valid = (first >= 1) & (first < n_points)
+    result = _interpolate(depth, dose, levels, first - 1, first, valid)
+    return result[:, 0] if single else result
+
+
+def level_depths(depth, dose, distal=(), proximal=()):
+    """
+    distal/proximal 레벨 깊이를 이름별로 반환
+
+    Returns:
+    dict: 'D90', 'P95' 등 -> 깊이 (스칼라 또는 (C,) 배열)
+    """
+    result = {}
+    if len(distal):
+        with profiling.stage('metrics.distal', levels=len(distal)):
+            values = distal_depths(depth, dose, distal)
+        for level, value in zip(distal, values):
+            result[level_name('D', level)] = value
+    if len(proximal):
+        with profiling.stage('metrics.proximal', levels=len(proximal)):
+            values = proximal_depths(depth, dose, proximal)
+        for level, value in zip(proximal, values):
+            result[level_name('P', level)] = value
+    return result
+
+
+def distal_falloff_width(depth, dose, upper=80, lower=20):
+    """distal fall-off 폭 (D{lower} - D{upper}, mm)"""
+    upper_depth, lower_depth = distal_depths(depth, dose, [upper, lower])
+    return lower_depth - upper_depth
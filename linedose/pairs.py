@@ -0,0 +1,59 @@
+"""
+계획/측정 파일 짝짓기와 GUI 표/보고서가 함께 쓰는 이름
+
+GUI 표 (linedose.table) 가 보고서 모듈 (matplotlib, 프로세스 풀, 캐시를 불러옴) 없이 쓸 수 있도록
+가벼운 모듈로 둔다.
+"""
+import os
+import re
+
+from .parsers import file_kind
+
+# 감마 통과율 행 이름 (기준: 측정, 평가: 계획, 3%/3mm global - GUI 표와 보고서에서 같음)
+GAMMA_ROW = 'Gamma 3%/3mm'
+
+# 계획/측정 파일을 짝지을 때 이름에서 무시하는 단어
+_PAIR_WORDS = re.compile(r'plan(?:ned)?|measure(?:d|ment)?|meas|raystation|zebra', re.IGNORECASE)
+
+
+def pair_key(file_path):
+    """짝짓기 키: 폴더 + 계획/측정을 나타내는 단어와 구분자를 뺀 파일 이름"""
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    stem = re.sub(r'[^0-9a-z]+', '', _PAIR_WORDS.sub('', stem).lower())
+    return os.path.dirname(os.path.abspath(file_path)), stem
+
+
+def pair_files(file_paths):
+    """
+    계획/측정 파일 짝짓기
+
+    같은 폴더에서 계획/측정 단어를 뺀 이름이 같은 파일끼리 (예: plan_001.txt 와 measured_001.csv)
+    짝짓고, 남은 파일이 폴더에 계획 하나와 측정 하나뿐이면 그 둘을 짝짓는다.
+    짝이 없는 파일은 한쪽만 있는 쌍이 된다.
+
+    Returns:
+    list: (계획 경로 또는 None, 측정 경로 또는 None) 목록
+    """
+    groups = {}
+    for path in file_paths:
+        kind = file_kind(path)
+        groups.setdefault(pair_key(path), {'plan': [], 'measurement': []})[kind].append(path)
+
+    pairs = []
+    leftovers = {}
+    for (directory, _), group in sorted(groups.items()):
+        plans = sorted(group['plan'])
+        measured = sorted(group['measurement'])
+        n_pairs = min(len(plans), len(measured))
+        pairs.extend(zip(plans[:n_pairs], measured[:n_pairs]))
+        rest = leftovers.setdefault(directory, {'plan': [], 'measurement': []})
+        rest['plan'].extend(plans[n_pairs:])
+        rest['measurement'].extend(measured[n_pairs:])
+
+    for directory, rest in sorted(leftovers.items()):
+        if len(rest['plan']) == 1 and len(rest['measurement']) == 1:
+            pairs.append((rest['plan'][0], rest['measurement'][0]))
+            continue
+        pairs.extend((path, None) for path in rest['plan'])
+        pairs.extend((None, path) for path in rest['measurement'])
+    return sorted(pairs, key=lambda pair: pair[0] or pair[1])
@@ -0,0 +1,347 @@
+"""
+Line-dose 파일 파서 (Zebra/IBA CSV, RayStation TXT)
+
+파일을 한 줄씩 읽지 않고 mmap 으로 열어 섹션 표식(marker)의 위치만 찾은 뒤,
+숫자 블록을 np.fromstring 으로 한 번에 NumPy 배열로 변환한다.
+블록 형식이 예상과 다를 때만 줄 단위 처리로 되돌아간다.
+
+한 파일에 곡선이 여러 개 있으면 (여러 에너지의 Zebra 세션, 빔/라인별 RayStation 출력)
+iter_curves() 가 곡선을 하나씩 (헤더 메타데이터와 함께) 필요할 때 읽어 돌려준다.
+extract_csv_data / extract_txt_data 는 첫 번째 곡선만 반환한다.
+"""
+import mmap
+import os
+import re
+import warnings
+from collections import namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+
+from . import profiling
+from .archive import read_member, split_member
+
+# 확장자별 파일 종류
+FILE_KINDS = {
+    '.csv': 'measurement',
+    '.txt': 'plan',
+}
+
+# 확장자별 장비/소프트웨어
+FILE_MODALITIES = {
+    '.csv': 'Zebra/IBA',
+    '.txt': 'RayStation',
+}
+
+# 파일 종류별 파서 버전 - 파싱 결과가 달라지는 변경을 하면 올릴 것 (캐시 무효화)
+PARSER_VERSIONS = {
+    'measurement': 2,
+    'plan': 3,
+}
+
+# 섹션 표식
+CSV_DEPTH_MARKER = b"Curve depth: [mm]"
+CSV_DOSE_MARKER = b"Curve gains: [counts]"
+TXT_DATA_MARKER = b"Distance(cm)   Dose (cGy)"
+
+# 공백만 있는 줄 (CSV 선량 블록의 끝)
+_BLANK_LINE = re.compile(rb'^[ \t\r\f\v]*$', re.MULTILINE)
+# 숫자로 시작하지 않는 줄 (TXT 데이터 블록의 끝)
+_TEXT_LINE = re.compile(rb'^[ \t]*[^-+.0-9\s]', re.MULTILINE)
+# 'key: value' 또는 'key;value' 형식의 헤더 줄
+_META_LINE = re.compile(rb'^[ \t]*([^:;\r\n]*[^:;\r\n0-9 \t.+-][^:;\r\n]*?)[ \t]*[:;][ \t]*(.*?)[ \t;]*\r?$',
+                        re.MULTILINE)
+# NumPy 2.x 의 np.fromstring 은 숫자가 아닌 값에서 ValueError 를 낸다 (1.x 는 경고 후 앞부분만 반환)
+_FROMSTRING_RAISES = int(np.__version__.split('.')[0]) >= 2
+
+# 파일 안의 곡선 하나 - index: 파일 안의 순서 (0 부터), meta: 곡선 앞 헤더의 key -> value
+CurveRecord = namedtuple('CurveRecord', ['index', 'depth', 'dose', 'meta'])
+
+
+@contextmanager
+def open_buffer(file_path):
+    """
+    파일 전체를 읽기 전용 mmap 버퍼로 연다 (빈 파일은 b'')
+
+    실제 디스크 읽기는 버퍼에 처음 접근할 때 일어나므로, 계측의 'read' 단계는 열기/매핑만,
+    나머지는 'parse' 단계에 포함된다.
+    압축 파일 안의 파일 키 ('압축 파일/내부 경로') 이면 그 파일만 메모리에서 풀어 bytes 로 돌려준다.
+    """
+    if split_member(file_path)[1] is not None:
+        with profiling.stage('read'):
+            buf = read_member(file_path)
+        yield buf
+        return
+    with profiling.stage('read'):
+        file = open(file_path, "rb")
+        try:
+            buf = b""
+            if os.fstat(file.fileno()).st_size > 0:
+                buf = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            file.close()
+            raise
+    try:
+        yield buf
+    finally:
+        if buf:
+            buf.close()
+        file.close()
+
+
+def decode_numbers(block, sep=b' '):
+    """
+    숫자 블록(bytes)을 float64 배열로 한 번에 변환
+
+    sep 는 공백 외의 구분자 (예: b';'). 줄바꿈과 공백은 항상 구분자로 취급한다.
+    숫자가 아닌 내용이 섞여 있으면 ValueError.
+    """
+    if sep != b' ':
+        block = block.replace(sep, b' ')
+    # np.fromstring 은 공백만 있는 문자열에 대해 [-1.] 을 반환하므로 따로 처리
+    if not block.strip():
+        return np.empty(0)
+    if _FROMSTRING_RAISES:
+        return np.fromstring(block, sep=' ')
+    # NumPy 1.x 는 숫자가 아닌 값에서 예외 대신 DeprecationWarning 을 내고 그 앞까지만 돌려주므로
+    # 경고는 숨기고 값의 개수를 직접 확인한다
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        values = np.fromstring(block, sep=' ')
+    count = _count_values(block)
+    if values.size != count:
+        raise ValueError(f"숫자가 아닌 값이 있습니다 (값 {count}개 중 {values.size}개만 변환)")
+    return values
+
+
+def _count_values(block):
+    """
+    공백으로 구분된 값의 개수 - 값마다 bytes 를 만드는 split() 대신 공백 -> 값 경계를 센다
+
+    공백과 제어 문자 (byte 값 32 이하) 를 모두 구분자로 본다. 제어 문자만으로 된 값은 세지 않지만,
+    그 앞에서 np.fromstring 이 멈추면 뒤의 숫자가 빠지므로 개수가 달라져 그대로 찾아진다.
+    """
+    space = np.frombuffer(block, dtype=np.uint8) <= 32
+    return int(np.count_nonzero(space[:-1] > space[1:])) + (not space[0])
+
+
+def _line_end(buf, pos):
+    """pos 가 속한 줄의 다음 줄 시작 위치"""
+    end = buf.find(b"\n", pos)
+    return len(buf) if end < 0 else end + 1
+
+
+def _line_start(buf, pos):
+    """pos 가 속한 줄의 시작 위치"""
+    return buf.rfind(b"\n", 0, pos) + 1
+
+
+def parse_meta(block):
+    """헤더 블록의 'key: value' (또는 'key;value') 줄을 dict 로 (bytes -> str)"""
+    if isinstance(block, memoryview):
+        block = block.tobytes()
+    return {key.decode('utf-8', 'replace').strip(): value.decode('utf-8', 'replace').strip()
+            for key, value in _META_LINE.findall(block)}
+
+
+def _csv_curve(buf, depth_pos):
+    """
+    depth_pos 의 'Curve depth: [mm]' 부터 곡선 하나 해석
+
+    Returns:
+    tuple: (depth, dose, 곡선이 끝난 위치)
+    """
+    dose_pos = buf.find(CSV_DOSE_MARKER, depth_pos)
+    next_pos = buf.find(CSV_DEPTH_MARKER, depth_pos + len(CSV_DEPTH_MARKER))
+    if next_pos >= 0 and dose_pos > next_pos:
+        # 선량 섹션이 없는 곡선 - 다음 곡선의 선량을 가져오지 않도록
+        dose_pos = -1
+
+    start = _line_end(buf, depth_pos)
+    if dose_pos >= 0:
+        end = _line_start(buf, dose_pos)
+    else:
+        end = _line_start(buf, next_pos) if next_pos >= 0 else len(buf)
+    depth = decode_numbers(buf[start:max(start, end)], sep=b';')
+
+    dose = np.empty(0)
+    if dose_pos >= 0:
+        start = _line_end(buf, dose_pos)
+        blank = _BLANK_LINE.search(buf, start)
+        end = blank.start() if blank else len(buf)
+        dose = decode_numbers(buf[start:end], sep=b';')
+    return depth, dose, end
+
+
+def parse_csv_buffer(buf):
+    """
+    Zebra/IBA CSV 버퍼에서 첫 번째 곡선의 (depth, dose) 배열 추출
+
+    depth: 'Curve depth: [mm]' 다음 줄부터 'Curve gains: [counts]' 줄 전까지
+    dose: 'Curve gains: [counts]' 다음 줄부터 첫 빈 줄 전까지
+    """
+    depth_pos = buf.find(CSV_DEPTH_MARKER)
+    if depth_pos < 0:
+        dose_pos = buf.find(CSV_DOSE_MARKER)
+        if dose_pos < 0:
+            return np.empty(0), np.empty(0)
+        # depth 섹션 없이 선량만 있는 경우
+        start = _line_end(buf, dose_pos)
+        blank = _BLANK_LINE.search(buf, start)
+        return np.empty(0), decode_numbers(buf[start:blank.start() if blank else len(buf)],
+                                           sep=b';')
+    depth, dose, _ = _csv_curve(buf, depth_pos)
+    return depth, dose
+
+
+def iter_csv_buffer(buf):
+    """Zebra/IBA CSV 버퍼의 곡선을 순서대로 CurveRecord 로 (필요할 때 하나씩 해석)"""
+    pos = 0
+    index = 0
+    while True:
+        depth_pos = buf.find(CSV_DEPTH_MARKER, pos)
+        if depth_pos < 0:
+            return
+        meta = parse_meta(buf[pos:_line_start(buf, depth_pos)])
+        depth, dose, pos = _csv_curve(buf, depth_pos)
+        yield CurveRecord(index, depth, dose, meta)
+        index += 1
+
+
+def _txt_curve(buf, marker_pos):
+    """
+    marker_pos 의 'Distance(cm)   Dose (cGy)' 부터 곡선 하나 해석
+
+    데이터는 숫자로 시작하지 않는 첫 줄 (다음 곡선의 헤더 등) 전까지.
+
+    Returns:
+    tuple: (depth[mm], dose[cGy], 데이터가 끝난 위치)
+    """
+    start = _line_end(buf, marker_pos)
+    text = _TEXT_LINE.search(buf, start)
+    end = text.start() if text else len(buf)
+    values = _decode_columns(buf[start:end], 2)
+    # cm to mm 변환
+    return values[:, 0] * 10, values[:, 1], end
+
+
+def parse_txt_buffer(buf):
+    """
+    RayStation TXT 버퍼에서 첫 번째 곡선의 (depth[mm], dose[cGy]) 배열 추출
+
+    'Distance(cm)   Dose (cGy)' 다음 줄부터 값이 두 개인 줄만 읽는다.
+    """
+    marker_pos = buf.find(TXT_DATA_MARKER)
+    if marker_pos < 0:
+        return np.empty(0), np.empty(0)
+    depth, dose, _ = _txt_curve(buf, marker_pos)
+    return depth, dose
+
+
+def iter_txt_buffer(buf):
+    """RayStation TXT 버퍼의 곡선 (빔/라인별 블록) 을 순서대로 CurveRecord 로"""
+    pos = 0
+    index = 0
+    while True:
+        marker_pos = buf.find(TXT_DATA_MARKER, pos)
+        if marker_pos < 0:
+            return
+        meta = parse_meta(buf[pos:_line_start(buf, marker_pos)])
+        depth, dose, pos = _txt_curve(buf, marker_pos)
+        yield CurveRecord(index, depth, dose, meta)
+        index += 1
+
+
+def _decode_columns(block, ncols):
+    """
+    각 줄에 값이 ncols 개씩 있는 블록을 (N, ncols) 배열로 변환
+
+    빠른 경로: 블록 전체를 한 번에 변환한 뒤, 값의 개수가 줄 수 x ncols 와 일치하는지 확인.
+    주석이나 다른 섹션이 섞여 있으면 값이 ncols 개인 줄만 골라 변환한다.
+    """
+    content = block.strip()
+    if not content:
+        return np.empty((0, ncols))
+
+    try:
+        values = decode_numbers(content)
+    except ValueError:
+        values = None
+
+    if values is None or values.size != ncols * (content.count(b"\n") + 1):
+        rows = [line for line in content.splitlines() if len(line.split()) == ncols]
+        values = decode_numbers(b"\n".join(rows))
+
+    return values.reshape(-1, ncols)
+
+
+def extract_csv_data(csv_file):
+    """CSV 파일에서 깊이와 선량 데이터 추출"""
+    with open_buffer(csv_file) as buf, profiling.stage('parse'):
+        return parse_csv_buffer(buf)
+
+
+def extract_txt_data(txt_file):
+    """TXT 파일에서 깊이와 선량 데이터 추출"""
+    with open_buffer(txt_file) as buf, profiling.stage('parse'):
+        return parse_txt_buffer(buf)
+
+
+def iter_curves(file_path, kind=None):
+    """
+    파일 안의 모든 곡선을 하나씩 돌려주는 generator
+
+    파일은 mmap 으로 열려 있고, 다음 곡선을 요청할 때 그 부분만 해석하므로
+    곡선이 많은 파일도 전체를 메모리에 올리지 않고 골라서 분석할 수 있다.
+
+    Parameters:
+    file_path (str): CSV (Zebra/IBA) 또는 TXT (RayStation) 파일
+    kind (str): 'measurement' 또는 'plan' (None 이면 확장자로 판별)
+
+    Returns:
+    generator: CurveRecord (index, depth[mm], dose, meta)
+    """
+    if kind is None:
+        kind = file_kind(file_path)
+    iterate = iter_csv_buffer if kind == 'measurement' else iter_txt_buffer
+    with open_buffer(file_path) as buf:
+        yield from iterate(buf)
+
+
+def read_meta(file_path, kind=None):
+    """
+    파일 첫 곡선 앞 헤더의 메타데이터 (곡선 데이터는 해석하지 않음, 곡선이 없으면 빈 dict)
+
+    iter_curves() 의 첫 CurveRecord.meta 와 같다.
+    """
+    if kind is None:
+        kind = file_kind(file_path)
+    marker = CSV_DEPTH_MARKER if kind == 'measurement' else TXT_DATA_MARKER
+    with open_buffer(file_path) as buf:
+        pos = buf.find(marker)
+        if pos < 0:
+            return {}
+        return parse_meta(buf[:_line_start(buf, pos)])
+
+
+def file_kind(file_path):
+    """확장자로 파일 종류('plan' 또는 'measurement') 판별"""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext not in FILE_KINDS:
+        raise ValueError(f"지원되지 않는 파일 형식: {ext}")
+    return FILE_KINDS[ext]
+
+
+def file_modality(file_path):
+    """확장자로 데이터 출처 (예: 'RayStation', 'Zebra/IBA') 판별, 모르면 ''"""
+    return FILE_MODALITIES.get(os.path.splitext(file_path)[1].lower(), '')
+
+
+def read_file(file_path):
+    """확장자에 따라 적절한 파서로 (depth, dose, kind) 반환"""
+    kind = file_kind(file_path)
+    if kind == 'measurement':
+        depth, dose = extract_csv_data(file_path)
+    else:
+        depth, dose = extract_txt_data(file_path)
+    return depth, dose, kind
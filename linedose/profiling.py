@@ -0,0 +1,238 @@
+"""
+처리 단계별 시간/메모리 계측
+
+    from linedose import profiling
+    profiling.enable(memory=True)
+    ...
+    profiling.get_profiler().export('session.json')            # 요약 + 이벤트
+    profiling.get_profiler().export('session.trace.json', 'chrome')  # chrome://tracing, Perfetto
+
+계측 지점은 `with profiling.stage('parse'):` 로 표시한다. 꺼져 있으면 (기본값) stage() 는
+아무 일도 하지 않는 공유 context manager 를 돌려주므로 비용은 함수 호출 한 번 정도이다.
+file_context(path) 안에서 기록된 단계는 해당 파일의 단계로 묶인다.
+
+memory=True 이면 tracemalloc 으로 단계마다 할당량 (끝 - 시작) 과 최대 증가량을 기록한다.
+tracemalloc 은 프로세스 전체를 보므로 여러 스레드가 동시에 일할 때는 값이 섞인다.
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+# 계측이 꺼져 있을 때 돌려주는 context manager (재사용 가능)
+_NULL = nullcontext()
+
+_profiler = None
+_local = threading.local()
+
+
+class Profiler:
+    """
+    단계 이벤트 기록기
+
+    Parameters:
+    memory (bool): tracemalloc 으로 단계별 메모리 할당도 기록 (느려짐)
+    """
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.events = []
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name, file=None, **args):
+        if file is None:
+            file = getattr(_local, 'file', None)
+        if self.memory:
+            # 스레드별 [시작 시 사용량, 안쪽 단계들의 최대 사용량] 스택
+            stack = _memory_stack()
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                # reset_peak 로 바깥 단계의 최대값이 사라지지 않도록 먼저 옮겨 둔다
+                stack[-1][1] = max(stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            stack.append([current, 0])
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter_ns() - start
+            event = {'name': name, 'file': file, 'start_ns': start,
+                     'duration_ns': duration, 'pid': self.pid,
+                     'tid': threading.get_ident()}
+            if args:
+                event['args'] = args
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                begin, inner_peak = stack.pop()
+                peak = max(peak, inner_peak)
+                event['alloc_bytes'] = current - begin
+                event['peak_bytes'] = max(peak - begin, 0)
+                if stack:
+                    stack[-1][1] = max(stack[-1][1], peak)
+            with self._lock:
+                self.events.append(event)
+
+    def merge(self, events):
+        """다른 프로세스에서 기록한 이벤트 추가 (pid 로 구분됨)"""
+        with self._lock:
+            self.events.extend(events)
+
+    def clear(self):
+        with self._lock:
+            self.events = []
+
+    def summary(self):
+        """
+        단계별 합계
+
+        Returns:
+        dict: {'session': {단계: 통계}, 'files': {파일: {단계: 통계}}}
+            통계는 count, total_ms, mean_ms, max_ms (+ memory=True 이면 alloc_mb, peak_mb)
+        """
+        session = {}
+        files = {}
+        for event in list(self.events):
+            _accumulate(session, event)
+            if event['file']:
+                _accumulate(files.setdefault(event['file'], {}), event)
+        for table in [session] + list(files.values()):
+            for stats in table.values():
+                stats['mean_ms'] = stats['total_ms'] / stats['count']
+        return {'session': session, 'files': files}
+
+    def report(self, top=None):
+        """단계별 합계 표 (문자열), 오래 걸린 단계부터"""
+        session = self.summary()['session']
+        rows = sorted(session.items(), key=lambda item: item[1]['total_ms'], reverse=True)
+        lines = [f"{'stage':<20}{'count':>7}{'total [ms]':>12}{'mean [ms]':>11}{'max [ms]':>10}"]
+        for name, stats in rows[:top]:
+            line = (f"{name:<20}{stats['count']:>7}{stats['total_ms']:>12.2f}"
+                    f"{stats['mean_ms']:>11.3f}{stats['max_ms']:>10.2f}")
+            if 'peak_mb' in stats:
+                line += f"  peak {stats['peak_mb']:.2f} MB"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """Chrome trace 형식 dict (chrome://tracing, https://ui.perfetto.dev 에서 열기)"""
+        events = list(self.events)
+        # 시각은 perf_counter 기준 (프로세스 간 공통) - 첫 이벤트를 0 으로
+        origin = min((event['start_ns'] for event in events), default=0)
+        trace = []
+        for event in events:
+            args = dict(event.get('args', {}))
+            if event['file']:
+                args['file'] = event['file']
+            for key in ('alloc_bytes', 'peak_bytes'):
+                if key in event:
+                    args[key] = event[key]
+            trace.append({'name': event['name'], 'cat': 'linedose', 'ph': 'X',
+                          'ts': (event['start_ns'] - origin) / 1e3, 'dur': event['duration_ns'] / 1e3,
+                          'pid': event['pid'], 'tid': event['tid'], 'args': args})
+        return {'traceEvents': trace, 'displayTimeUnit': 'ms'}
+
+    def export(self, file_path, format=None):
+        """
+        기록을 파일로 저장
+
+        Parameters:
+        file_path (str): 저장 경로
+        format (str): 'json' (요약 + 이벤트) 또는 'chrome' (None 이면 파일 이름이
+            .trace.json 으로 끝날 때 'chrome', 그 외 'json')
+        """
+        if format is None:
+            format = 'chrome' if file_path.endswith('.trace.json') else 'json'
+        if format == 'chrome':
+            data = self.chrome_trace()
+        elif format == 'json':
+            data = dict(self.summary(), events=list(self.events))
+        else:
+            raise ValueError(f"지원되지 않는 형식: {format}")
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump(data, file, indent=1)
+
+
+def _memory_stack():
+    stack = getattr(_local, 'memory_stack', None)
+    if stack is None:
+        stack = _local.memory_stack = []
+    return stack
+
+
+def _accumulate(table, event):
+    stats = table.get(event['name'])
+    if stats is None:
+        stats = table[event['name']] = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+    duration_ms = event['duration_ns'] / 1e6
+    stats['count'] += 1
+    stats['total_ms'] += duration_ms
+    stats['max_ms'] = max(stats['max_ms'], duration_ms)
+    if 'alloc_bytes' in event:
+        stats['alloc_mb'] = stats.get('alloc_mb', 0.0) + event['alloc_bytes'] / 1e6
+        stats['peak_mb'] = max(stats.get('peak_mb', 0.0), event['peak_bytes'] / 1e6)
+
+
+def enable(memory=False):
+    """계측 시작 (이미 켜져 있으면 기존 기록기 사용)"""
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler(memory=memory)
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    return _profiler
+
+
+def disable():
+    """계측 중지 - 기록한 Profiler 를 반환"""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is not None and profiler.memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return profiler
+
+
+def get_profiler():
+    """현재 Profiler (꺼져 있으면 None)"""
+    return _profiler
+
+
+def stage(name, file=None, **args):
+    """단계 하나를 계측하는 context manager (꺼져 있으면 아무 일도 하지 않음)"""
+    if _profiler is None:
+        return _NULL
+    return _profiler.stage(name, file, **args)
+
+
+@contextmanager
+def _file_scope(file_path):
+    previous = getattr(_local, 'file', None)
+    _local.file = file_path
+    try:
+        yield
+    finally:
+        _local.file = previous
+
+
+def file_context(file_path):
+    """이 안에서 기록되는 단계를 file_path 의 단계로 묶는다 (꺼져 있으면 아무 일도 하지 않음)"""
+    if _profiler is None:
+        return _NULL
+    return _file_scope(file_path)
+
+
+def profiled(name):
+    """함수 전체를 한 단계로 계측하는 decorator"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _profiler is None:
+                return func(*args, **kwargs)
+            with _profiler.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,453 @@
+"""
+깊이-선량 곡선 렌더링
+
+- 파일마다 Line2D 하나를 유지하고, 바뀐 곡선만 갱신/삭제한다 (ax.clear() 없음)
+- 곡선을 화면 해상도에 맞게 줄인다 (픽셀 열마다 처음/최소/최대/마지막 점 유지 -> 피크와 fall-off 보존)
+- 오버레이(크로스헤어 등)는 blitting 으로 배경을 다시 그리지 않고 갱신한다
+- 크로스헤어 값 읽기는 곡선마다 한 번 준비한 배열에서 searchsorted (O(log n)) 로 찾고,
+  마우스 이동 중 다시 그리기는 화면 주사율 정도로 제한한다
+
+matplotlib 객체는 전달받은 Axes 로만 다루므로 이 모듈은 matplotlib 을 import 하지 않는다.
+"""
+import numpy as np
+
+# 픽셀 열 하나당 유지하는 최대 점 수 (처음/최소/최대/마지막)
+POINTS_PER_PIXEL = 4
+# 크로스헤어 다시 그리기 최소 간격 (초, 약 60 Hz)
+CROSSHAIR_INTERVAL = 1 / 60
+
+
+def decimate_minmax(x, y, n_buckets):
+    """
+    곡선을 n_buckets 개 구간으로 나누어 각 구간의 처음/최소/최대/마지막 점만 남긴다
+
+    x 는 오름차순이라고 가정한다. 점 수가 4 * n_buckets 이하이면 그대로 반환.
+
+    Returns:
+    tuple: (x, y) 줄어든 배열
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n_points = y.size
+    n_buckets = max(int(n_buckets), 1)
+    if n_points <= POINTS_PER_PIXEL * n_buckets:
+        return x, y
+
+    size = n_points // n_buckets
+    n_full = n_buckets * size
+    blocks = y[:n_full].reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+
+    keep = [offsets, offsets + size - 1,
+            offsets + blocks.argmin(axis=1), offsets + blocks.argmax(axis=1)]
+    if n_full < n_points:
+        # 나누어 떨어지지 않는 마지막 구간
+        tail = y[n_full:]
+        keep.append(np.array([n_full, n_points - 1,
+                              n_full + tail.argmin(), n_full + tail.argmax()]))
+
+    indices = np.unique(np.concatenate(keep))
+    return x[indices], y[indices]
+
+
+def visible_slice(x, xlim):
+    """xlim 안의 점과 양쪽 바깥 한 점씩을 포함하는 slice (x 오름차순)"""
+    lo, hi = sorted(xlim)
+    start = max(int(np.searchsorted(x, lo, side='left')) - 1, 0)
+    stop = min(int(np.searchsorted(x, hi, side='right')) + 1, len(x))
+    return slice(start, stop)
+
+
+def _same_array(a, b):
+    """같은 메모리 영역을 같은 모양으로 가리키는 배열이면 True"""
+    if a is b:
+        return True
+    return (a.shape == b.shape and a.dtype == b.dtype and a.strides == b.strides
+            and a.__array_interface__['data'][0] == b.__array_interface__['data'][0])
+
+
+class CurveRenderer:
+    """
+    Axes 위의 곡선을 키(파일)별 Line2D 로 관리하는 렌더러
+
+    Parameters:
+    ax (Axes): 그릴 Axes
+    colormap (callable): 인덱스 -> 색상 (예: get_cmap('tab10'))
+    n_colors (int): 색상 순환 개수
+    """
+
+    def __init__(self, ax, colormap, n_colors=10):
+        self.ax = ax
+        self.colormap = colormap
+        self.n_colors = n_colors
+        self._curves = {}  # 키 -> {'x', 'y', 'line'}
+        self._color_index = 0
+        self._legend_labels = None
+        self._pixel_width = None
+        ax.callbacks.connect('xlim_changed', self._on_view_changed)
+        ax.figure.canvas.mpl_connect('resize_event', self._on_view_changed)
+
+    def __contains__(self, key):
+        return key in self._curves
+
+    def __len__(self):
+        return len(self._curves)
+
+    def keys(self):
+        return list(self._curves)
+
+    def line(self, key):
+        """키에 해당하는 Line2D"""
+        return self._curves[key]['line']
+
+    def _n_buckets(self):
+        width = self.ax.bbox.width
+        return max(int(width), 1)
+
+    def _display_data(self, x, y):
+        """
+        현재 보이는 x 범위와 화면 폭에 맞게 줄인 (x, y)
+
+        x 축이 자동 범위이면 보이는 범위로 자르지 않는다 - 잘린 데이터로 범위가 정해지기 때문
+        """
+        if x.size > 1 and x[0] <= x[-1]:
+            if self.ax.get_autoscalex_on():
+                return decimate_minmax(x, y, self._n_buckets())
+            window = visible_slice(x, self.ax.get_xlim())
+            return decimate_minmax(x[window], y[window], self._n_buckets())
+        return x, y
+
+    def set_curve(self, key, x, y, label=None, **style):
+        """
+        곡선 추가 또는 갱신 - 같은 메모리의 배열이면 데이터는 다시 설정하지 않는다
+
+        Returns:
+        Line2D: 해당 곡선의 artist
+        """
+        x = np.asarray(x)
+        y = np.asarray(y)
+        curve = self._curves.get(key)
+        if curve is not None:
+            line = curve['line']
+            if not (_same_array(curve['x'], x) and _same_array(curve['y'], y)):
+                curve['x'], curve['y'] = x, y
+                line.set_data(*self._display_data(x, y))
+            if label is not None and line.get_label() != label:
+                line.set_label(label)
+            if style:
+                line.set(**style)
+            return line
+
+        if not self._curves:
+            self._color_index = 0
+        style.setdefault('color', self.colormap(self._color_index % self.n_colors))
+        self._color_index += 1
+        line, = self.ax.plot(*self._display_data(x, y), label=label or str(key), **style)
+        self._curves[key] = {'x': x, 'y': y, 'line': line}
+        return line
+
+    def remove_curve(self, key):
+        """곡선 삭제"""
+        curve = self._curves.pop(key, None)
+        if curve is not None:
+            curve['line'].remove()
+
+    def sync(self, curves):
+        """
+        curves 와 같아지도록 바뀐 곡선만 추가/갱신/삭제
+
+        Parameters:
+        curves (dict): 키 -> (x, y, style dict)
+        """
+        for key in [key for key in self._curves if key not in curves]:
+            self.remove_curve(key)
+        for key, (x, y, style) in curves.items():
+            self.set_curve(key, x, y, **style)
+
+    def update_legend(self):
+        """곡선 이름 목록이 바뀌었을 때만 범례 다시 만들기"""
+        labels = tuple(curve['line'].get_label() for curve in self._curves.values())
+        if labels == self._legend_labels:
+            return
+        self._legend_labels = labels
+        legend = self.ax.get_legend()
+        if legend is not None:
+            legend.remove()
+        if labels:
+            self.ax.legend()
+
+    def redecimate(self):
+        """보이는 범위나 화면 폭이 바뀌었을 때 모든 곡선을 다시 줄인다"""
+        for curve in self._curves.values():
+            curve['line'].set_data(*self._display_data(curve['x'], curve['y']))
+
+    def _on_view_changed(self, *args):
+        width = self.ax.bbox.width
+        if args and getattr(args[0], 'name', None) == 'resize_event' and width == self._pixel_width:
+            return
+        self._pixel_width = width
+        self.redecimate()
+
+    def draw(self):
+        """범례를 맞추고 화면 갱신 예약"""
+        self.update_legend()
+        self.ax.figure.canvas.draw_idle()
+
+
+class OverlayBlitter:
+    """
+    오버레이 artist 를 blitting 으로 갱신
+
+    전체 그림이 그려질 때 (draw_event) 배경을 저장해 두고, update() 에서는
+    배경을 복원한 뒤 오버레이만 다시 그린다.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self._background = None
+        self._artists = []
+        canvas.mpl_connect('draw_event', self._on_draw)
+
+    def add_artist(self, artist):
+        """오버레이 artist 등록 (animated 로 설정되어 일반 그리기에서는 제외됨)"""
+        artist.set_animated(True)
+        self._artists.append(artist)
+
+    def remove_artist(self, artist):
+        self._artists.remove(artist)
+        artist.remove()
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        figure = self.canvas.figure
+        for artist in self._artists:
+            figure.draw_artist(artist)
+
+    def update(self):
+        """배경 복원 후 오버레이만 다시 그리기"""
+        if self._background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._background)
+        self._draw_artists()
+        self.canvas.blit(self.canvas.figure.bbox)
+        self.canvas.flush_events()
+
+
+class CurveProbe:
+    """
+    곡선 값 읽기 (크로스헤어용)
+
+    곡선마다 깊이 오름차순 배열과 선량의 뒤쪽 누적 최대값 (suffix max) 을 한 번 준비해 두고,
+    마우스가 움직일 때는 searchsorted 만 한다 (곡선을 훑지 않음).
+
+    - dose_at(depth): 깊이에서의 선량 (선형 내삽, 곡선 범위 밖이면 NaN)
+    - depth_at(level): level 이상인 마지막 점과 다음 점 사이의 distal 깊이
+      (linedose.metrics.distal_depths 와 같은 정의, 교차점이 없으면 NaN)
+    """
+
+    def __init__(self):
+        self._curves = {}  # 키 -> {'x', 'y', 'source', 'suffix_max'}
+
+    def __contains__(self, key):
+        return key in self._curves
+
+    def __len__(self):
+        return len(self._curves)
+
+    def keys(self):
+        return list(self._curves)
+
+    def set_curve(self, key, x, y):
+        """곡선 준비 (같은 메모리의 배열이면 다시 준비하지 않음)"""
+        x = np.asarray(x)
+        y = np.asarray(y)
+        curve = self._curves.get(key)
+        if curve is not None and _same_array(curve['source'][0], x) \
+                and _same_array(curve['source'][1], y):
+            return
+        source = (x, y)
+        x = x.astype(float)
+        y = y.astype(float)
+        if x.size > 1 and np.any(np.diff(x) < 0):
+            order = np.argsort(x, kind='stable')
+            x, y = x[order], y[order]
+        # suffix_max[k] = max(y[n-1-k:]) - 오름차순이므로 searchsorted 가능
+        suffix_max = np.maximum.accumulate(y[::-1])
+        self._curves[key] = {'x': x, 'y': y, 'source': source, 'suffix_max': suffix_max}
+
+    def remove_curve(self, key):
+        self._curves.pop(key, None)
+
+    def sync(self, curves):
+        """curves (키 -> (x, y)) 와 같아지도록 바뀐 곡선만 준비/삭제"""
+        for key in [key for key in self._curves if key not in curves]:
+            self.remove_curve(key)
+        for key, (x, y) in curves.items():
+            self.set_curve(key, x, y)
+
+    def dose_at(self, depth):
+        """키 -> depth 에서의 선량"""
+        result = {}
+        for key, curve in self._curves.items():
+            x, y = curve['x'], curve['y']
+            if x.size < 2 or not x[0] <= depth <= x[-1]:
+                result[key] = float('nan')
+                continue
+            i = min(max(int(np.searchsorted(x, depth, side='right')), 1), x.size - 1)
+            x0, x1, y0, y1 = x[i - 1], x[i], y[i - 1], y[i]
+            result[key] = float(y0 if x1 == x0 else y0 + (depth - x0) * (y1 - y0) / (x1 - x0))
+        return result
+
+    def depth_at(self, level):
+        """키 -> level (선량) 의 distal 깊이"""
+        result = {}
+        for key, curve in self._curves.items():
+            x, y = curve['x'], curve['y']
+            n_points = y.size
+            # level 이상인 점이 있는 마지막 위치 = suffix max 가 level 이상인 마지막 위치
+            last = n_points - int(np.searchsorted(curve['suffix_max'], level, side='left')) - 1
+            if last < 0 or last >= n_points - 1 or y[last + 1] == y[last]:
+                result[key] = float('nan')
+                continue
+            x0, x1, y0, y1 = x[last], x[last + 1], y[last], y[last + 1]
+            result[key] = float(x0 + (level - y0) * (x1 - x0) / (y1 - y0))
+        return result
+
+
+class Crosshair:
+    """
+    마우스 위치의 크로스헤어와 곡선별 값 표시
+
+    세로선 깊이에서 각 곡선의 선량과, 가로선 선량 레벨에서 각 곡선의 distal 깊이를 찾아
+    callback 으로 넘긴다. 왼쪽 클릭으로 현재 선량 레벨을 고정하거나 풀 수 있다.
+    선과 표시점은 OverlayBlitter 로만 다시 그리며, 마우스 이동이 빨라도 interval 초에 한 번만
+    그린다 (마지막 위치는 타이머로 반드시 그린다).
+    곡선별 값 글자는 캔버스에 그리지 않는다 - Agg 로 글자 수십 줄을 그리면 한 번에 100 ms 가 넘게
+    걸리므로 GUI 의 위젯에 표시하도록 callback 으로 넘긴다 (format_readout 참조).
+
+    Parameters:
+    ax (Axes): 곡선이 그려진 Axes
+    blitter (OverlayBlitter): 오버레이 갱신기
+    callback (callable): (깊이, 선량 레벨, readout() 목록) 을 받는 함수, 숨길 때는 (None, None, [])
+    interval (float): 다시 그리기 최소 간격 (초)
+    """
+
+    def __init__(self, ax, blitter, callback=None, interval=CROSSHAIR_INTERVAL):
+        self.ax = ax
+        self.blitter = blitter
+        self.callback = callback
+        self.probe = CurveProbe()
+        self.labels = {}
+        self.level = None
+        self._pending = None
+        self._waiting = False
+
+        # 축 범위 자동 조정에 영향을 주지 않도록 axvline/axhline 대신 좌표계를 섞은 선을 쓴다
+        line_style = {'color': '0.3', 'linewidth': 0.8, 'linestyle': ':',
+                      'scalex': False, 'scaley': False}
+        self.vline, = ax.plot([0.0, 0.0], [0.0, 1.0], transform=ax.get_xaxis_transform(),
+                              **line_style)
+        self.hline, = ax.plot([0.0, 1.0], [0.0, 0.0], transform=ax.get_yaxis_transform(),
+                              **line_style)
+        self.markers, = ax.plot([], [], 'o', markersize=4, markerfacecolor='none', color='k',
+                                scalex=False, scaley=False)
+        self._artists = (self.vline, self.hline, self.markers)
+        for artist in self._artists:
+            artist.set_visible(False)
+            blitter.add_artist(artist)
+
+        canvas = ax.figure.canvas
+        self._timer = canvas.new_timer(interval=max(int(interval * 1000), 1))
+        self._timer.single_shot = True
+        self._timer.add_callback(self._on_timer)
+        canvas.mpl_connect('motion_notify_event', self.on_move)
+        canvas.mpl_connect('axes_leave_event', self.on_leave)
+        canvas.mpl_connect('button_press_event', self.on_click)
+
+    def set_curves(self, curves):
+        """curves: 키 -> (x, y, 표시 이름)"""
+        self.probe.sync({key: (x, y) for key, (x, y, _) in curves.items()})
+        self.labels = {key: label for key, (_, _, label) in curves.items()}
+
+    def readout(self, depth, level):
+        """
+        (깊이, 선량 레벨) 에서의 곡선별 값
+
+        Returns:
+        list: (표시 이름, 선량, distal 깊이) 목록
+        """
+        doses = self.probe.dose_at(depth)
+        depths = self.probe.depth_at(level)
+        return [(self.labels.get(key, str(key)), doses[key], depths[key]) for key in doses]
+
+    def on_move(self, event):
+        if event.inaxes is not self.ax or event.xdata is None:
+            return
+        self._pending = (event.xdata, event.ydata)
+        if not self._waiting:
+            self._flush()
+            self._waiting = True
+            self._timer.start()
+
+    def on_leave(self, event):
+        self._pending = None
+        self.hide()
+
+    def on_click(self, event):
+        """왼쪽 클릭: 선량 레벨 고정/해제"""
+        if event.inaxes is not self.ax or event.button != 1 or event.ydata is None:
+            return
+        self.level = None if self.level is not None else float(event.ydata)
+        self._pending = (event.xdata, event.ydata)
+        self._flush()
+
+    def _on_timer(self):
+        self._waiting = False
+        if self._pending is not None:
+            self._flush()
+            self._waiting = True
+            self._timer.start()
+
+    def _flush(self):
+        if self._pending is None:
+            return
+        depth, dose = self._pending
+        self._pending = None
+        level = dose if self.level is None else self.level
+        rows = self.readout(depth, level)
+
+        self.vline.set_xdata([depth, depth])
+        self.hline.set_ydata([level, level])
+        xs = [depth] * len(rows) + [row[2] for row in rows]
+        ys = [row[1] for row in rows] + [level] * len(rows)
+        self.markers.set_data(xs, ys)
+        for artist in self._artists:
+            artist.set_visible(True)
+        self.blitter.update()
+        if self.callback is not None:
+            self.callback(depth, level, rows)
+
+    def hide(self):
+        """크로스헤어 숨기기"""
+        if self.vline.get_visible():
+            for artist in self._artists:
+                artist.set_visible(False)
+            self.blitter.update()
+            if self.callback is not None:
+                self.callback(None, None, [])
+
+
+def format_readout(depth, level, rows, fixed=False):
+    """크로스헤어 값 글자 (첫 줄: 깊이/레벨, 이후 곡선마다 '이름  선량 %  distal 깊이 mm')"""
+    lock = ' (fixed)' if fixed else ''
+    lines = [f"depth {depth:.2f} mm   level {level:.1f} %{lock}"]
+    width = max((len(row[0]) for row in rows), default=0)
+    for label, dose, distal in rows:
+        dose_text = '    -' if np.isnan(dose) else f"{dose:5.1f}"
+        depth_text = '      -' if np.isnan(distal) else f"{distal:7.2f}"
+        lines.append(f"{label:<{width}}  {dose_text} %  {depth_text} mm")
+    return "\n".join(lines)
@@ -0,0 +1,322 @@
+"""
+오프스크린 QA 보고서 (그래프 + Range & SOBP 표)
+
+사용법:
+    python -m linedose.report [-j N] [-o 보고서폴더] [--format png pdf] 파일 또는 폴더 ...
+
+계획 (TXT) 과 측정 (CSV) 파일을 짝지어 쌍마다 보고서 하나를 Agg 백엔드로 그린다 (화면 불필요).
+작업 프로세스마다 Figure 를 한 번만 만들고, 보고서마다 곡선 데이터와 표 글자만 바꾸어 저장한다.
+"""
+import argparse
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from . import profiling
+from .analysis import METRIC_NAMES, compute_metrics, load_curve
+from .batch import collect_files, default_workers
+from .cache import CurveCache
+from .gamma import gamma_1d
+from .pairs import GAMMA_ROW, pair_files
+
+# 표의 행 순서
+REPORT_ROWS = ('file',) + tuple(METRIC_NAMES) + (GAMMA_ROW,)
+REPORT_FORMATS = ('png', 'pdf')
+# 보고서 목록 CSV 컬럼
+INDEX_COLUMNS = ('plan', 'measured', 'reports', 'error')
+
+# 작업 프로세스마다 재사용하는 ReportRenderer
+_renderer = None
+
+
+def report_name(pair):
+    """보고서 파일 이름 (확장자 제외) - 계획 파일 이름, 없으면 측정 파일 이름"""
+    return os.path.splitext(os.path.basename(pair[0] or pair[1]))[0]
+
+
+def table_values(plan=None, measured=None):
+    """
+    표의 계획/측정 열 값
+
+    지표나 감마를 계산할 수 없으면 그 값은 비워 두고 'error' 항목에 메시지를 남긴다
+    (감마 오류는 감마 값이 들어가는 계획 열에 기록).
+
+    Parameters:
+    plan, measured: (이름, depth, dose, metrics) 또는 None (metrics 가 비어 있으면 계산)
+
+    Returns:
+    tuple: ({행: 계획 값}, {행: 측정 값}) 문자열 dict
+    """
+    columns = []
+    for curve in (plan, measured):
+        values = {}
+        if curve is not None:
+            name, depth, dose, metrics = curve
+            values['file'] = name
+            try:
+                metrics = metrics or compute_metrics(depth, dose)
+                for metric in METRIC_NAMES:
+                    values[metric] = f"{metrics[metric]:.2f} mm"
+            except ValueError as e:
+                values['error'] = f"{name}: {type(e).__name__}: {e}"
+        columns.append(values)
+
+    if plan is not None and measured is not None:
+        try:
+            result = gamma_1d(measured[1], measured[2], plan[1], plan[2])
+            columns[0][GAMMA_ROW] = f"{result.pass_rate:.1f} %"
+        except ValueError as e:
+            message = f"{GAMMA_ROW}: {type(e).__name__}: {e}"
+            columns[0]['error'] = '; '.join(filter(None, (columns[0].get('error'), message)))
+    return columns[0], columns[1]
+
+
+class ReportRenderer:
+    """
+    재사용하는 보고서 Figure (Agg, pyplot 사용 안 함)
+
+    Figure, Axes, 표를 한 번만 만들고 render() 때마다 곡선 데이터, 범례, 표 글자만 바꾼다.
+
+    Parameters:
+    figsize (tuple): 크기 (inch, 기본값 A4 세로)
+    dpi (int): PNG 해상도
+    """
+
+    def __init__(self, figsize=(8.27, 11.69), dpi=150):
+        # matplotlib 은 처음 그릴 때 불러온다 (보고서를 저장하지 않으면 불러오지 않음)
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.dpi = dpi
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(self.figure)
+        self.title = self.figure.suptitle('', fontsize=12)
+
+        self.ax = self.figure.add_axes([0.1, 0.45, 0.85, 0.48])
+        self.ax.set_xlabel('depth (mm)')
+        self.ax.set_ylabel('dose (%)')
+        self.ax.grid(True)
+        self._lines = []
+
+        table_ax = self.figure.add_axes([0.1, 0.04, 0.85, 0.33])
+        table_ax.axis('off')
+        self.table = table_ax.table(
+            cellText=[[row, '', ''] for row in REPORT_ROWS],
+            colLabels=['Parameter', 'Plan', 'Measured'],
+            colWidths=[0.25, 0.375, 0.375], loc='upper center', cellLoc='center')
+        self.table.auto_set_font_size(False)
+        self.table.set_fontsize(9)
+        self.table.scale(1, 1.6)
+
+    def _line(self, index):
+        while len(self._lines) <= index:
+            self._lines.append(self.ax.plot([], [])[0])
+        return self._lines[index]
+
+    def render(self, output_paths, curves, plan_values=None, measured_values=None, title=''):
+        """
+        보고서 그리기 및 저장
+
+        Parameters:
+        output_paths (list): 저장 경로 (확장자로 형식 결정, 예: .png, .pdf)
+        curves (list): (이름, depth, dose, kind) - kind 가 'plan' 이면 실선, 그 외 점선
+        plan_values, measured_values (dict): 표의 {행: 값} (table_values 결과)
+        title (str): 제목
+        """
+        max_depth = 300.0
+        max_dose = 110.0
+        for index, (name, depth, dose, kind) in enumerate(curves):
+            line = self._line(index)
+            line.set_data(depth, dose)
+            line.set_label(name)
+            line.set_color(f"C{index % 10}")
+            line.set_linestyle('-' if kind == 'plan' else '--')
+            line.set_visible(True)
+            if len(depth):
+                max_depth = max(max_depth, float(max(depth)))
+                max_dose = max(max_dose, 1.05 * float(max(dose)))
+        for line in self._lines[len(curves):]:
+            line.set_visible(False)
+            line.set_label('_hidden')
+        self.ax.set_xlim(0, max_depth)
+        self.ax.set_ylim(0, max_dose)
+        if curves:
+            self.ax.legend(handles=self._lines[:len(curves)], loc='lower left', fontsize=8)
+        elif self.ax.get_legend() is not None:
+            self.ax.get_legend().remove()
+
+        plan_values = plan_values or {}
+        measured_values = measured_values or {}
+        for row, name in enumerate(REPORT_ROWS, start=1):
+            self.table[row, 1].get_text().set_text(_shorten(plan_values.get(name, '')))
+            self.table[row, 2].get_text().set_text(_shorten(measured_values.get(name, '')))
+        self.title.set_text(title)
+
+        for path in output_paths:
+            self.figure.savefig(path, dpi=self.dpi)
+
+
+def _shorten(text, width=40):
+    """표 칸에 들어가도록 긴 글자 줄이기 (앞부분 생략)"""
+    return text if len(text) <= width else '...' + text[-(width - 3):]
+
+
+def _get_renderer():
+    global _renderer
+    if _renderer is None:
+        _renderer = ReportRenderer()
+    return _renderer
+
+
+def _load(file_path, cache=None):
+    """(이름, depth, dose, metrics) - 지표 계산에 실패하면 metrics 는 빈 dict"""
+    if cache is not None:
+        depth, dose, _, metrics = cache.load(file_path)
+    else:
+        depth, dose, _ = load_curve(file_path)
+        try:
+            metrics = compute_metrics(depth, dose)
+        except ValueError:
+            metrics = {}
+    return os.path.basename(file_path), depth, dose, metrics
+
+
+def render_pair(pair, output_dir, formats=('png',), cache=None, name=None):
+    """
+    계획/측정 쌍 하나의 보고서를 output_dir 에 저장
+
+    오류가 발생해도 예외를 던지지 않고 'error' 항목에 메시지를 기록한다. 지표나 감마만 계산할 수
+    없으면 그 칸을 비운 보고서를 저장하고 오류도 기록한다.
+
+    Returns:
+    dict: {'plan', 'measured', 'reports' (';' 로 구분한 경로), 'error'}
+    """
+    plan_path, measured_path = pair
+    row = {'plan': plan_path or '', 'measured': measured_path or '', 'reports': '', 'error': ''}
+    with profiling.file_context(plan_path or measured_path), profiling.stage('report'):
+        try:
+            plan = _load(plan_path, cache) if plan_path else None
+            measured = _load(measured_path, cache) if measured_path else None
+            curves = [(curve[0], curve[1], curve[2], kind)
+                      for curve, kind in ((plan, 'plan'), (measured, 'measurement'))
+                      if curve is not None]
+            plan_values, measured_values = table_values(plan, measured)
+            title = ' / '.join(curve[0] for curve in curves)
+
+            name = name or report_name(pair)
+            outputs = [os.path.join(output_dir, f"{name}.{fmt}") for fmt in formats]
+            _get_renderer().render(outputs, curves, plan_values, measured_values, title)
+            row['reports'] = ';'.join(outputs)
+            row['error'] = '; '.join(values['error'] for values in (plan_values, measured_values)
+                                     if values.get('error'))
+        except Exception as e:
+            row['error'] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def _render_task(task, output_dir, formats, cache):
+    pair, name = task
+    return render_pair(pair, output_dir, formats, cache, name)
+
+
+def render_reports(pairs, output_dir, formats=('png',), workers=None, chunksize=None, cache=None):
+    """
+    쌍마다 보고서를 프로세스 풀에서 그려 입력 순서대로 결과 행 목록을 반환
+
+    Parameters:
+    pairs (list): (계획 경로, 측정 경로) - 한쪽은 None 가능 (pair_files 결과)
+    output_dir (str): 보고서 폴더 (없으면 만든다)
+    formats (tuple): 'png' 및/또는 'pdf'
+    workers (int): 작업 프로세스 수 (None 이면 CPU 코어 수, 1 이면 현재 프로세스에서 실행)
+    chunksize (int): 작업자에게 한 번에 넘길 쌍의 수 (None 이면 자동)
+    cache (CurveCache): 지정하면 캐시된 곡선과 지표를 사용
+
+    Returns:
+    list: render_pair 결과 dict 목록
+    """
+    for fmt in formats:
+        if fmt not in REPORT_FORMATS:
+            raise ValueError(f"지원되지 않는 보고서 형식: {fmt}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    # 이름이 겹치는 보고서 (다른 폴더의 같은 파일 이름) 는 번호를 붙인다
+    tasks = []
+    used = {}
+    for pair in pairs:
+        name = report_name(pair)
+        count = used.get(name, 0)
+        used[name] = count + 1
+        tasks.append((pair, name if count == 0 else f"{name}_{count + 1}"))
+
+    render = partial(_render_task, output_dir=output_dir, formats=tuple(formats), cache=cache)
+    workers = workers or default_workers()
+    workers = max(1, min(workers, len(tasks)))
+    if workers == 1:
+        return [render(task) for task in tasks]
+
+    if chunksize is None:
+        # 작업자당 4 덩어리 - 같은 프로세스에서 Figure 를 여러 번 재사용
+        chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(render, tasks, chunksize=chunksize))
+
+
+def write_index(rows, output):
+    """보고서 목록 CSV 저장"""
+    with open(output, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=INDEX_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m linedose.report',
+        description='계획/측정 쌍마다 Line-dose QA 보고서 (PNG/PDF) 생성')
+    parser.add_argument('inputs', nargs='+', help='TXT/CSV 파일, 폴더 또는 zip/tar 파일')
+    parser.add_argument('-o', '--output', default='reports', help='보고서 폴더 (기본값: reports)')
+    parser.add_argument('-f', '--format', nargs='+', choices=REPORT_FORMATS, default=['png'],
+                        help='보고서 형식 (기본값: png)')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='작업 프로세스 수 (기본값: CPU 코어 수)')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='작업자에게 한 번에 넘길 쌍의 수 (기본값: 자동)')
+    parser.add_argument('-r', '--recursive', action='store_true', help='하위 폴더까지 검색')
+    parser.add_argument('--include', metavar='PATTERN', action='append', default=None,
+                        help='폴더/압축 파일에서 이름이 맞는 파일만 (예: "*150MeV*.csv", 여러 번 지정 가능)')
+    parser.add_argument('--cache', metavar='DIR', nargs='?', const='', default=None,
+                        help='파싱 결과 캐시 사용 (폴더 생략 시 기본 사용자 캐시 폴더)')
+    parser.add_argument('--index', metavar='PATH', default=None,
+                        help='보고서 목록 CSV (기본값: 보고서 폴더의 reports.csv)')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    files = collect_files(args.inputs, recursive=args.recursive, patterns=args.include)
+    if not files:
+        print("보고서를 만들 파일이 없습니다.", file=sys.stderr)
+        return 1
+
+    try:
+        pairs = pair_files(files)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    cache = CurveCache(args.cache or None) if args.cache is not None else None
+    rows = render_reports(pairs, args.output, formats=args.format, workers=args.workers,
+                          chunksize=args.chunksize, cache=cache)
+    write_index(rows, args.index or os.path.join(args.output, 'reports.csv'))
+
+    failed = [row for row in rows if row['error']]
+    for row in failed:
+        print(f"보고서 오류 ({row['plan'] or row['measured']}): {row['error']}", file=sys.stderr)
+    print(f"{len(rows)}개 보고서 생성 (오류 {len(failed)}개): {args.output}", file=sys.stderr)
+    return 0 if not failed else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
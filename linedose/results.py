@@ -0,0 +1,445 @@
+"""
+분석 결과 데이터베이스 (SQLite)
+
+분석한 곡선마다 지표를 숫자로 저장하여 날짜/에너지/장비별 추세를 조회한다.
+같은 내용의 파일 (SHA-256) 을 다시 넣으면 아무 일도 하지 않는다. 단, 분석 오류로 저장된 파일은
+다시 넣을 때 다시 분석하여 결과를 덮어쓴다 (곡선이 없는 파일은 NO_CURVES 로 기록하고 다시 분석하지 않음).
+
+사용법:
+    python -m linedose.results ingest [-j N] [--db PATH] 파일 또는 폴더 ...
+    python -m linedose.results trend D90 [--energy 150] [--device ID] [--since 2024-01-01]
+    python -m linedose.results drift D90 [--by energy] [--period month]
+"""
+import argparse
+import datetime
+import os
+import re
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from . import profiling
+from .analysis import analyze_curves
+from .archive import getmtime
+from .batch import collect_files, default_workers
+from .cache import try_content_hash
+from .parsers import file_modality, read_meta
+
+# 저장하는 지표 (analyze_file / analyze_curves 결과의 키)
+RESULT_METRICS = ('D90', 'P95', 'SOBP', 'D50', 'D20', 'D10')
+# drift() 의 묶음 기준과 기간 -> SQL 식 (measured_at 은 'YYYY-MM-DD HH:MM:SS' 이므로
+# 주 외에는 strftime 대신 앞부분 글자로 묶는다 - 전체 테이블을 훑을 때 몇 배 빠름)
+GROUP_COLUMNS = ('energy', 'device', 'kind', 'modality')
+PERIOD_EXPRESSIONS = {
+    'day': 'substr(measured_at, 1, 10)',
+    'week': "strftime('%Y-W%W', measured_at)",
+    'month': 'substr(measured_at, 1, 7)',
+    'year': 'substr(measured_at, 1, 4)',
+}
+# 에너지 비교 허용 오차 (MeV) - 인덱스를 쓰도록 BETWEEN 으로 비교
+ENERGY_TOLERANCE = 0.05
+SCHEMA_VERSION = 1
+# 곡선이 하나도 없는 파일의 error 값 - 다른 오류와 달리 이미 분석한 파일로 본다
+NO_CURVES = '곡선 없음'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    curve INTEGER NOT NULL DEFAULT 0,
+    file TEXT NOT NULL,
+    path TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    modality TEXT NOT NULL DEFAULT '',
+    device TEXT,
+    energy REAL,
+    measured_at TEXT NOT NULL,
+    analyzed_at TEXT NOT NULL,
+    D90 REAL, P95 REAL, SOBP REAL, D50 REAL, D20 REAL, D10 REAL,
+    error TEXT NOT NULL DEFAULT '',
+    UNIQUE (content_hash, curve)
+);
+CREATE INDEX IF NOT EXISTS results_energy_date ON results (energy, measured_at);
+CREATE INDEX IF NOT EXISTS results_device_date ON results (device, measured_at);
+CREATE INDEX IF NOT EXISTS results_date ON results (measured_at);
+"""
+_COLUMNS = ('content_hash', 'curve', 'file', 'path', 'kind', 'modality', 'device', 'energy',
+            'measured_at', 'analyzed_at') + RESULT_METRICS + ('error',)
+# 이미 있는 (content_hash, curve) 는 오류로 저장된 행만 새 결과로 덮어쓴다
+_INSERT = (f"INSERT INTO results ({', '.join(_COLUMNS)}) "
+           f"VALUES ({', '.join('?' for _ in _COLUMNS)}) "
+           f"ON CONFLICT (content_hash, curve) DO UPDATE SET "
+           f"{', '.join(f'{column} = excluded.{column}' for column in _COLUMNS[2:])} "
+           f"WHERE results.error != ''")
+# 한 번의 IN (...) 조회에 넣는 값 수 (SQLite 변수 개수 제한보다 작게)
+_IN_CHUNK = 500
+
+# 메타데이터 키 (소문자 포함 여부로 찾음)
+_ENERGY_KEYS = ('energy',)
+_DEVICE_KEYS = ('device', 'machine', 'detector', 'serial', 'room', 'gantry')
+_DATE_KEYS = ('date', 'time')
+_ENERGY_IN_NAME = re.compile(r'(\d+(?:\.\d+)?)\s*mev', re.IGNORECASE)
+_NUMBER = re.compile(r'[-+]?\d+(?:\.\d+)?')
+_DATE_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d', '%Y/%m/%d %H:%M:%S',
+                 '%Y/%m/%d', '%d.%m.%Y %H:%M:%S', '%d.%m.%Y %H:%M', '%d.%m.%Y',
+                 '%d/%m/%Y %H:%M:%S', '%d/%m/%Y', '%Y%m%d')
+
+
+def default_results_path():
+    """운영체제별 사용자 데이터 폴더 아래 linedose/results.sqlite"""
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_DATA_HOME') \
+        or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    return os.path.join(base, 'linedose', 'results.sqlite')
+
+
+def _meta_value(meta, keys):
+    for key, value in meta.items():
+        lowered = key.lower()
+        if value and any(name in lowered for name in keys):
+            return value
+    return None
+
+
+def find_energy(meta, file_name=''):
+    """메타데이터의 에너지 항목 또는 파일 이름의 '150MeV' 에서 에너지 (MeV), 없으면 None"""
+    value = _meta_value(meta, _ENERGY_KEYS)
+    match = _NUMBER.search(value) if value else None
+    if match is None:
+        match = _ENERGY_IN_NAME.search(file_name)
+        return float(match.group(1)) if match else None
+    return float(match.group())
+
+
+def find_device(meta):
+    """메타데이터의 장비 (검출기/치료기/일련번호) 항목, 없으면 None"""
+    return _meta_value(meta, _DEVICE_KEYS)
+
+
+def find_date(meta):
+    """메타데이터의 측정 날짜를 'YYYY-MM-DD HH:MM:SS' 로, 읽을 수 없으면 None"""
+    value = _meta_value(meta, _DATE_KEYS)
+    if not value:
+        return None
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(value.strip(), fmt).strftime('%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            continue
+    return None
+
+
+def _timestamp(seconds=None):
+    if seconds is None:
+        moment = datetime.datetime.now()
+    else:
+        moment = datetime.datetime.fromtimestamp(seconds)
+    return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _first_meta(file_path):
+    """파일 첫 곡선의 헤더 메타데이터 (읽을 수 없으면 빈 dict)"""
+    try:
+        return read_meta(file_path)
+    except (OSError, KeyError, ValueError):
+        return {}
+
+
+class ResultsDB:
+    """
+    곡선별 분석 결과 테이블 (SQLite)
+
+    Parameters:
+    path (str): 데이터베이스 파일 (None 이면 default_results_path(), ':memory:' 가능)
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_results_path()
+        if self.path != ':memory:':
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        if self.path != ':memory:':
+            # 쓰는 동안에도 다른 프로세스 (GUI, 배치) 가 읽을 수 있도록
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(_SCHEMA)
+        self.connection.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def known_hashes(self, hashes):
+        """hashes 중 이미 분석된 content hash 집합 (오류로만 저장된 파일은 제외 - 다시 분석)"""
+        hashes = list(set(hashes))
+        known = set()
+        for start in range(0, len(hashes), _IN_CHUNK):
+            chunk = hashes[start:start + _IN_CHUNK]
+            query = (f"SELECT DISTINCT content_hash FROM results "
+                     f"WHERE content_hash IN ({', '.join('?' for _ in chunk)}) "
+                     f"AND error IN ('', ?)")
+            known.update(value for value, in self.connection.execute(query, chunk + [NO_CURVES]))
+        return known
+
+    def _record(self, row, analyzed_at):
+        """
+        결과 행 (dict) -> INSERT 값 tuple (없는 항목은 파일/메타데이터에서 채움)
+
+        'content_hash' 와 'meta' 가 없으면 파일을 다시 읽으므로, GUI 처럼 작업자에서 분석한 경우에는
+        작업자에서 구해 넘길 것 (linedose.loader.load_entries 의 describe 참조).
+        내용 해시가 없고 파일도 읽을 수 없으면 (없는 파일의 오류 행 등) None - 저장하지 않는다.
+        """
+        path = row['path']
+        digest = row.get('content_hash') or try_content_hash(path)
+        if digest is None:
+            return None
+        file_name = row.get('file') or os.path.basename(path)
+        meta = row.get('meta')
+        if meta is None:
+            meta = _first_meta(path)
+        measured_at = row.get('measured_at') or find_date(meta)
+        if measured_at is None:
+            try:
+                measured_at = _timestamp(getmtime(path))
+            except (OSError, KeyError):
+                measured_at = _timestamp()
+        energy = row.get('energy')
+        values = {
+            'content_hash': digest,
+            'curve': row.get('curve', 0),
+            'file': file_name,
+            'path': os.path.abspath(path),
+            'kind': row.get('kind', ''),
+            'modality': row.get('modality') or file_modality(path),
+            'device': row.get('device') or find_device(meta),
+            'energy': energy if energy is not None else find_energy(meta, file_name),
+            'measured_at': measured_at,
+            'analyzed_at': analyzed_at,
+            'error': row.get('error', ''),
+        }
+        for name in RESULT_METRICS:
+            value = row.get(name)
+            values[name] = float(value) if value not in (None, '') else None
+        return tuple(values[column] for column in _COLUMNS)
+
+    def add(self, rows):
+        """
+        결과 행 여러 개를 한 트랜잭션으로 저장
+        (이미 있는 (content_hash, curve) 는 무시하되, 오류로 저장된 행은 새 결과로 덮어씀)
+
+        Parameters:
+        rows (iterable): analyze_file / analyze_curves 결과 dict ('path' 필수,
+            'content_hash', 'meta', 'energy', 'device', 'measured_at' 는 없으면 채움)
+
+        Returns:
+        int: 새로 저장된 행 수 (내용 해시를 구할 수 없는 행은 저장하지 않음)
+        """
+        with profiling.stage('results.add'):
+            now = _timestamp()
+            records = [record for record in (self._record(row, now) for row in rows)
+                       if record is not None]
+            before = self.connection.total_changes
+            with self.connection:
+                self.connection.executemany(_INSERT, records)
+            return self.connection.total_changes - before
+
+    def ingest(self, file_paths, workers=None):
+        """
+        파일을 분석하여 저장 - 내용이 이미 저장된 파일은 분석하지 않는다
+
+        Parameters:
+        file_paths (list): 파일 경로
+        workers (int): 작업 프로세스 수 (None 이면 CPU 코어 수, 1 이면 현재 프로세스)
+
+        Returns:
+        tuple: (새로 저장된 행 수, 건너뛴 파일 수 - 이미 저장된 파일과 읽을 수 없는 파일)
+        """
+        file_paths = list(file_paths)
+        if not file_paths:
+            return 0, 0
+        workers = max(1, min(workers or default_workers(), len(file_paths)))
+        if workers == 1:
+            return self._ingest(file_paths, map)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            def pool_map(func, items):
+                return executor.map(func, items, chunksize=max(1, len(items) // (workers * 4)))
+            return self._ingest(file_paths, pool_map)
+
+    def _ingest(self, file_paths, map_func):
+        # 내용 해시는 작업자에서 구하고, 이미 저장된 파일을 뺀 나머지만 다시 작업자에서 분석한다
+        with profiling.stage('results.hash', files=len(file_paths)):
+            hashes = {}
+            for path, digest in zip(file_paths, map_func(try_content_hash, file_paths)):
+                if digest is not None:
+                    hashes.setdefault(digest, path)
+        known = self.known_hashes(hashes)
+        todo = [(path, digest) for digest, path in hashes.items() if digest not in known]
+        skipped = len(file_paths) - len(todo)
+        if not todo:
+            return 0, skipped
+        results = map_func(_analyze_rows, todo)
+        return self.add(row for rows in results for row in rows), skipped
+
+    def _where(self, kind=None, energy=None, device=None, since=None, until=None):
+        clauses = ['error = ?']
+        params = ['']
+        if energy is not None:
+            clauses.append('energy BETWEEN ? AND ?')
+            params += [energy - ENERGY_TOLERANCE, energy + ENERGY_TOLERANCE]
+        if device is not None:
+            clauses.append('device = ?')
+            params.append(device)
+        if kind is not None:
+            clauses.append('kind = ?')
+            params.append(kind)
+        if since is not None:
+            clauses.append('measured_at >= ?')
+            params.append(str(since))
+        if until is not None:
+            clauses.append('measured_at < ?')
+            params.append(str(until))
+        return ' AND '.join(clauses), params
+
+    def trend(self, metric='D90', kind=None, energy=None, device=None, since=None, until=None):
+        """
+        지표의 시간순 값
+
+        Parameters:
+        metric (str): RESULT_METRICS 중 하나
+        kind (str): 'plan' 또는 'measurement' (None 이면 모두)
+        energy (float): 에너지 (MeV, ENERGY_TOLERANCE 이내)
+        device (str): 장비
+        since, until (str): 측정 시각 범위 ('YYYY-MM-DD' 등, until 은 포함하지 않음)
+
+        Returns:
+        list: (measured_at, 값, energy, device, file) 목록
+        """
+        metric = _check_metric(metric)
+        where, params = self._where(kind, energy, device, since, until)
+        query = (f"SELECT measured_at, {metric}, energy, device, file FROM results "
+                 f"WHERE {where} AND {metric} IS NOT NULL ORDER BY measured_at")
+        with profiling.stage('results.query'):
+            return self.connection.execute(query, params).fetchall()
+
+    def drift(self, metric='D90', by='energy', period='month', kind=None, energy=None,
+              device=None, since=None, until=None):
+        """
+        기준 (에너지/장비 등) 과 기간별 지표 통계
+
+        Parameters:
+        metric (str): RESULT_METRICS 중 하나
+        by (str): GROUP_COLUMNS 중 하나 (None 이면 전체)
+        period (str): PERIOD_EXPRESSIONS 중 하나
+        나머지: trend() 와 같은 조건
+
+        Returns:
+        list: (기준 값, 기간, 개수, 평균, 최소, 최대) 목록
+        """
+        metric = _check_metric(metric)
+        if by is not None and by not in GROUP_COLUMNS:
+            raise ValueError(f"지원되지 않는 기준: {by}")
+        if period not in PERIOD_EXPRESSIONS:
+            raise ValueError(f"지원되지 않는 기간: {period}")
+        where, params = self._where(kind, energy, device, since, until)
+        group = by or "''"
+        query = (f"SELECT {group}, {PERIOD_EXPRESSIONS[period]} AS period, "
+                 f"COUNT({metric}), AVG({metric}), MIN({metric}), MAX({metric}) "
+                 f"FROM results WHERE {where} AND {metric} IS NOT NULL "
+                 f"GROUP BY {group}, period ORDER BY {group}, period")
+        with profiling.stage('results.query'):
+            return self.connection.execute(query, params).fetchall()
+
+
+def _check_metric(metric):
+    if metric not in RESULT_METRICS:
+        raise ValueError(f"지원되지 않는 지표: {metric}")
+    return metric
+
+
+def _analyze_rows(task):
+    """작업 프로세스: 파일의 곡선별 결과 행 (content hash 포함)"""
+    path, digest = task
+    try:
+        rows = list(analyze_curves(path))
+    except Exception as e:
+        rows = [{'path': path, 'kind': '', 'meta': {}, 'error': f"{type(e).__name__}: {e}"}]
+    if not rows:
+        # 곡선이 없는 파일도 한 행으로 남겨 다음 ingest 에서 다시 분석하지 않도록
+        rows = [{'path': path, 'kind': '', 'meta': {}, 'error': NO_CURVES}]
+    for row in rows:
+        row['content_hash'] = digest
+    return rows
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m linedose.results',
+        description='Line-dose 분석 결과 데이터베이스')
+    parser.add_argument('--db', default=None,
+                        help='데이터베이스 파일 (기본값: 사용자 데이터 폴더의 linedose/results.sqlite)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest = commands.add_parser('ingest', help='파일을 분석하여 저장 (이미 저장된 파일은 건너뜀)')
+    ingest.add_argument('inputs', nargs='+', help='TXT/CSV 파일, 폴더 또는 zip/tar 파일')
+    ingest.add_argument('-r', '--recursive', action='store_true', help='하위 폴더까지 검색')
+    ingest.add_argument('--include', metavar='PATTERN', action='append', default=None,
+                        help='폴더/압축 파일에서 이름이 맞는 파일만 (예: "*150MeV*.csv", 여러 번 지정 가능)')
+    ingest.add_argument('-j', '--workers', type=int, default=None,
+                        help='작업 프로세스 수 (기본값: CPU 코어 수)')
+
+    for name, help_text in (('trend', '지표의 시간순 값'), ('drift', '기준/기간별 지표 통계')):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('metric', nargs='?', default='D90', choices=RESULT_METRICS)
+        command.add_argument('--kind', choices=('plan', 'measurement'), default=None)
+        command.add_argument('--energy', type=float, default=None, help='에너지 (MeV)')
+        command.add_argument('--device', default=None)
+        command.add_argument('--since', default=None, help='시작 날짜 (YYYY-MM-DD)')
+        command.add_argument('--until', default=None, help='끝 날짜 (포함하지 않음)')
+        if name == 'drift':
+            command.add_argument('--by', choices=GROUP_COLUMNS, default='energy')
+            command.add_argument('--period', choices=tuple(PERIOD_EXPRESSIONS), default='month')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    with ResultsDB(args.db) as db:
+        if args.command == 'ingest':
+            files = collect_files(args.inputs, recursive=args.recursive,
+                                  patterns=args.include)
+            if not files:
+                print("저장할 파일이 없습니다.", file=sys.stderr)
+                return 1
+            added, skipped = db.ingest(files, workers=args.workers)
+            print(f"{added}개 결과 저장, 이미 저장되었거나 읽을 수 없는 파일 {skipped}개 건너뜀 "
+                  f"(전체 {len(db)}개)",
+                  file=sys.stderr)
+            return 0
+
+        conditions = dict(kind=args.kind, energy=args.energy, device=args.device,
+                          since=args.since, until=args.until)
+        if args.command == 'trend':
+            print(f"measured_at,{args.metric},energy,device,file")
+            for measured_at, value, energy, device, file_name in db.trend(args.metric,
+                                                                         **conditions):
+                energy = '' if energy is None else f"{energy:g}"
+                print(f"{measured_at},{value:.4f},{energy},{device or ''},{file_name}")
+        else:
+            print(f"{args.by},period,count,mean,min,max")
+            for group, period, count, mean, low, high in db.drift(args.metric, args.by,
+                                                                  args.period, **conditions):
+                group = '' if group is None else group
+                print(f"{group},{period},{count},{mean:.4f},{low:.4f},{high:.4f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,397 @@
+"""
+로컬 분석 서비스 (HTTP, 표준 라이브러리만 사용)
+
+여러 측정 스테이션이 한 서비스에 파일을 보내고 곡선과 지표를 JSON 으로 받는다.
+
+사용법:
+    python -m linedose.service [--port 8765] [-j N] [--root /mnt/qa] [--cache]
+
+요청:
+    GET  /health                         상태와 대기 중인 작업 수
+    POST /analyze                        {"paths": [...], "files": [{"name": "m.csv", "content": "..."}],
+                                          "curves": true}  -> {"results": [...]}
+    POST /upload?name=m.csv[&curves=0]   본문이 파일 내용  -> 결과 하나
+
+paths 는 --root 로 지정한 폴더 안의 파일만 허용한다.
+여러 요청에서 들어온 파일을 짧은 시간 (batch_wait) 동안 모아 작업자에게 한 번에 넘기고,
+같은 내용 (SHA-256) 과 확장자의 파일은 결과 캐시에서 바로 돌려주거나 진행 중인 작업을 함께 기다린다.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .batch import default_workers
+from .cache import CurveCache, content_hash
+from .loader import load_entries
+from .parsers import FILE_KINDS
+
+DEFAULT_PORT = 8765
+# 요청 본문 최대 크기 (bytes)
+MAX_BODY_BYTES = 64 << 20
+# 결과를 기다리는 최대 시간 (초)
+REQUEST_TIMEOUT = 300.0
+
+
+class ServiceBusy(Exception):
+    """대기 중인 작업이 max_pending 을 넘음 (HTTP 503)"""
+
+
+class AnalysisService:
+    """
+    요청을 모아 작업자 풀에서 분석하는 서비스 본체 (HTTP 와 무관)
+
+    Parameters:
+    workers (int): 작업자 수 (None 이면 CPU 코어 수)
+    use_processes (bool): True 이면 프로세스 풀, False 이면 스레드 풀
+    batch_size (int): 작업자에게 한 번에 넘기는 최대 파일 수
+    batch_wait (float): 첫 파일이 들어온 뒤 다른 요청의 파일을 더 기다리는 시간 (초)
+    max_pending (int): 대기/처리 중인 파일 수 한도 (넘으면 ServiceBusy)
+    cache (CurveCache): 작업자가 공유하는 디스크 캐시 (선택)
+    roots (list): paths 로 읽을 수 있는 폴더 (비어 있으면 paths 요청 거부)
+    result_cache_size (int): 메모리 결과 캐시 크기 (파일 수)
+    """
+
+    def __init__(self, workers=None, use_processes=True, batch_size=16, batch_wait=0.01,
+                 max_pending=256, cache=None, roots=(), result_cache_size=1024):
+        self.workers = workers or default_workers()
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_pending = max_pending
+        self.cache = cache
+        self.roots = [os.path.realpath(root) for root in roots]
+        self.result_cache_size = result_cache_size
+        if use_processes:
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers)
+
+        self._spool = tempfile.mkdtemp(prefix='linedose-service-')
+        self._results = OrderedDict()  # 결과 키 (_result_key) -> 결과 (LRU)
+        self._inflight = {}            # 결과 키 -> Future
+        self._queue = []               # (경로, 결과 키, 임시 파일 여부)
+        self._condition = threading.Condition()
+        self._closed = False
+        self.stats = {'files': 0, 'cache_hits': 0, 'batches': 0, 'errors': 0}
+        self._dispatcher = threading.Thread(target=self._dispatch, name='linedose-dispatch',
+                                            daemon=True)
+        self._dispatcher.start()
+
+    @property
+    def pending(self):
+        """대기/처리 중인 파일 수"""
+        with self._condition:
+            return len(self._inflight)
+
+    def check_path(self, path):
+        """roots 안의 파일 경로면 실제 경로를 반환, 아니면 PermissionError"""
+        real = os.path.realpath(path)
+        for root in self.roots:
+            if os.path.commonpath([real, root]) == root:
+                return real
+        raise PermissionError(f"허용되지 않은 경로입니다: {path}")
+
+    def submit_path(self, path):
+        """공유 폴더의 파일 분석 요청 - Future (결과 dict)"""
+        real = self.check_path(path)
+        if not os.path.isfile(real):
+            raise FileNotFoundError(f"파일이 없습니다: {path}")
+        return self._submit(real, _result_key(real, content_hash(real)), temporary=False)
+
+    def submit_content(self, name, data):
+        """업로드된 파일 내용 분석 요청 - Future (결과 dict)"""
+        ext = os.path.splitext(name)[1].lower()
+        if ext not in FILE_KINDS:
+            raise ValueError(f"지원되지 않는 파일 형식: {ext}")
+        digest = _result_key(name, hashlib.sha256(data).hexdigest())
+        with self._condition:
+            future = self._lookup(digest)
+        if future is not None:
+            return future
+        # 파서는 파일 경로를 읽으므로 임시 파일로 쓴다
+        fd, path = tempfile.mkstemp(suffix=ext, dir=self._spool)
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+        return self._submit(path, digest, temporary=True)
+
+    def _lookup(self, digest):
+        """결과 캐시 또는 진행 중인 작업의 Future (없으면 None) - _condition 잡은 상태에서 호출"""
+        if digest in self._results:
+            self._results.move_to_end(digest)
+            self.stats['cache_hits'] += 1
+            future = Future()
+            future.set_result(self._results[digest])
+            return future
+        return self._inflight.get(digest)
+
+    def _submit(self, path, digest, temporary):
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("서비스가 종료되었습니다.")
+            self.stats['files'] += 1
+            future = self._lookup(digest)
+            if future is not None:
+                # 그 사이 같은 내용이 들어옴 - 이 임시 파일은 필요 없다
+                if temporary:
+                    _remove(path)
+                return future
+            if len(self._inflight) >= self.max_pending:
+                if temporary:
+                    _remove(path)
+                raise ServiceBusy(f"대기 중인 파일이 너무 많습니다 ({self.max_pending}개).")
+            future = Future()
+            self._inflight[digest] = future
+            self._queue.append((path, digest, temporary))
+            self._condition.notify()
+            return future
+
+    def _dispatch(self):
+        """요청을 batch_size 개 또는 batch_wait 초 동안 모아 작업자에게 넘긴다"""
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if self._closed and not self._queue:
+                    return
+                deadline = time.monotonic() + self.batch_wait
+                while len(self._queue) < self.batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch = self._queue[:self.batch_size]
+                del self._queue[:self.batch_size]
+                self.stats['batches'] += 1
+
+            paths = [path for path, _, _ in batch]
+            try:
+                future = self._executor.submit(_load_batch, paths, self.cache)
+            except RuntimeError as e:
+                # 종료 중 - 남은 요청에 오류 전달
+                self._finish(batch, None, e)
+                continue
+            future.add_done_callback(lambda f, batch=batch: self._finish(batch, f))
+
+    def _finish(self, batch, future, error=None):
+        if error is None:
+            error = future.exception()
+        entries = future.result() if error is None else None
+        with self._condition:
+            for index, (path, digest, temporary) in enumerate(batch):
+                if entries is not None:
+                    entry = entries[index]
+                    # 요청마다 이름/경로가 다르므로 내용에서 나온 값만 캐시한다
+                    entry.pop('path', None)
+                    entry.pop('file', None)
+                    if entry['error']:
+                        self.stats['errors'] += 1
+                    else:
+                        self._results[digest] = entry
+                        self._results.move_to_end(digest)
+                        while len(self._results) > self.result_cache_size:
+                            self._results.popitem(last=False)
+                else:
+                    entry = {'error': f"{type(error).__name__}: {error}"}
+                    self.stats['errors'] += 1
+                waiting = self._inflight.pop(digest, None)
+                if temporary:
+                    _remove(path)
+                if waiting is not None:
+                    waiting.set_result(entry)
+
+    def close(self):
+        """대기 중인 작업을 마치고 작업자 종료"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+        try:
+            os.rmdir(self._spool)
+        except OSError:
+            pass
+
+
+def _result_key(name, digest):
+    """결과 캐시 키 - 같은 내용이라도 확장자가 다르면 다른 파서로 읽으므로 확장자를 함께 쓴다"""
+    return f"{os.path.splitext(name)[1].lower()}:{digest}"
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _load_batch(paths, cache=None):
+    """작업자: 파일 여러 개를 load_entries 로 분석 (정규화는 한 번에)"""
+    return load_entries(paths, cache)
+
+
+def result_json(entry, name, path=None, curves=True):
+    """결과 dict -> JSON 으로 보낼 dict (numpy 배열은 list 로)"""
+    data = {'file': name, 'kind': entry.get('kind', ''), 'metrics': entry.get('metrics', {}),
+            'error': entry.get('error', '')}
+    if path is not None:
+        data['path'] = path
+    if entry.get('metrics_error'):
+        data['metrics_error'] = entry['metrics_error']
+    if curves and entry.get('depth') is not None:
+        data['depth'] = entry['depth'].tolist()
+        data['dose'] = entry['dose'].tolist()
+    return data
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """HTTP 요청 처리 (self.server.service 가 AnalysisService)"""
+
+    server_version = 'linedose-service/1'
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, data, headers=None):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message, headers=None):
+        self._send_json(status, {'error': message}, headers)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            raise OverflowError(f"요청이 너무 큽니다 (최대 {MAX_BODY_BYTES >> 20} MB).")
+        return self.rfile.read(length)
+
+    def do_GET(self):
+        service = self.server.service
+        if urlparse(self.path).path == '/health':
+            self._send_json(200, dict(status='ok', workers=service.workers,
+                                      pending=service.pending, **dict(service.stats)))
+        else:
+            self._send_error(404, '없는 주소입니다.')
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        service = self.server.service
+        try:
+            body = self._read_body()
+            if url.path == '/upload':
+                name = query.get('name', [''])[0]
+                curves = query.get('curves', ['1'])[0] not in ('0', 'false')
+                future = service.submit_content(name, body)
+                entry = future.result(REQUEST_TIMEOUT)
+                self._send_json(200, result_json(entry, name, curves=curves))
+            elif url.path == '/analyze':
+                self._send_json(200, {'results': self._analyze(json.loads(body or b'{}'))})
+            else:
+                self._send_error(404, '없는 주소입니다.')
+        except ServiceBusy as e:
+            self._send_error(503, str(e), {'Retry-After': '1'})
+        except PermissionError as e:
+            self._send_error(403, str(e))
+        except OverflowError as e:
+            self._send_error(413, str(e))
+        except (TimeoutError, FutureTimeoutError):
+            # Python 3.11 전에는 Future.result 의 시간 초과가 내장 TimeoutError 가 아니다
+            self._send_error(504, '분석 시간이 초과되었습니다.')
+        except (ValueError, KeyError, TypeError, OSError) as e:
+            self._send_error(400, f"{type(e).__name__}: {e}")
+
+    def _analyze(self, request):
+        """paths/files 를 모두 제출한 뒤 결과를 기다린다 (입력 순서: paths, files)"""
+        service = self.server.service
+        curves = bool(request.get('curves', True))
+        submitted = []
+        for path in request.get('paths', []):
+            submitted.append((os.path.basename(path), path, service.submit_path(path)))
+        for item in request.get('files', []):
+            data = item['content']
+            data = data.encode('utf-8') if isinstance(data, str) else bytes(data)
+            submitted.append((item['name'], None, service.submit_content(item['name'], data)))
+        return [result_json(future.result(REQUEST_TIMEOUT), name, path, curves)
+                for name, path, future in submitted]
+
+
+def make_server(service, host='127.0.0.1', port=DEFAULT_PORT, verbose=False):
+    """
+    HTTP 서버 만들기 (serve_forever() 로 실행, port=0 이면 빈 포트 사용)
+
+    Returns:
+    ThreadingHTTPServer: server.service 로 AnalysisService 에 접근
+    """
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m linedose.service',
+        description='Line-dose 로컬 분석 서비스 (HTTP/JSON)')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='주소 (기본값: 127.0.0.1, 다른 컴퓨터에서 접속하려면 0.0.0.0)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='작업 프로세스 수 (기본값: CPU 코어 수)')
+    parser.add_argument('--root', action='append', default=[], metavar='DIR',
+                        help='paths 요청으로 읽을 수 있는 공유 폴더 (여러 번 지정 가능)')
+    parser.add_argument('--cache', metavar='DIR', nargs='?', const='', default=None,
+                        help='작업자가 공유하는 디스크 캐시 (폴더 생략 시 기본 사용자 캐시 폴더)')
+    parser.add_argument('--batch-size', type=int, default=16,
+                        help='작업자에게 한 번에 넘기는 최대 파일 수')
+    parser.add_argument('--batch-wait', type=float, default=0.01,
+                        help='다른 요청의 파일을 모으는 시간 (초)')
+    parser.add_argument('--max-pending', type=int, default=256,
+                        help='대기 중인 파일 수 한도 (넘으면 503)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='요청마다 로그 출력')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    cache = None
+    if args.cache is not None:
+        # 업로드는 임시 파일 이름이 매번 같지 않을 수 있으므로 내용 해시로 캐시
+        cache = CurveCache(args.cache or None, use_content_hash=True)
+    service = AnalysisService(workers=args.workers, batch_size=args.batch_size,
+                              batch_wait=args.batch_wait, max_pending=args.max_pending,
+                              cache=cache, roots=args.root)
+    server = make_server(service, args.host, args.port, args.verbose)
+    host, port = server.server_address[:2]
+    print(f"분석 서비스 시작: http://{host}:{port} (작업자 {service.workers}개, Ctrl+C 로 종료)",
+          file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
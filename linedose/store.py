@@ -0,0 +1,264 @@
+"""
+열 기반(columnar) 곡선 저장소
+
+모든 곡선의 depth/dose 를 연속된 버퍼 두 개에 이어 붙이고, 곡선별 버퍼 위치 (start, stop) 로
+구분한다. 곡선은 전체 소스 경로를 키로 사용하므로 다른 폴더의 같은 이름 파일이 서로 덮어쓰지 않는다.
+세션 전체를 메모리 매핑 가능한 파일 하나로 저장/불러오기 할 수 있다.
+
+버퍼에 이미 기록된 영역은 덮어쓰지 않는다 (추가/교체는 뒤에 이어 쓰고, 삭제된 곡선의 영역은
+비워 둔 채 남겨 둔다). 빈 영역이 남은 곡선보다 많아지거나 버퍼를 늘릴 때만 남은 곡선을 새 버퍼로
+모은다 (곡선 N 개를 하나씩 삭제해도 전체 복사는 O(N) 번이 아니라 몇 번뿐).
+따라서 curve() 가 돌려준 view 는 이후 추가/삭제와 관계없이 같은 데이터를 가리킨다.
+"""
+import json
+import os
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+from .parsers import file_modality
+
+# 곡선 메타데이터
+CurveMeta = namedtuple('CurveMeta', ['path', 'kind', 'modality', 'name'])
+
+_MAGIC = b'LDS1'
+_HEADER = struct.Struct('<4sI')  # magic, JSON 헤더 길이
+_ALIGN = 64
+
+
+def _align(offset):
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class CurveStore:
+    """
+    곡선 저장소
+
+    Parameters:
+    dtype: depth/dose 버퍼 자료형 (np.float64 또는 메모리를 줄이려면 np.float32)
+    capacity (int): 처음 확보할 점 수
+    """
+
+    def __init__(self, dtype=np.float64, capacity=0):
+        self.dtype = np.dtype(dtype)
+        self._depth = np.empty(capacity, dtype=self.dtype)
+        self._dose = np.empty(capacity, dtype=self.dtype)
+        # 곡선 키 -> 버퍼 위치 (start, stop) / CurveMeta / 지표 dict (dict 는 추가된 순서를 유지)
+        self._spans = {}
+        self._meta = {}
+        self._metrics = {}
+        self._end = 0  # 버퍼에 기록된 영역의 끝
+        self._garbage = 0  # 삭제/교체된 곡선이 남긴 점 수
+
+    def __len__(self):
+        return len(self._meta)
+
+    def __contains__(self, key):
+        return key in self._meta
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        """곡선 키 (소스 경로) 목록, 추가된 순서"""
+        return list(self._meta)
+
+    @property
+    def points(self):
+        """저장된 전체 점 수 (삭제된 곡선 제외)"""
+        return self._end - self._garbage
+
+    @property
+    def nbytes(self):
+        """depth/dose 데이터 크기 (bytes)"""
+        return 2 * self.points * self.dtype.itemsize
+
+    def index(self, key):
+        """곡선의 순서 (추가된 순서, 0 부터)"""
+        if key not in self._meta:
+            raise KeyError(key)
+        return list(self._meta).index(key)
+
+    def _reserve(self, points):
+        """버퍼에 points 개의 빈 자리를 확보 (부족하면 남은 곡선의 두 배로 새 버퍼, 읽기 전용이면 복사)"""
+        if self._end + points <= self._depth.size and self._depth.flags.writeable:
+            return
+        self._compact(max(self.points + points, 2 * self.points, 1024))
+
+    def _compact(self, capacity):
+        """남은 곡선만 새 버퍼의 앞에 차례로 모은다 (기존 버퍼는 덮어쓰지 않음)"""
+        spans = list(self._spans.values())
+        for name in ('_depth', '_dose'):
+            old = getattr(self, name)
+            buffer = np.empty(capacity, dtype=self.dtype)
+            if spans:
+                buffer[:self.points] = np.concatenate([old[start:stop] for start, stop in spans])
+            setattr(self, name, buffer)
+        start = 0
+        for key, (old_start, old_stop) in self._spans.items():
+            self._spans[key] = (start, start + old_stop - old_start)
+            start += old_stop - old_start
+        self._end = self.points
+        self._garbage = 0
+
+    def add(self, path, depth, dose, kind, modality=None, metrics=None, name=None):
+        """
+        곡선 추가 (같은 키가 있으면 그 자리에서 교체 - 순서는 유지)
+
+        Returns:
+        int: 곡선 인덱스
+        """
+        depth = np.asarray(depth)
+        dose = np.asarray(dose)
+        if depth.shape != dose.shape or depth.ndim != 1:
+            raise ValueError("depth 와 dose 는 길이가 같은 1차원 배열이어야 합니다.")
+
+        self._reserve(depth.size)
+        start = self._end
+        stop = start + depth.size
+        self._depth[start:stop] = depth
+        self._dose[start:stop] = dose
+        self._end = stop
+
+        if modality is None:
+            modality = file_modality(path)
+        old = self._spans.get(path)
+        if old is not None:
+            self._garbage += old[1] - old[0]
+        self._spans[path] = (start, stop)
+        self._meta[path] = CurveMeta(path, kind, modality, name or os.path.basename(path))
+        self._metrics[path] = dict(metrics or {})
+        return len(self) - 1 if old is None else self.index(path)
+
+    def remove(self, key):
+        """곡선 삭제 (버퍼 영역은 비워 두고, 빈 영역이 남은 점 수보다 많아지면 새 버퍼로 모은다)"""
+        start, stop = self._spans.pop(key)
+        self._garbage += stop - start
+        del self._meta[key]
+        del self._metrics[key]
+        if self._garbage > self.points:
+            self._compact(self.points)
+
+    def clear(self):
+        """모든 곡선 삭제"""
+        self._depth = np.empty(0, dtype=self.dtype)
+        self._dose = np.empty(0, dtype=self.dtype)
+        self._spans = {}
+        self._meta = {}
+        self._metrics = {}
+        self._end = 0
+        self._garbage = 0
+
+    def curve(self, key):
+        """(depth, dose) - 버퍼를 복사하지 않는 view"""
+        start, stop = self._spans[key]
+        return self._depth[start:stop], self._dose[start:stop]
+
+    def meta(self, key):
+        """CurveMeta (path, kind, modality, name)"""
+        return self._meta[key]
+
+    def metrics(self, key):
+        """곡선의 지표 dict (없으면 빈 dict)"""
+        return self._metrics[key]
+
+    def set_metrics(self, key, metrics):
+        if key not in self._meta:
+            raise KeyError(key)
+        self._metrics[key] = dict(metrics)
+
+    def display_name(self, key):
+        """표시용 이름 - 파일명이 겹치면 상위 폴더 이름을 붙인다"""
+        meta = self.meta(key)
+        if sum(1 for other in self._meta.values() if other.name == meta.name) > 1:
+            parent = os.path.basename(os.path.dirname(meta.path))
+            return f"{parent}/{meta.name}"
+        return meta.name
+
+    def save(self, file_path):
+        """
+        세션 전체를 파일 하나로 저장
+
+        형식: magic + JSON 헤더 + (64 byte 정렬된) depth, dose, offsets, 지표 배열
+        """
+        # 파일에는 곡선이 빈틈 없이 차례로 있어야 한다 (offsets) - 삭제/교체로 어긋났으면 먼저 모은다
+        offsets = [0] + [stop for _, stop in self._spans.values()]
+        if any(start != offset for (start, _), offset in zip(self._spans.values(), offsets)):
+            self._compact(self.points)
+            offsets = [0] + [stop for _, stop in self._spans.values()]
+        metric_names = sorted({name for metrics in self._metrics.values() for name in metrics})
+        metric_table = np.full((len(self), len(metric_names)), np.nan)
+        for i, metrics in enumerate(self._metrics.values()):
+            for j, name in enumerate(metric_names):
+                if name in metrics:
+                    metric_table[i, j] = metrics[name]
+
+        arrays = {
+            'depth': np.ascontiguousarray(self._depth[:self.points]),
+            'dose': np.ascontiguousarray(self._dose[:self.points]),
+            'offsets': np.asarray(offsets, dtype='<i8'),
+            'metrics': metric_table.astype('<f8'),
+        }
+        header = {
+            'curves': [meta._asdict() for meta in self._meta.values()],
+            'metric_names': metric_names,
+            'arrays': {},
+        }
+
+        # 헤더 크기를 정한 뒤 배열 위치 계산 (위치 값이 헤더 길이에 영향을 주므로 두 번 계산)
+        for _ in range(2):
+            header_bytes = json.dumps(header).encode('utf-8')
+            offset = _align(_HEADER.size + len(header_bytes) + _ALIGN)
+            for name, array in arrays.items():
+                header['arrays'][name] = {'offset': offset, 'dtype': array.dtype.str,
+                                          'shape': list(array.shape)}
+                offset = _align(offset + array.nbytes)
+        header_bytes = json.dumps(header).encode('utf-8')
+
+        with open(file_path, 'wb') as file:
+            file.write(_HEADER.pack(_MAGIC, len(header_bytes)))
+            file.write(header_bytes)
+            for name, array in arrays.items():
+                file.seek(header['arrays'][name]['offset'])
+                file.write(array.tobytes())
+
+    @classmethod
+    def load(cls, file_path, mmap=True):
+        """
+        save() 로 저장한 세션 불러오기
+
+        mmap=True 이면 depth/dose 를 파일에 메모리 매핑하여 읽을 때만 디스크에서 가져온다.
+        (곡선을 추가/삭제하면 그때 메모리로 복사됨)
+        """
+        with open(file_path, 'rb') as file:
+            magic, header_len = _HEADER.unpack(file.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"세션 파일 형식이 아닙니다: {file_path}")
+            header = json.loads(file.read(header_len))
+
+        arrays = {}
+        for name, info in header['arrays'].items():
+            dtype = np.dtype(info['dtype'])
+            shape = tuple(info['shape'])
+            count = int(np.prod(shape))
+            if mmap and count:
+                arrays[name] = np.memmap(file_path, dtype=dtype, mode='r',
+                                         offset=info['offset'], shape=shape)
+            else:
+                arrays[name] = np.fromfile(file_path, dtype=dtype, count=count,
+                                           offset=info['offset']).reshape(shape)
+
+        store = cls(dtype=arrays['depth'].dtype)
+        store._depth = arrays['depth']
+        store._dose = arrays['dose']
+        offsets = [int(offset) for offset in arrays['offsets']]
+        metas = [CurveMeta(**meta) for meta in header['curves']]
+        store._spans = {meta.path: span for meta, span in zip(metas, zip(offsets[:-1], offsets[1:]))}
+        store._end = offsets[-1]
+        store._meta = {meta.path: meta for meta in metas}
+        names = header['metric_names']
+        store._metrics = {meta.path: {name: float(value) for name, value in zip(names, row)
+                                      if not np.isnan(value)}
+                          for meta, row in zip(metas, np.asarray(arrays['metrics']))}
+        return store
@@ -0,0 +1,214 @@
+"""
+합성 깊이-선량 곡선 생성 (벤치마크/검증용)
+
+Bortfeld (1997) 의 해석적 Bragg peak 근사 (Bragg-Kleeman 관계 R = alpha * E^p 와
+비탄성 핵반응 보정) 를 range straggling 과 에너지 퍼짐 (가우시안) 으로 흐리게 한 뒤,
+여러 peak 의 가중합으로 평평한 SOBP 를 만든다.
+결과를 RayStation TXT / Zebra CSV 형식 파일로 쓸 수 있다.
+"""
+import os
+
+import numpy as np
+
+# Bragg-Kleeman 계수 (물, 양성자, R [mm] = alpha * E[MeV]^p)
+BRAGG_KLEEMAN_ALPHA = 0.022
+BRAGG_KLEEMAN_P = 1.77
+# 비탄성 핵반응에 의한 깊이당 플루언스 감소율 (1/mm) 과 국소 흡수 비율
+NUCLEAR_ATTENUATION = 0.0012
+NUCLEAR_LOCAL_FRACTION = 0.6
+# 빔 에너지 퍼짐 (상대 표준편차)
+ENERGY_SPREAD = 0.01
+# 계산 격자 간격 (mm)
+_FINE_STEP = 0.05
+
+
+def straggling_sigma(range_mm, energy_spread=ENERGY_SPREAD):
+    """
+    비정 퍼짐 표준편차 (mm)
+
+    range straggling (물에서 sigma ~ 0.012 * R^0.935, R 은 cm) 과
+    에너지 퍼짐에 의한 비정 퍼짐 (p * energy_spread * R) 의 제곱합
+    """
+    straggling = 10.0 * 0.012 * (range_mm / 10.0) ** 0.935
+    return float(np.hypot(straggling, BRAGG_KLEEMAN_P * energy_spread * range_mm))
+
+
+def _gaussian_blur(values, sigma_points):
+    """가우시안 커널로 흐리게 (양 끝은 가장자리 값으로 채움)"""
+    if sigma_points <= 0:
+        return values
+    half = int(np.ceil(4 * sigma_points))
+    kernel = np.exp(-0.5 * (np.arange(-half, half + 1) / sigma_points) ** 2)
+    kernel /= kernel.sum()
+    padded = np.concatenate((np.full(half, values[0]), values, np.full(half, values[-1])))
+    return np.convolve(padded, kernel, mode='valid')
+
+
+def pristine_peak(depth, range_mm, sigma_mm=None):
+    """
+    단일 Bragg peak 선량 (임의 단위)
+
+    Parameters:
+    depth (array): 깊이 (mm)
+    range_mm (float): 비정 (straggling 전 입자가 멈추는 깊이)
+    sigma_mm (float): range straggling (None 이면 straggling_sigma(range_mm))
+
+    Returns:
+    array: depth 에서의 선량
+    """
+    depth = np.asarray(depth, dtype=float)
+    if sigma_mm is None:
+        sigma_mm = straggling_sigma(range_mm)
+
+    # 세밀한 격자에서 (R - z)^(1/p - 1) 를 칸 평균으로 적분 (R 에서의 특이점 처리)
+    # 핵반응 항: (beta + gamma * beta * p) * (R - z)^(1/p)
+    margin = 5 * sigma_mm + 1.0
+    edges = np.arange(min(depth.min(), 0.0) - margin,
+                      max(depth.max(), range_mm) + margin + _FINE_STEP, _FINE_STEP)
+    exponent = 1.0 / BRAGG_KLEEMAN_P
+    residual = np.clip(range_mm - edges, 0.0, None) ** exponent
+    stopping = (residual[:-1] - residual[1:]) / (exponent * _FINE_STEP)
+    centers = 0.5 * (edges[:-1] + edges[1:])
+    nuclear = NUCLEAR_ATTENUATION * (1.0 + NUCLEAR_LOCAL_FRACTION * BRAGG_KLEEMAN_P)
+    dose = stopping + nuclear * np.clip(range_mm - centers, 0.0, None) ** exponent
+    dose = _gaussian_blur(dose, sigma_mm / _FINE_STEP)
+    return np.interp(depth, centers, dose)
+
+
+def sobp_weights(range_mm, width_mm, n_peaks=None, sigma_mm=None):
+    """
+    평평한 SOBP 를 만드는 peak 비정과 가중치
+
+    Returns:
+    tuple: (peak 비정 배열, 가중치 배열)
+    """
+    if n_peaks is None:
+        n_peaks = max(int(round(width_mm / 3.0)) + 1, 2)
+    ranges = np.linspace(range_mm - width_mm, range_mm, n_peaks)
+    if width_mm <= 0:
+        return ranges[-1:], np.ones(1)
+
+    # plateau 는 가장 깊은 peak 의 최대점 앞까지
+    sigma = straggling_sigma(range_mm) if sigma_mm is None else sigma_mm
+    plateau = np.linspace(range_mm - width_mm, range_mm - 1.5 * sigma, 4 * n_peaks)
+    peaks = np.column_stack([pristine_peak(plateau, r, sigma_mm) for r in ranges])
+
+    # 음수 가중치가 나오면 그 peak 를 빼고 다시 푼다 (간단한 비음수 최소제곱)
+    weights = np.zeros(n_peaks)
+    active = np.ones(n_peaks, dtype=bool)
+    while active.any():
+        solution, *_ = np.linalg.lstsq(peaks[:, active], np.ones(plateau.size), rcond=None)
+        if (solution >= 0).all():
+            weights[active] = solution
+            break
+        active[np.flatnonzero(active)[solution < 0]] = False
+    return ranges, weights
+
+
+def sobp_curve(depth, range_mm, width_mm, n_peaks=None, sigma_mm=None):
+    """
+    SOBP 깊이-선량 곡선 (plateau 가 약 1 이 되도록 정규화)
+
+    Parameters:
+    depth (array): 깊이 (mm)
+    range_mm (float): 가장 깊은 peak 의 비정 (mm)
+    width_mm (float): SOBP 폭 (mm), 0 이면 단일 peak
+
+    Returns:
+    array: depth 에서의 선량
+    """
+    ranges, weights = sobp_weights(range_mm, width_mm, n_peaks, sigma_mm)
+    dose = sum(w * pristine_peak(depth, r, sigma_mm) for r, w in zip(ranges, weights) if w > 0)
+    return dose / max(np.max(dose), 1e-12) if width_mm <= 0 else dose
+
+
+def write_raystation_txt(file_path, depth, dose):
+    """RayStation 형식 line dose TXT (깊이 cm, 선량 cGy)"""
+    with open(file_path, 'w', encoding='utf-8', newline='\n') as file:
+        file.write("Line dose\nSynthetic curve\n\nDistance(cm)   Dose (cGy)\n")
+        np.savetxt(file, np.column_stack((np.asarray(depth) / 10.0, dose)),
+                   fmt=('%.4f', '%.4f'), delimiter='   ')
+
+
+def write_zebra_csv(file_path, depth, dose):
+    """Zebra/IBA 형식 측정 CSV (깊이 mm, 신호 counts, 세미콜론 구분)"""
+    with open(file_path, 'w', encoding='utf-8', newline='\n') as file:
+        file.write("Zebra;Synthetic\nCurve type: Depth dose\n\n")
+        file.write("Curve depth: [mm]\n")
+        file.write(";".join(f"{value:.2f}" for value in depth) + "\n\n")
+        file.write("Curve gains: [counts]\n")
+        file.write(";".join(f"{value:.3f}" for value in dose) + "\n\n")
+
+
+def generate_dataset(directory, n_files, ranges=(80.0, 250.0), widths=(20.0, 100.0),
+                     resolution=0.5, noise=0.005, max_depth=None, seed=0):
+    """
+    계획 (TXT) / 측정 (CSV) 파일 쌍 만들기
+
+    Parameters:
+    directory (str): 저장 폴더 (없으면 만든다)
+    n_files (int): 만들 파일 쌍의 수 (파일 수는 2 * n_files)
+    ranges (tuple): 비정 범위 (mm), 파일마다 균등 분포에서 뽑는다
+    widths (tuple): SOBP 폭 범위 (mm)
+    resolution (float): 깊이 간격 (mm)
+    noise (float): 측정 곡선에 더할 상대 잡음 (표준편차)
+    max_depth (float): 곡선 끝 깊이 (None 이면 최대 비정 + 30 mm)
+    seed (int): 난수 시드 (같은 인자면 같은 파일)
+
+    Returns:
+    list: (계획 파일, 측정 파일) 경로 쌍
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    if max_depth is None:
+        max_depth = ranges[1] + 30.0
+    depth = np.arange(0.0, max_depth + resolution / 2, resolution)
+
+    pairs = []
+    for i in range(n_files):
+        range_mm = rng.uniform(*ranges)
+        width_mm = min(rng.uniform(*widths), 0.8 * range_mm)
+        dose = sobp_curve(depth, range_mm, width_mm)
+
+        plan_path = os.path.join(directory, f"plan_{i:05d}.txt")
+        write_raystation_txt(plan_path, depth, 200.0 * dose)
+
+        measured = dose * (1.0 + rng.normal(0.0, noise, depth.size)) if noise else dose
+        # 측정은 약간의 비정 차이와 장비 이득 (counts) 을 가진다
+        shift = rng.normal(0.0, 0.5)
+        measured = np.interp(depth - shift, depth, measured)
+        measured_path = os.path.join(directory, f"measured_{i:05d}.csv")
+        write_zebra_csv(measured_path, depth, 5.0e4 * measured)
+        pairs.append((plan_path, measured_path))
+    return pairs
+
+
+def generate_peaks(directory, energies, resolution=0.5, noise=0.005, seed=0):
+    """
+    에너지마다 pristine peak 측정 파일 (Zebra CSV) 하나 만들기
+
+    파일 이름에 에너지를 넣는다 (예: peak_150.0MeV.csv). 비정은 Bragg-Kleeman 관계로 정한다.
+
+    Parameters:
+    directory (str): 저장 폴더 (없으면 만든다)
+    energies (list): 에너지 (MeV)
+    resolution (float): 깊이 간격 (mm)
+    noise (float): 상대 잡음 (표준편차)
+    seed (int): 난수 시드
+
+    Returns:
+    list: 파일 경로 (energies 순서)
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    paths = []
+    for energy in energies:
+        range_mm = BRAGG_KLEEMAN_ALPHA * energy ** BRAGG_KLEEMAN_P
+        depth = np.arange(0.0, range_mm + 30.0 + resolution / 2, resolution)
+        dose = pristine_peak(depth, range_mm)
+        if noise:
+            dose = dose * (1.0 + rng.normal(0.0, noise, depth.size))
+        path = os.path.join(directory, f"peak_{energy:.1f}MeV.csv")
+        write_zebra_csv(path, depth, 5.0e4 * dose / dose.max())
+        paths.append(path)
+    return paths
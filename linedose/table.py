@@ -0,0 +1,295 @@
+"""
+파일별 지표 비교 표
+
+- 행: 불러온 파일 하나, 열: 지표 + 짝지은 계획과의 차이 (측정 - 계획) + 감마 통과율
+- ComparisonTable.update() 는 이전 상태와 비교하여 바뀐 행만 다시 계산한다 (표를 다시 만들지 않음)
+- VirtualTable 은 화면에 보이는 행 수만큼의 Treeview 항목만 만들고, 스크롤하면 그 항목의 글자만 바꾼다
+
+Tk 객체는 전달받은 Treeview/Scrollbar 로만 다루므로 이 모듈은 tkinter 를 import 하지 않는다.
+"""
+import math
+from collections import Counter
+
+from .analysis import METRIC_NAMES, compute_metrics
+from .gamma import gamma_1d
+from .pairs import GAMMA_ROW, pair_key
+
+# 차이 열 이름 (측정 - 계획)
+DELTA_NAMES = tuple(f"Δ{name}" for name in METRIC_NAMES)
+TABLE_COLUMNS = ('file', 'type', 'plan') + tuple(METRIC_NAMES) + DELTA_NAMES + (GAMMA_ROW,)
+
+# 열 너비 (픽셀) = 가장 긴 글자 수 * CHAR_WIDTH * 1.2, 최소 MIN_COLUMN_WIDTH
+CHAR_WIDTH = 8
+MIN_COLUMN_WIDTH = 50
+
+
+def _format(value, sign=False):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    return f"{value:+.2f}" if sign else f"{value:.2f}"
+
+
+def _sort_value(text):
+    """정렬 키 - 숫자로 읽히는 칸은 숫자 순서, 빈 칸은 맨 뒤"""
+    try:
+        return (0, float(text.rstrip(' %')), '')
+    except ValueError:
+        return (1 if text else 2, 0.0, text)
+
+
+def match_plans(curves):
+    """
+    측정 곡선마다 짝지을 계획 곡선
+
+    계획/측정 단어를 뺀 이름이 같은 계획 (pairs.pair_key) 을 먼저 찾고, 없으면
+    불러온 계획이 하나뿐일 때 그 계획과 짝짓는다.
+
+    Returns:
+    dict: 측정 키 -> 계획 키 (짝이 없으면 None)
+    """
+    plans = {}
+    measured = []
+    for key in curves:
+        if curves.meta(key).kind == 'plan':
+            plans.setdefault(pair_key(key), key)
+        else:
+            measured.append(key)
+    only = next(iter(plans.values())) if len(plans) == 1 else None
+    return {key: plans.get(pair_key(key), only) for key in measured}
+
+
+class ComparisonTable:
+    """
+    파일별 지표 표 모델 (행 키: 곡선 키)
+
+    행마다 계산에 쓴 곡선 메타데이터/지표 dict 와 표시 이름을 기억하고, 그 객체가 그대로이면
+    (CurveStore 는 곡선을 다시 추가할 때만 새 객체를 만든다) 지표와 감마를 다시 계산하지 않는다.
+    열 너비는 열마다 글자 수 분포 (Counter) 를 바뀐 행만큼 고쳐서 구하므로 전체 칸을 훑지 않는다.
+
+    Parameters:
+    columns (tuple): 열 이름
+    """
+
+    def __init__(self, columns=TABLE_COLUMNS):
+        self.columns = tuple(columns)
+        self.keys = []
+        self.rows = {}
+        self.sort_column = None
+        self.reverse = False
+        self._sources = {}
+        self._lengths = [Counter({len(column): 1}) for column in self.columns]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def update(self, curves):
+        """
+        저장소와 비교하여 표 갱신
+
+        Returns:
+        tuple: (추가된 키, 값이 바뀐 키, 삭제된 키) 목록
+        """
+        keys = curves.keys()
+        removed = [key for key in self.rows if key not in curves]
+        for key in removed:
+            self._set_row(key, None)
+            del self._sources[key]
+
+        names = Counter(curves.meta(key).name for key in keys)
+        plans = match_plans(curves)
+        added, changed = [], []
+        for key in keys:
+            plan = plans.get(key)
+            source = self._source(curves, key, names)
+            if plan is not None:
+                source += self._source(curves, plan, names)
+            old = self._sources.get(key)
+            if old is not None and len(old) == len(source) and all(
+                    a is b or (isinstance(a, str) and a == b) for a, b in zip(old, source)):
+                continue
+            self._sources[key] = source
+            (changed if key in self.rows else added).append(key)
+            self._set_row(key, self._row(curves, key, plan, source))
+
+        if added or removed or self.sort_column is not None:
+            self.keys = keys
+            self._sort()
+        return added, changed, removed
+
+    def sort_by(self, column):
+        """열 기준 정렬 (같은 열을 다시 고르면 순서를 뒤집는다)"""
+        self.reverse = column == self.sort_column and not self.reverse
+        self.sort_column = column
+        self._sort()
+
+    def widths(self):
+        """열 이름 -> 너비 (픽셀)"""
+        return {column: max(MIN_COLUMN_WIDTH, int(max(lengths) * CHAR_WIDTH * 1.2))
+                for column, lengths in zip(self.columns, self._lengths)}
+
+    def _sort(self):
+        if self.sort_column is None:
+            return
+        i = self.columns.index(self.sort_column)
+        self.keys.sort(key=lambda key: _sort_value(self.rows[key][i]), reverse=self.reverse)
+
+    @staticmethod
+    def _source(curves, key, names):
+        meta = curves.meta(key)
+        name = meta.name if names[meta.name] == 1 else curves.display_name(key)
+        return (meta, curves.metrics(key), name)
+
+    @staticmethod
+    def _metrics(curves, key):
+        try:
+            return curves.metrics(key) or compute_metrics(*curves.curve(key))
+        except Exception as e:
+            print(f"파일 분석 오류 ({curves.meta(key).name}): {e}")
+            return {}
+
+    def _row(self, curves, key, plan, source):
+        meta = curves.meta(key)
+        metrics = self._metrics(curves, key)
+        values = {'file': source[2], 'type': meta.kind}
+        for name in METRIC_NAMES:
+            values[name] = _format(metrics.get(name))
+
+        if plan is not None:
+            values['plan'] = source[5]
+            plan_metrics = self._metrics(curves, plan)
+            for name, delta_name in zip(METRIC_NAMES, DELTA_NAMES):
+                if metrics.get(name) is not None and plan_metrics.get(name) is not None:
+                    values[delta_name] = _format(metrics[name] - plan_metrics[name], sign=True)
+            # 감마 통과율 (기준: 측정, 평가: 계획, 3%/3mm global)
+            try:
+                result = gamma_1d(*curves.curve(key), *curves.curve(plan))
+                values[GAMMA_ROW] = f"{result.pass_rate:.1f} %"
+            except ValueError as e:
+                print(f"감마 분석 오류 ({meta.name}): {e}")
+        return tuple(values.get(column, '') for column in self.columns)
+
+    def _set_row(self, key, row):
+        old = self.rows.pop(key, None)
+        if old is not None:
+            for lengths, text in zip(self._lengths, old):
+                lengths[len(text)] -= 1
+                if not lengths[len(text)]:
+                    del lengths[len(text)]
+        if row is not None:
+            self.rows[key] = row
+            for lengths, text in zip(self._lengths, row):
+                lengths[len(text)] += 1
+
+
+class VirtualTable:
+    """
+    ComparisonTable 을 보여주는 가상 스크롤 Treeview
+
+    Treeview 에는 화면에 들어가는 행 수만큼의 항목만 두고, 스크롤하면 각 항목이 보여줄 행을
+    바꾼다. refresh() 는 표시 내용이 달라진 항목만 Treeview 에 다시 쓴다.
+    선택은 행 키로 기억하므로 스크롤해도 유지된다.
+
+    Parameters:
+    tree: columns=table.columns, show='headings' 로 만든 ttk.Treeview
+    scrollbar: 세로 ttk.Scrollbar
+    table (ComparisonTable): 표 모델
+    row_height (int): Treeview 스타일의 rowheight (픽셀)
+    """
+
+    def __init__(self, tree, scrollbar, table, row_height=25):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.table = table
+        self.row_height = row_height
+        self.first = 0
+        self.selected = set()
+        self._items = []
+        self._shown = {}
+        self._widths = {}
+
+        scrollbar.config(command=self.yview)
+        for column in table.columns:
+            tree.heading(column, text=column, command=lambda c=column: self.sort_by(c))
+        tree.bind('<Configure>', self.on_resize)
+        tree.bind('<<TreeviewSelect>>', self.on_select)
+        tree.bind('<MouseWheel>', self.on_wheel)
+        tree.bind('<Button-4>', lambda e: self.scroll(-3))
+        tree.bind('<Button-5>', lambda e: self.scroll(3))
+
+    def refresh(self):
+        """보이는 항목 중 표시 내용이 바뀐 것만 갱신"""
+        table = self.table
+        n_rows = len(table)
+        self.first = max(0, min(self.first, n_rows - len(self._items)))
+        blank = ('',) * len(table.columns)
+        selection = []
+        for i, item in enumerate(self._items):
+            index = self.first + i
+            key = table.keys[index] if index < n_rows else None
+            shown = (key, table.rows[key] if key is not None else blank,
+                     'evenrow' if index % 2 == 0 else 'oddrow')
+            if self._shown.get(item) != shown:
+                self.tree.item(item, values=shown[1], tags=(shown[2],))
+                self._shown[item] = shown
+            if key in self.selected:
+                selection.append(item)
+        if set(self.tree.selection()) != set(selection):
+            self.tree.selection_set(selection)
+
+        if n_rows > len(self._items):
+            self.scrollbar.set(self.first / n_rows, (self.first + len(self._items)) / n_rows)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+        for column, width in table.widths().items():
+            if self._widths.get(column) != width:
+                self.tree.column(column, width=width, minwidth=MIN_COLUMN_WIDTH, stretch=False)
+                self._widths[column] = width
+
+    def selected_keys(self):
+        """선택된 행 키 (표 순서, 화면 밖 행 포함)"""
+        return [key for key in self.table.keys if key in self.selected]
+
+    def selected_rows(self):
+        """선택된 행 값 (표 순서, 화면 밖 행 포함)"""
+        return [self.table.rows[key] for key in self.selected_keys()]
+
+    def sort_by(self, column):
+        self.table.sort_by(column)
+        self.refresh()
+
+    def scroll(self, count):
+        self.first += count
+        self.refresh()
+        return 'break'
+
+    def yview(self, *args):
+        """세로 스크롤바 command ('moveto', 비율 / 'scroll', 수, 'units' 또는 'pages')"""
+        if args[0] == 'moveto':
+            self.first = int(round(float(args[1]) * len(self.table)))
+            self.refresh()
+        elif args[0] == 'scroll':
+            step = max(len(self._items) - 1, 1) if args[2] == 'pages' else 1
+            self.scroll(int(args[1]) * step)
+
+    def on_wheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def on_resize(self, event):
+        """창 높이에 맞게 화면 행 수 조정 (머리글 한 줄 제외)"""
+        count = max(event.height // self.row_height - 1, 1)
+        while len(self._items) < count:
+            self._items.append(self.tree.insert('', 'end'))
+        while len(self._items) > count:
+            item = self._items.pop()
+            self._shown.pop(item, None)
+            self.tree.delete(item)
+        self.refresh()
+
+    def on_select(self, event=None):
+        """화면 항목 선택 -> 행 키 선택 (refresh 가 다시 적용한 선택이면 그대로 둠)"""
+        visible = {shown[0] for shown in self._shown.values() if shown[0] is not None}
+        chosen = {self._shown[item][0] for item in self.tree.selection()
+                  if item in self._shown and self._shown[item][0] is not None}
+        if chosen != self.selected & visible:
+            self.selected = chosen
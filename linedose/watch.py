@@ -0,0 +1,188 @@
+"""
+감시 폴더 - 새로 생기거나 바뀐 TXT/CSV 파일만 분석
+
+폴더를 주기적으로 확인하여 파일 크기와 수정 시각만 비교하고 (파일 내용은 읽지 않음),
+바뀐 파일이 settle 초 동안 더 이상 바뀌지 않으면 (쓰기 완료) 준비된 파일로 돌려준다.
+이미 처리한 파일은 다시 바뀌기 전까지 파싱하지 않는다.
+
+사용법:
+    python -m linedose.watch [-o results.csv] [--settle 2] [--existing] 폴더 ...
+"""
+import argparse
+import os
+import sys
+import time
+
+from .batch import run_batch, write_results
+from .cache import CurveCache
+from .parsers import FILE_KINDS
+
+
+class FolderWatcher:
+    """
+    폴더의 새 파일/바뀐 파일 감지 (폴링 방식, 외부 라이브러리 없음)
+
+    Parameters:
+    directories (str 또는 list): 감시할 폴더
+    recursive (bool): 하위 폴더까지 감시
+    settle (float): 크기/수정 시각이 이 시간 (초) 동안 그대로여야 쓰기가 끝난 것으로 본다
+    include_existing (bool): True 이면 감시 시작 시점에 이미 있던 파일도 준비된 파일로 돌려준다
+    """
+
+    def __init__(self, directories, recursive=False, settle=2.0, include_existing=False):
+        if isinstance(directories, str):
+            directories = [directories]
+        self.directories = [os.path.abspath(directory) for directory in directories]
+        self.recursive = recursive
+        self.settle = settle
+        self._known = {}    # 처리한 파일 경로 -> (크기, 수정 시각)
+        self._pending = {}  # 바뀐 파일 경로 -> ((크기, 수정 시각), 마지막으로 바뀐 것을 본 시각)
+
+        snapshot = self._scan()
+        if include_existing:
+            now = time.monotonic()
+            self._pending = {path: (signature, now - settle)
+                             for path, signature in snapshot.items()}
+        else:
+            self._known = snapshot
+
+    def _scan(self):
+        """지원되는 파일의 경로 -> (크기, 수정 시각) (stat 만 사용)"""
+        snapshot = {}
+        stack = list(self.directories)
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    for item in it:
+                        try:
+                            if item.is_dir():
+                                if self.recursive:
+                                    stack.append(item.path)
+                                continue
+                            if os.path.splitext(item.name)[1].lower() not in FILE_KINDS:
+                                continue
+                            stat = item.stat()
+                        except OSError:
+                            continue
+                        snapshot[item.path] = (stat.st_size, stat.st_mtime_ns)
+            except OSError as e:
+                print(f"폴더를 읽을 수 없습니다 ({directory}): {e}", file=sys.stderr)
+        return snapshot
+
+    @staticmethod
+    def _readable(path):
+        """다른 프로그램이 아직 쓰고 있어 열 수 없는 파일 (Windows) 은 False"""
+        try:
+            with open(path, 'rb'):
+                return True
+        except OSError:
+            return False
+
+    def poll(self, now=None):
+        """
+        폴더를 한 번 확인하고 쓰기가 끝난 새 파일/바뀐 파일 목록 반환 (기다리지 않음)
+
+        Returns:
+        list: 준비된 파일 경로 (정렬된 순서)
+        """
+        if now is None:
+            now = time.monotonic()
+        snapshot = self._scan()
+
+        # 삭제된 파일은 잊는다 (같은 이름으로 다시 생기면 새 파일로 처리)
+        for table in (self._known, self._pending):
+            for path in [path for path in table if path not in snapshot]:
+                del table[path]
+
+        ready = []
+        for path, signature in snapshot.items():
+            if self._known.get(path) == signature:
+                continue
+            pending = self._pending.get(path)
+            if pending is None or pending[0] != signature:
+                # 새로 바뀜 - settle 시간 동안 지켜본다
+                self._pending[path] = (signature, now)
+                continue
+            if now - pending[1] < self.settle or signature[0] == 0 or not self._readable(path):
+                continue
+            del self._pending[path]
+            self._known[path] = signature
+            ready.append(path)
+        return sorted(ready)
+
+    @property
+    def pending(self):
+        """쓰기가 끝나기를 기다리는 파일 수"""
+        return len(self._pending)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m linedose.watch',
+        description='감시 폴더에 새로 들어온 TXT/CSV 파일을 분석')
+    parser.add_argument('directories', nargs='+', help='감시할 폴더')
+    parser.add_argument('-o', '--output', default='-',
+                        help="결과 CSV 경로, 분석할 때마다 행을 이어 씀 (기본값: 표준 출력 '-')")
+    parser.add_argument('-r', '--recursive', action='store_true',
+                        help='하위 폴더까지 감시')
+    parser.add_argument('--settle', type=float, default=2.0,
+                        help='파일이 이 시간 (초) 동안 바뀌지 않으면 분석 (기본값: 2)')
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='폴더 확인 주기 (초, 기본값: 1)')
+    parser.add_argument('--existing', action='store_true',
+                        help='이미 있던 파일도 처음에 분석')
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help='한 번에 여러 파일이 들어올 때 사용할 작업 프로세스 수 (기본값: 1)')
+    parser.add_argument('--cache', metavar='DIR', nargs='?', const='', default=None,
+                        help='파싱 결과 캐시 사용 (폴더 생략 시 기본 사용자 캐시 폴더)')
+    parser.add_argument('--db', metavar='PATH', nargs='?', const='', default=None,
+                        help='결과를 데이터베이스에도 저장 (경로 생략 시 기본 사용자 데이터 폴더)')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    for directory in args.directories:
+        if not os.path.isdir(directory):
+            print(f"폴더가 아닙니다: {directory}", file=sys.stderr)
+            return 1
+
+    cache = CurveCache(args.cache or None) if args.cache is not None else None
+    db = None
+    if args.db is not None:
+        from .results import ResultsDB
+        db = ResultsDB(args.db or None)
+    watcher = FolderWatcher(args.directories, recursive=args.recursive,
+                            settle=args.settle, include_existing=args.existing)
+    print(f"감시 시작: {', '.join(watcher.directories)} (Ctrl+C 로 종료)", file=sys.stderr)
+
+    header = True
+    analyzed = failed = 0
+    try:
+        while True:
+            ready = watcher.poll()
+            if ready:
+                rows = run_batch(ready, workers=args.workers, cache=cache)
+                write_results(rows, args.output, append=True, header=header)
+                header = False
+                if db is not None:
+                    db.add(rows)
+                for row in rows:
+                    status = f"오류: {row['error']}" if row['error'] else 'OK'
+                    print(f"{row['file']}: {status}", file=sys.stderr)
+                analyzed += len(rows)
+                failed += sum(1 for row in rows if row['error'])
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if db is not None:
+            db.close()
+
+    print(f"{analyzed}개 파일 분석 (오류 {failed}개)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 설치하지 않은 상태에서도 저장소의 linedose 를 불러오도록 (benchmarks 와 같은 방식)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
@@ -0,0 +1,111 @@
+import io
+import os
+import tarfile
+import zipfile
+
+import numpy as np
+import pytest
+
+from linedose import archive
+from linedose.archive import (close_archives, getmtime, list_members, member_key, read_member,
+                              split_member)
+from linedose.batch import collect_files
+from linedose.parsers import FILE_KINDS, read_file
+from linedose.synthetic import generate_dataset
+
+
+@pytest.fixture(autouse=True)
+def closed_archives():
+    yield
+    close_archives()
+
+
+@pytest.fixture
+def pair(tmp_path):
+    return generate_dataset(str(tmp_path / 'data'), 1, noise=0.0)[0]
+
+
+def _zip(path, files):
+    with zipfile.ZipFile(path, 'w') as handle:
+        for name, data in files.items():
+            handle.writestr(name, data)
+    return str(path)
+
+
+def _tar(path, files, mode='w'):
+    with tarfile.open(path, mode) as handle:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = 1700000000
+            handle.addfile(info, io.BytesIO(data))
+    return str(path)
+
+
+def _contents(pair):
+    return {os.path.basename(path): open(path, 'rb').read() for path in pair}
+
+
+def test_zip_member_keys(tmp_path, pair):
+    files = _contents(pair)
+    files['day1/notes.md'] = b'not data'
+    path = _zip(tmp_path / 'qa.zip', {f"day1/{name}": data for name, data in files.items()})
+    keys = list_members(path, extensions=FILE_KINDS)
+    assert keys == sorted(member_key(path, f"day1/{os.path.basename(p)}") for p in pair)
+    assert split_member(keys[0]) == (path, keys[0][len(path) + 1:])
+    assert list_members(path, patterns=['measured*']) == [key for key in keys if 'measured' in key]
+    for key, source in zip(sorted(keys), sorted(pair)):
+        assert read_member(key) == open(source, 'rb').read()
+        for a, b in zip(read_file(key), read_file(source)):
+            assert np.array_equal(a, b) if isinstance(a, np.ndarray) else a == b
+    assert collect_files([path]) == keys
+
+
+def test_tar_dot_prefix(tmp_path, pair):
+    files = {f"./{name}": data for name, data in _contents(pair).items()}
+    for mode, suffix in (('w', '.tar'), ('w:gz', '.tar.gz')):
+        path = _tar(tmp_path / f"qa{suffix}", files, mode)
+        keys = list_members(path)
+        # 키에서는 './' 를 떼고, 읽을 때 다시 찾는다
+        assert [os.path.basename(key) for key in keys] == sorted(name[2:] for name in files)
+        assert read_member(keys[0]) == files['./' + os.path.basename(keys[0])]
+        assert getmtime(keys[0]) == 1700000000.0
+        with pytest.raises(FileNotFoundError):
+            read_member(member_key(path, 'missing.csv'))
+
+
+def test_folder_named_like_archive_is_not_archive(tmp_path):
+    folder = tmp_path / 'x.zip'
+    folder.mkdir()
+    path = str(folder / 'm.csv')
+    assert split_member(path) == (path, None)
+
+
+def test_reopen_after_change(tmp_path):
+    path = _zip(tmp_path / 'qa.zip', {'m.csv': b'old'})
+    key = member_key(path, 'm.csv')
+    assert read_member(key) == b'old'
+    old = archive._open_archives[path].handle
+    _zip(tmp_path / 'qa.zip', {'m.csv': b'new content'})
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert read_member(key) == b'new content'
+    # 바뀌기 전의 핸들은 닫힘
+    assert old.fp is None
+
+
+def test_evicted_handles_close_after_last_reader(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, 'MAX_OPEN_ARCHIVES', 1)
+    first = _zip(tmp_path / 'a.zip', {'m.csv': b'a'})
+    second = _zip(tmp_path / 'b.zip', {'m.csv': b'b'})
+    with archive._archive(first) as handle:
+        # 읽는 중에 밀려나도 닫지 않는다
+        assert read_member(member_key(second, 'm.csv')) == b'b'
+        assert first not in archive._open_archives
+        assert handle.read('m.csv') == b'a'
+    assert handle.fp is None
+    second_handle = archive._open_archives[second].handle
+    assert read_member(member_key(first, 'm.csv')) == b'a'
+    assert second_handle.fp is None
+    close_archives()
+    assert not archive._open_archives
@@ -0,0 +1,81 @@
+import csv
+import io
+import os
+
+import pytest
+
+from linedose.analysis import analyze_file
+from linedose.batch import (RESULT_COLUMNS, Progress, collect_files, main, run_batch,
+                            write_results)
+from linedose.synthetic import generate_dataset
+
+
+@pytest.fixture
+def files(tmp_path):
+    pairs = generate_dataset(str(tmp_path / 'data'), 3, noise=0.0)
+    return [path for pair in pairs for path in pair]
+
+
+def _read(path):
+    with open(path, newline='', encoding='utf-8') as file:
+        return list(csv.DictReader(file))
+
+
+def test_collect_files(tmp_path, files):
+    folder = str(tmp_path / 'data')
+    os.makedirs(os.path.join(folder, 'sub'))
+    nested = os.path.join(folder, 'sub', 'measured_extra.csv')
+    with open(nested, 'w') as file:
+        file.write('')
+    with open(os.path.join(folder, 'notes.md'), 'w') as file:
+        file.write('')
+    assert collect_files([folder]) == sorted(files)
+    assert collect_files([folder], recursive=True) == sorted(files + [nested])
+    assert collect_files([folder], patterns=['plan*']) == sorted(files[::2])
+    # 파일을 직접 주면 확장자와 관계없이 그대로
+    assert collect_files([files[1], 'x.dat']) == sorted([files[1], 'x.dat'])
+
+
+def test_run_batch_keeps_input_order(tmp_path, files):
+    paths = files + [str(tmp_path / 'missing.csv')]
+    rows = run_batch(paths, workers=1)
+    assert [row['path'] for row in rows] == paths
+    assert [row['kind'] for row in rows] == ['plan', 'measurement'] * 3 + ['']
+    assert rows[0] == analyze_file(files[0])
+    assert rows[-1]['error'].startswith('FileNotFoundError')
+    # 작업 프로세스로 나누어도 같은 결과, 같은 순서
+    assert run_batch(paths, workers=2, chunksize=1) == rows
+    assert run_batch([], workers=2) == []
+
+
+def test_write_results(tmp_path, files):
+    rows = run_batch(files[:2], workers=1)
+    output = str(tmp_path / 'results.csv')
+    write_results(rows, output)
+    write_results(rows[:1], output, append=True)
+    table = _read(output)
+    assert list(table[0]) == list(RESULT_COLUMNS)
+    assert [row['file'] for row in table] == ['plan_00000.txt', 'measured_00000.csv',
+                                              'plan_00000.txt']
+    assert table[0]['D90'] == f"{rows[0]['D90']:.4f}" and table[0]['error'] == ''
+
+
+def test_main(tmp_path, files, capsys):
+    output = str(tmp_path / 'results.csv')
+    assert main(['-q', '-j', '1', '-o', output, str(tmp_path / 'data')]) == 0
+    assert len(_read(output)) == len(files)
+    assert main(['-q', '-j', '1', '-o', output, files[0], str(tmp_path / 'missing.csv')]) == 2
+    assert _read(output)[1]['error']
+    # 분석할 파일이 없는 폴더
+    (tmp_path / 'empty').mkdir()
+    assert main(['-q', str(tmp_path / 'empty')]) == 1
+
+
+def test_progress_status():
+    stream = io.StringIO()
+    progress = Progress(4, stream=stream)
+    progress.update()
+    progress.update(failed='ValueError: x')
+    status = progress.status(now=progress.start + 2.0)
+    assert status.startswith('2/4 (50.0%), 오류 1') and '1.0 파일/s' in status
+    assert status.endswith('남은 시간 0:00:02')
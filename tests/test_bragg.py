@@ -0,0 +1,89 @@
+import os
+
+import numpy as np
+import pytest
+
+from linedose.bragg import (FIT_METRICS, analyze_peaks, bragg_kleeman, fit_range_energy,
+                            peak_metrics, stack_curves)
+from linedose.synthetic import (BRAGG_KLEEMAN_ALPHA, BRAGG_KLEEMAN_P, generate_peaks,
+                                pristine_peak, straggling_sigma)
+
+ENERGIES = (70.0, 100.0, 150.0, 200.0, 230.0)
+
+
+def _range(energy):
+    return BRAGG_KLEEMAN_ALPHA * energy ** BRAGG_KLEEMAN_P
+
+
+@pytest.mark.parametrize('energy', ENERGIES)
+def test_peak_metrics_of_known_range(energy):
+    range_mm = _range(energy)
+    depth = np.arange(0.0, range_mm + 30.0, 0.5)
+    metrics = peak_metrics(depth, 3.0 * pristine_peak(depth, range_mm))
+    # Bortfeld 근사에서 R80 은 straggling 전 비정과 거의 같다
+    assert metrics['R80'] == pytest.approx(range_mm, abs=0.05)
+    assert metrics['peak'] < metrics['R90'] < metrics['R80'] < metrics['R50'] < metrics['R20']
+    # fall-off 폭은 비정 퍼짐에 비례
+    assert 1.0 < metrics['DFO'] / straggling_sigma(range_mm) < 2.0
+    assert 2.5 < metrics['PPR'] < 5.0
+
+
+def test_stacked_curves_match_single():
+    depths, doses = [], []
+    for energy, step in zip(ENERGIES, (0.3, 0.5, 0.7, 1.0, 0.4)):
+        depth = np.arange(0.0, _range(energy) + 20.0, step)
+        depths.append(depth)
+        doses.append(pristine_peak(depth, _range(energy)))
+    metrics = peak_metrics(*stack_curves(depths, doses))
+    for i, (depth, dose) in enumerate(zip(depths, doses)):
+        single = peak_metrics(depth, dose)
+        for name, value in single.items():
+            assert metrics[name][i] == pytest.approx(value)
+
+
+def test_fit_recovers_bragg_kleeman():
+    energies = np.array(ENERGIES)
+    ranges = {'R80': _range(energies), 'R90': np.append(_range(energies[:-1]), np.nan)}
+    fits = fit_range_energy(energies, ranges)
+    assert fits['R80'].alpha == pytest.approx(BRAGG_KLEEMAN_ALPHA)
+    assert fits['R80'].exponent == pytest.approx(BRAGG_KLEEMAN_P)
+    assert fits['R80'].rms == pytest.approx(0.0, abs=1e-9) and fits['R80'].count == 5
+    # NaN 비정은 그 지표에서만 빠진다
+    assert fits['R90'].count == 4 and fits['R90'].exponent == pytest.approx(BRAGG_KLEEMAN_P)
+    assert np.allclose(bragg_kleeman(energies, fits['R80']), ranges['R80'])
+
+
+def test_fit_needs_two_energies():
+    fits = fit_range_energy([150.0, np.nan, -1.0], {'R80': [156.0, 100.0, 50.0]})
+    assert fits['R80'].count == 1
+    assert np.isnan([fits['R80'].alpha, fits['R80'].exponent, fits['R80'].rms]).all()
+    fits = fit_range_energy([150.0, 150.0], {'R80': [156.0, 156.0]})
+    assert np.isnan(fits['R80'].exponent)
+
+
+def test_analyze_peaks(tmp_path):
+    paths = generate_peaks(str(tmp_path), ENERGIES[::-1], noise=0.0)
+    rows, fits = analyze_peaks(paths, workers=1)
+    assert [row['energy'] for row in rows] == list(ENERGIES)
+    assert not any(row['error'] for row in rows)
+    assert set(fits) == set(FIT_METRICS)
+    assert fits['R80'].exponent == pytest.approx(BRAGG_KLEEMAN_P, abs=0.01)
+    for row in rows:
+        assert row['R80'] == pytest.approx(_range(row['energy']), abs=0.1)
+        assert abs(row['R80_residual']) < 0.1
+
+
+def test_analyze_peaks_with_too_few_energies(tmp_path):
+    first, second = generate_peaks(str(tmp_path), [150.0, 200.0], noise=0.0)
+    unknown = str(tmp_path / 'peak_unknown.csv')
+    os.rename(second, unknown)
+    rows, fits = analyze_peaks([unknown, first], workers=1)
+    # 에너지가 하나뿐이면 관계를 맞추지 못하고, 에너지 없는 곡선은 오류 행으로 맨 뒤에
+    assert [row['path'] for row in rows] == [first, unknown]
+    assert fits['R80'].count == 1 and np.isnan(fits['R80'].exponent)
+    assert 'R80_fit' not in rows[0] and not rows[0]['error']
+    assert rows[1]['energy'] is None and '에너지' in rows[1]['error']
+    assert rows[1]['R80'] == pytest.approx(_range(200.0), abs=0.1)
+
+    rows, fits = analyze_peaks([str(tmp_path / 'missing.csv')], workers=1)
+    assert rows[0]['error'] and fits == {}
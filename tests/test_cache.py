@@ -0,0 +1,61 @@
+import os
+
+import numpy as np
+import pytest
+
+from linedose.analysis import analyze_file, load_curve
+from linedose.cache import CurveCache, content_hash
+from linedose.synthetic import generate_dataset
+
+
+@pytest.fixture
+def pair(tmp_path):
+    return generate_dataset(str(tmp_path / 'data'), 1, noise=0.0)[0]
+
+
+@pytest.mark.parametrize('use_content_hash', [False, True])
+def test_round_trip(tmp_path, pair, use_content_hash):
+    cache = CurveCache(str(tmp_path / 'cache'), use_content_hash=use_content_hash)
+    for path in pair:
+        assert cache.get(path) is None
+        depth, dose, kind, metrics = cache.load(path)
+        cached = cache.get(path)
+        assert cached is not None
+        assert np.array_equal(cached[0], depth)
+        assert np.array_equal(cached[1], dose)
+        assert cached[2] == kind
+        assert cached[3] == metrics
+        # 캐시 없이 분석한 결과와 같음
+        fresh = load_curve(path)
+        assert np.allclose(fresh[0], depth) and np.allclose(fresh[1], dose)
+        assert analyze_file(path, cache) == analyze_file(path)
+
+
+def test_changed_file_misses(tmp_path, pair):
+    cache = CurveCache(str(tmp_path / 'cache'))
+    plan = pair[0]
+    cache.load(plan)
+    with open(plan, 'a') as file:
+        file.write("\n")
+    stat = os.stat(plan)
+    os.utime(plan, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert cache.get(plan) is None
+
+
+def test_overwrite_keeps_size_and_evicts(tmp_path, pair):
+    cache = CurveCache(str(tmp_path / 'cache'))
+    depth = np.arange(100.0)
+    for _ in range(5):
+        cache.put(pair[0], depth, depth, 'plan', {'D90': 1.0})
+    assert cache._total_bytes == cache.size()
+    cache.put(pair[1], depth, depth, 'measurement', {})
+    assert cache._total_bytes == cache.size()
+    cache.clear()
+    assert cache.size() == 0
+    assert cache.get(pair[0]) is None
+
+
+def test_content_hash_ignores_mtime(tmp_path, pair):
+    digest = content_hash(pair[0])
+    os.utime(pair[0], (0, 0))
+    assert content_hash(pair[0]) == digest
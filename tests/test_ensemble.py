@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from linedose.analysis import normalize_dose
+from linedose.ensemble import (common_grid, envelope, find_outliers, normalize_batch,
+                               outlier_scores, resample)
+from linedose.synthetic import sobp_curve
+
+
+def _repeats(count=8, shift=0.0, seed=0):
+    """반복 측정 - 깊이 샘플링과 잡음이 조금씩 다른 같은 SOBP"""
+    rng = np.random.default_rng(seed)
+    depths, doses = [], []
+    for i in range(count):
+        depth = np.arange(0.2 * i, 200.0, 0.5 + 0.05 * i)
+        dose = sobp_curve(depth - shift * (i == count - 1), 150.0, 60.0)
+        depths.append(depth)
+        doses.append(dose * (1 + 0.002 * rng.standard_normal(depth.size)))
+    return depths, doses
+
+
+def test_common_grid_overlap_and_union():
+    depths = [np.arange(0.0, 100.5, 0.5), np.arange(10.0, 150.1, 1.0)]
+    grid = common_grid(depths)
+    assert grid[0] == 10.0 and grid[-1] == 100.0
+    assert np.allclose(np.diff(grid), 0.5)
+    union = common_grid(depths, union=True, step=2.0)
+    assert union[0] == 0.0 and union[-1] == 150.0
+
+
+def test_common_grid_without_overlap():
+    depths = [np.arange(0.0, 50.0, 1.0), np.arange(60.0, 100.0, 1.0)]
+    with pytest.raises(ValueError):
+        common_grid(depths)
+    grid = common_grid(depths, union=True)
+    stack = resample(depths, [np.ones(50), 2 * np.ones(40)], grid)
+    # 각 곡선의 범위 밖은 NaN - 어느 격자 점에서도 두 곡선이 함께 있지 않다
+    assert not (~np.isnan(stack)).all(axis=0).any()
+    stats = envelope(grid, stack)
+    assert set(stats.count) == {0, 1}
+    assert np.all(np.isnan(stats.mean[stats.count == 0]))
+    assert np.all(stats.std[stats.count == 1] == 0.0)
+    with pytest.raises(ValueError):
+        common_grid([np.array([1.0])])
+
+
+def test_resample_sorts_and_matches_interp():
+    depth = np.array([0.0, 2.0, 1.0, 3.0])
+    dose = np.array([0.0, 20.0, 10.0, 30.0])
+    grid = np.array([-1.0, 0.5, 2.5, 4.0])
+    stack = resample([depth, np.empty(0)], [dose, np.empty(0)], grid)
+    assert np.isnan(stack[0, [0, 3]]).all()
+    assert np.allclose(stack[0, 1:3], [5.0, 25.0])
+    assert np.isnan(stack[1]).all()
+    with pytest.raises(ValueError):
+        resample([depth], [dose[:2]], grid)
+
+
+def test_envelope_matches_numpy():
+    depths, doses = _repeats()
+    grid = common_grid(depths)
+    stack = resample(depths, doses, grid)
+    stats = envelope(grid, stack)
+    assert np.all(stats.count == len(depths))
+    assert np.allclose(stats.mean, stack.mean(axis=0))
+    assert np.allclose(stats.std, stack.std(axis=0, ddof=1))
+    assert np.array_equal(stats.min, stack.min(axis=0))
+    assert np.array_equal(stats.max, stack.max(axis=0))
+
+
+def test_outlier_threshold():
+    depths, doses = _repeats(shift=3.0)
+    stack = resample(depths, doses, common_grid(depths))
+    scores = outlier_scores(stack)
+    assert np.argmax(scores) == len(depths) - 1
+    assert list(np.flatnonzero(find_outliers(stack))) == [len(depths) - 1]
+    # threshold 보다 큰 점수만 이상 곡선
+    assert not find_outliers(stack, threshold=scores.max()).any()
+    assert find_outliers(stack, threshold=scores.max() - 1e-9).sum() == 1
+    # 같은 곡선들은 이상 곡선이 없다
+    assert not find_outliers(np.tile(stack[0], (5, 1))).any()
+    assert outlier_scores(np.empty((0, 3))).size == 0
+
+
+def test_normalize_batch_matches_normalize_dose():
+    _, doses = _repeats(4)
+    normalized, valid = normalize_batch(doses + [np.zeros(5), np.empty(0)])
+    assert list(valid) == [True] * 4 + [False, False]
+    for dose, result in zip(doses, normalized):
+        assert np.allclose(result, normalize_dose(np.arange(dose.size), dose)[1])
+
+
+def test_normalize_batch_only_empty_curves():
+    normalized, valid = normalize_batch([np.empty(0), np.empty(0)])
+    assert not valid.any() and [array.size for array in normalized] == [0, 0]
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from linedose.gamma import gamma_1d
+
+
+def brute_force_gamma(ref_x, ref_y, eval_x, eval_y, dose_tol, dta_mm):
+    """평가 곡선을 촘촘히 내삽한 점 전체와 비교하는 기준 구현"""
+    fine_x = np.linspace(eval_x[0], eval_x[-1], 20001)
+    fine_y = np.interp(fine_x, eval_x, eval_y)
+    g2 = ((fine_x[None, :] - ref_x[:, None]) / dta_mm) ** 2 \
+        + ((fine_y[None, :] - ref_y[:, None]) / dose_tol) ** 2
+    return np.sqrt(g2.min(axis=1))
+
+
+def sobp(x, shift=0.0):
+    return 100.0 / (1.0 + np.exp((x - 150.0 - shift) / 2.0)) * (0.8 + 0.2 * x / 150.0)
+
+
+def test_identical_curves_pass():
+    x = np.arange(0.0, 200.0, 0.5)
+    y = sobp(x)
+    result = gamma_1d(x, y, x, y)
+    assert result.pass_rate == 100.0
+    assert np.allclose(result.gamma, 0.0)
+    assert np.allclose(result.dose_diff, 0.0)
+
+
+def test_gamma_matches_brute_force():
+    ref_x = np.arange(0.0, 200.0, 1.0)
+    eval_x = np.arange(0.0, 200.0, 0.7)
+    ref_y = sobp(ref_x)
+    eval_y = sobp(eval_x, shift=2.0) * 1.01
+    result = gamma_1d(ref_x, ref_y, eval_x, eval_y, max_gamma=10.0)
+    expected = brute_force_gamma(ref_x, ref_y, eval_x, eval_y, 0.03 * ref_y.max(), 3.0)
+    assert np.allclose(result.gamma, np.minimum(expected, 10.0), atol=2e-3)
+
+
+def test_dta_of_shifted_linear_profile():
+    # 같은 깊이의 선량차로 얻는 감마 상한이 작아도 DTA 는 탐색 반경 전체에서 찾아야 한다
+    x = np.arange(0.0, 80.0, 0.5)
+    ref = 50.0 + 0.5 * x
+    shifted = 50.0 + 0.5 * (x - 4.0)
+    result = gamma_1d(x, ref, x, shifted, dose_percent=3.0, dta_mm=3.0)
+    inside = x + 4.0 <= x[-1]
+    assert np.allclose(result.dta[inside], 4.0)
+    assert np.isnan(result.dta[~inside]).all()
+
+
+def test_local_normalization_and_errors():
+    x = np.arange(0.0, 50.0, 1.0)
+    y = np.full(x.shape, 50.0)
+    result = gamma_1d(x, y, x, y * 1.02, dose_percent=3.0, normalization='local')
+    assert result.pass_rate == 100.0
+    with pytest.raises(ValueError):
+        gamma_1d(x, y, x[:1], y[:1])
+    with pytest.raises(ValueError):
+        gamma_1d(x, y, x, y, normalization='relative')
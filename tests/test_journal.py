@@ -0,0 +1,39 @@
+import json
+import os
+
+import pytest
+
+from linedose import batch, journal
+from linedose.batch import iter_batch, main
+from linedose.cache import content_hash
+from linedose.synthetic import generate_dataset
+
+
+@pytest.fixture
+def files(tmp_path):
+    pairs = generate_dataset(str(tmp_path / 'data'), 2, noise=0.0)
+    return [path for pair in pairs for path in pair]
+
+
+def test_iter_batch_hashes_in_worker(files):
+    results = sorted(iter_batch(files, workers=1, digest=True))
+    assert [index for index, *_ in results] == list(range(len(files)))
+    for index, row, seconds, digest in results:
+        assert row['error'] == ''
+        assert digest == content_hash(files[index])
+    assert all(digest is None for *_, digest in iter_batch(files, workers=1))
+
+
+def test_record_uses_worker_hash(tmp_path, files, monkeypatch):
+    path = str(tmp_path / 'run.jsonl')
+    # 부모 프로세스의 journal 은 분석한 파일을 다시 읽지 않는다
+    monkeypatch.setattr(journal, 'try_content_hash', lambda path: pytest.fail('hashed in parent'))
+    assert main(['-j', '1', '-q', '-o', str(tmp_path / 'out.csv'), '--journal', path] + files) == 0
+    with open(path, encoding='utf-8') as file:
+        entries = [json.loads(line) for line in file]
+    assert {entry['path']: entry['hash'] for entry in entries} == {
+        os.path.abspath(file_path): content_hash(file_path) for file_path in files}
+
+    # 다시 실행하면 모든 파일을 journal 에서 가져온다
+    monkeypatch.setattr(batch, 'analyze_file', lambda *args: pytest.fail('analyzed again'))
+    assert main(['-j', '1', '-q', '-o', str(tmp_path / 'out.csv'), '--journal', path] + files) == 0
@@ -0,0 +1,52 @@
+import time
+
+import numpy as np
+
+from linedose.analysis import compute_metrics, load_curve
+from linedose.cache import CurveCache
+from linedose.loader import BackgroundLoader, load_entries
+from linedose.synthetic import generate_dataset
+
+
+def test_batched_normalization_matches_single(tmp_path):
+    paths = [path for pair in generate_dataset(str(tmp_path / 'data'), 3) for path in pair]
+    bad = tmp_path / 'data' / 'flat.csv'
+    bad.write_text("Curve depth: [mm]\n0;1;2\n\nCurve gains: [counts]\n\n")
+    missing = str(tmp_path / 'data' / 'missing.txt')
+    entries = load_entries(paths + [str(bad), missing])
+
+    for path, entry in zip(paths, entries):
+        depth, dose, kind = load_curve(path)
+        assert entry['kind'] == kind and not entry['error']
+        assert np.allclose(entry['dose'], dose)
+        assert entry['metrics'] == compute_metrics(depth, dose)
+    assert entries[-2]['error'] == "ValueError: 선량 데이터가 없습니다."
+    assert entries[-1]['error'].startswith('FileNotFoundError')
+
+
+def test_cache_is_filled_and_reused(tmp_path):
+    paths = list(generate_dataset(str(tmp_path / 'data'), 2)[0])
+    cache = CurveCache(str(tmp_path / 'cache'))
+    first = load_entries(paths, cache)
+    assert all(cache.get(path) is not None for path in paths)
+    second = load_entries(paths, cache)
+    for a, b in zip(first, second):
+        assert np.array_equal(a['dose'], b['dose'])
+        assert a['metrics'] == b['metrics']
+
+
+def test_background_loader_keeps_input_order(tmp_path):
+    paths = [path for pair in generate_dataset(str(tmp_path / 'data'), 10) for path in pair]
+    loader = BackgroundLoader(workers=2)
+    try:
+        loader.start(paths)
+        entries = []
+        deadline = time.monotonic() + 30
+        while loader.busy and time.monotonic() < deadline:
+            entries.extend(loader.poll())
+            time.sleep(0.01)
+        entries.extend(loader.poll())
+    finally:
+        loader.shutdown()
+    assert sorted(entry['index'] for entry in entries) == list(range(len(paths)))
+    assert all(paths[entry['index']] == entry['path'] for entry in entries)
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from linedose.analysis import compute_metrics, find_x_for_y, normalize_dose
+from linedose.metrics import distal_depths, level_depths, proximal_depths
+from linedose.synthetic import sobp_curve
+
+
+def legacy_metrics(depth, dose):
+    """예전 GUI 의 계산: 레벨 이상인 마지막 (P95 는 첫) 점 주변 3점에서 find_x_for_y"""
+    metrics = {}
+    for name, level in (('D90', 90), ('D50', 50), ('D20', 20), ('D10', 10)):
+        i = np.where(dose >= level)[0].max()
+        metrics[name] = find_x_for_y(depth[i:i + 3], dose[i:i + 3], level)
+    j = np.where(dose >= 95)[0].min()
+    metrics['P95'] = find_x_for_y(depth[j - 2:j + 1], dose[j - 2:j + 1], 95)
+    metrics['SOBP'] = metrics['D90'] - metrics['P95']
+    return metrics
+
+
+@pytest.fixture(params=[(120.0, 40.0, 0.5), (200.0, 80.0, 0.1), (90.0, 20.0, 1.0)])
+def curve(request):
+    range_mm, width_mm, resolution = request.param
+    depth = np.arange(0.0, range_mm + 30.0, resolution)
+    return normalize_dose(depth, 200.0 * sobp_curve(depth, range_mm, width_mm))
+
+
+def test_metrics_match_legacy(curve):
+    depth, dose = curve
+    metrics = compute_metrics(depth, dose)
+    expected = legacy_metrics(depth, dose)
+    for name, value in expected.items():
+        assert metrics[name] == pytest.approx(value, abs=1e-9)
+
+
+def test_single_and_stacked_paths_agree(curve):
+    depth, dose = curve
+    levels = [100.5, 95, 90, 50, 20, 10, 0, -1]
+    stacked_depth = np.vstack([depth, depth])
+    stacked_dose = np.vstack([dose, dose[::-1]])
+    for func in (distal_depths, proximal_depths):
+        single = func(depth, dose, levels)
+        stacked = func(stacked_depth, stacked_dose, levels)
+        assert np.allclose(single, stacked[:, 0], equal_nan=True)
+        assert np.allclose(func(depth, dose[::-1], levels), stacked[:, 1], equal_nan=True)
+
+
+def test_stack_with_nan_padding():
+    depth = np.arange(0.0, 10.0)
+    dose = np.array([[50, 80, 100, 100, 60, 20, 5, 0, 0, 0],
+                     [60, 100, 70, 30, 0, np.nan, np.nan, np.nan, np.nan, np.nan]], dtype=float)
+    result = level_depths(depth, dose, distal=[50])
+    assert result['D50'] == pytest.approx([4.25, 2.5])
+
+
+def test_missing_crossing_raises():
+    depth = np.arange(0.0, 10.0)
+    with pytest.raises(ValueError):
+        compute_metrics(depth, np.full(depth.shape, 100.0))
+
+
+@pytest.mark.parametrize('n_points', [0, 1])
+def test_too_short_curve(n_points):
+    depth = np.arange(float(n_points))
+    # 빠른 경로 (1차원) 와 묶음 경로 모두 NaN, 지표 계산은 IndexError 가 아닌 ValueError
+    assert np.isnan(distal_depths(depth, depth, [50.0, 90.0])).all()
+    assert np.isnan(proximal_depths(depth, depth, [95.0])).all()
+    with pytest.raises(ValueError):
+        compute_metrics(depth, depth)
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+from linedose import parsers
+from linedose.parsers import (_count_values, _decode_columns, decode_numbers, extract_csv_data,
+                              extract_txt_data, iter_curves, read_file)
+from linedose.synthetic import write_raystation_txt, write_zebra_csv
+
+MULTI_CSV = """Zebra session;2024
+Operator: QA
+
+Curve name: E0
+Energy: 70.0 MeV
+Curve depth: [mm]
+0.00;1.00;2.00
+Curve gains: [counts]
+10.0;20.0;30.0
+
+Curve name: E1
+Energy: 100.0 MeV
+Curve depth: [mm]
+0.00;1.00;2.00;3.00
+Curve gains: [counts]
+1.0;2.0;3.0;4.0
+
+"""
+
+MULTI_TXT = """Line dose
+Beam: 1
+
+Distance(cm)   Dose (cGy)
+0.0000   100.0
+0.1000   110.0
+Beam: 2
+
+Distance(cm)   Dose (cGy)
+0.0000   50.0
+0.1000   55.0
+0.2000   60.0
+"""
+
+
+def test_decode_numbers():
+    assert np.array_equal(decode_numbers(b"1;2;3\n4", sep=b';'), [1, 2, 3, 4])
+    assert decode_numbers(b" \n ").size == 0
+    with pytest.raises(ValueError):
+        decode_numbers(b"1 2 abc 4")
+
+
+@pytest.mark.parametrize('block', [b"1", b" 1  2\t3\r\n4 ", b"\n1.5e3 -2\n\n  nan", b"1 2 3x"])
+def test_count_values(block):
+    assert _count_values(block) == len(block.split())
+
+
+def test_decode_numbers_checks_count(monkeypatch):
+    # NumPy 1.x 경로: 변환된 값의 개수를 직접 확인
+    monkeypatch.setattr(parsers, '_FROMSTRING_RAISES', False)
+    assert np.array_equal(decode_numbers(b" 1\t2\n3 "), [1, 2, 3])
+    for block in (b"1 2 abc 4", b"1 2 3 x", b"x"):
+        with pytest.raises(ValueError):
+            decode_numbers(block)
+
+
+def test_decode_columns_skips_other_lines():
+    values = _decode_columns(b"1 2\n# comment line\n3 4\n", 2)
+    assert np.array_equal(values, [[1, 2], [3, 4]])
+
+
+def test_single_curve_csv(tmp_path):
+    depth = np.arange(0.0, 10.0, 0.5)
+    dose = 1000.0 + depth
+    path = str(tmp_path / "measured.csv")
+    write_zebra_csv(path, depth, dose)
+    parsed_depth, parsed_dose = extract_csv_data(path)
+    assert np.allclose(parsed_depth, depth)
+    assert np.allclose(parsed_dose, dose)
+    assert read_file(path)[2] == 'measurement'
+
+
+def test_single_curve_txt(tmp_path):
+    depth = np.arange(0.0, 10.0, 0.5)
+    dose = 200.0 - depth
+    path = str(tmp_path / "plan.txt")
+    write_raystation_txt(path, depth, dose)
+    parsed_depth, parsed_dose = extract_txt_data(path)
+    # 파일은 cm 단위, 결과는 mm
+    assert np.allclose(parsed_depth, depth)
+    assert np.allclose(parsed_dose, dose)
+    assert read_file(path)[2] == 'plan'
+
+
+def test_multi_curve_csv(tmp_path):
+    path = tmp_path / "multi.csv"
+    path.write_text(MULTI_CSV)
+    curves = list(iter_curves(str(path)))
+    assert [curve.index for curve in curves] == [0, 1]
+    assert curves[0].meta['Energy'] == '70.0 MeV'
+    assert curves[1].meta['Curve name'] == 'E1'
+    assert np.array_equal(curves[0].dose, [10, 20, 30])
+    assert np.array_equal(curves[1].depth, [0, 1, 2, 3])
+    # 단일 곡선 파서는 첫 곡선
+    assert np.array_equal(extract_csv_data(str(path))[1], [10, 20, 30])
+
+
+def test_multi_curve_txt(tmp_path):
+    path = tmp_path / "multi.txt"
+    path.write_text(MULTI_TXT)
+    curves = list(iter_curves(str(path)))
+    assert len(curves) == 2
+    assert np.allclose(curves[0].depth, [0.0, 1.0])
+    assert np.allclose(curves[1].dose, [50, 55, 60])
+    assert curves[1].meta['Beam'] == '2'
+
+
+def test_unsupported_extension(tmp_path):
+    path = tmp_path / "curve.dat"
+    path.write_text("1 2\n")
+    with pytest.raises(ValueError):
+        read_file(str(path))
@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from linedose import profiling
+
+
+@pytest.fixture
+def profiler():
+    profiler = profiling.enable()
+    profiler.clear()
+    yield profiler
+    profiling.disable()
+
+
+def test_disabled_stage_is_shared_noop():
+    assert profiling.get_profiler() is None
+    assert profiling.stage('parse') is profiling.stage('metrics')
+    assert profiling.file_context('a.csv') is profiling.stage('parse')
+
+
+def test_nested_stages_and_files(profiler):
+    @profiling.profiled('analyze')
+    def analyze():
+        with profiling.file_context('a.csv'):
+            with profiling.stage('parse', points=10):
+                sum(range(10000))
+            with profiling.stage('metrics'):
+                pass
+        with profiling.stage('parse', file='b.csv'):
+            pass
+
+    analyze()
+    # 안쪽 단계가 먼저 끝나므로 먼저 기록된다
+    assert [event['name'] for event in profiler.events] == ['parse', 'metrics', 'parse', 'analyze']
+    assert [event['file'] for event in profiler.events] == ['a.csv', 'a.csv', 'b.csv', None]
+    assert profiler.events[0]['args'] == {'points': 10}
+
+    summary = profiler.summary()
+    assert summary['session']['parse']['count'] == 2
+    assert set(summary['files']) == {'a.csv', 'b.csv'}
+    assert summary['files']['a.csv']['parse']['count'] == 1
+    # 표는 오래 걸린 단계부터 - 바깥 단계가 맨 위
+    lines = profiler.report().splitlines()
+    assert len(lines) == 4 and lines[1].startswith('analyze')
+
+
+def test_chrome_trace_export(profiler, tmp_path):
+    with profiling.stage('batch', files=2):
+        with profiling.file_context('a.csv'):
+            with profiling.stage('parse'):
+                pass
+            with profiling.stage('metrics'):
+                pass
+    profiler.merge([dict(profiler.events[0], pid=12345, tid=1)])
+
+    path = str(tmp_path / 'session.trace.json')
+    profiler.export(path)
+    with open(path, encoding='utf-8') as file:
+        trace = json.load(file)
+    assert trace['displayTimeUnit'] == 'ms'
+    events = trace['traceEvents']
+    assert [event['name'] for event in events] == ['parse', 'metrics', 'batch', 'parse']
+    for event in events:
+        assert set(event) == {'name', 'cat', 'ph', 'ts', 'dur', 'pid', 'tid', 'args'}
+        assert event['ph'] == 'X' and event['ts'] >= 0 and event['dur'] >= 0
+    parse, metrics, batch, merged = events
+    assert min(event['ts'] for event in events) == 0
+    assert parse['args'] == {'file': 'a.csv'} and batch['args'] == {'files': 2}
+    assert merged['pid'] == 12345
+    # 안쪽 단계는 바깥 단계 구간 안에 있고 서로 겹치지 않는다
+    end = batch['ts'] + batch['dur']
+    assert batch['ts'] <= parse['ts'] and parse['ts'] + parse['dur'] <= metrics['ts']
+    assert metrics['ts'] + metrics['dur'] <= end
+    assert parse['tid'] == batch['tid']
+
+
+def test_json_export_and_formats(profiler, tmp_path):
+    with profiling.stage('parse'):
+        pass
+    path = str(tmp_path / 'session.json')
+    profiler.export(path)
+    with open(path, encoding='utf-8') as file:
+        data = json.load(file)
+    assert set(data) == {'session', 'files', 'events'}
+    assert data['session']['parse']['count'] == 1 and len(data['events']) == 1
+    profiler.export(path, 'chrome')
+    with open(path, encoding='utf-8') as file:
+        assert 'traceEvents' in json.load(file)
+    with pytest.raises(ValueError):
+        profiler.export(path, 'csv')
+
+
+def test_memory_peaks_propagate_to_outer_stage():
+    profiler = profiling.enable(memory=True)
+    try:
+        with profiling.stage('outer'):
+            with profiling.stage('inner'):
+                block = bytearray(4 * 1024 * 1024)
+                del block
+    finally:
+        profiling.disable()
+    inner, outer = profiler.events
+    assert inner['peak_bytes'] >= 4 * 1024 * 1024
+    # 안쪽에서 해제한 메모리의 최대값도 바깥 단계에 남는다
+    assert outer['peak_bytes'] >= inner['peak_bytes']
+    assert abs(outer['alloc_bytes']) < 1024 * 1024
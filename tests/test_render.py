@@ -0,0 +1,179 @@
+import numpy as np
+import pytest
+from matplotlib.backend_bases import MouseEvent
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from linedose.analysis import normalize_dose
+from linedose.metrics import distal_depths
+from linedose.render import (POINTS_PER_PIXEL, Crosshair, CurveProbe, CurveRenderer,
+                             OverlayBlitter, decimate_minmax, format_readout)
+from linedose.synthetic import sobp_curve
+
+
+def _sobp(step=0.5):
+    depth = np.arange(0.0, 200.0, step)
+    return normalize_dose(depth, sobp_curve(depth, 150.0, 60.0))
+
+
+def _axes():
+    figure = Figure(figsize=(4, 3), dpi=100)
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+    return figure, ax
+
+
+def _event(ax, name, depth, dose, button=None):
+    x, y = ax.transData.transform((depth, dose))
+    return MouseEvent(name, ax.figure.canvas, x, y, button=button)
+
+
+@pytest.mark.parametrize('n_points', [1000, 1003, 4099])
+def test_decimate_keeps_extrema_and_endpoints(n_points):
+    rng = np.random.default_rng(n_points)
+    x = np.arange(n_points, dtype=float)
+    y = rng.standard_normal(n_points)
+    y[[17, n_points // 2]] = (50.0, -50.0)
+    n_buckets = 100
+    xs, ys = decimate_minmax(x, y, n_buckets)
+    assert xs.size <= POINTS_PER_PIXEL * (n_buckets + 1)
+    assert np.all(np.diff(xs) > 0) and np.array_equal(ys, y[xs.astype(int)])
+    assert (xs[0], xs[-1]) == (x[0], x[-1])
+    assert ys.max() == 50.0 and ys.min() == -50.0
+    # 구간마다 최소/최대 점이 남는다 (나누어 떨어지지 않는 마지막 구간 포함)
+    size = n_points // n_buckets
+    blocks = [y[i * size:(i + 1) * size] for i in range(n_buckets)] + [y[n_buckets * size:]]
+    for block in blocks:
+        if block.size:
+            assert block.max() in ys and block.min() in ys
+
+
+def test_decimate_short_input_unchanged():
+    x = np.arange(40.0)
+    y = np.sin(x)
+    xs, ys = decimate_minmax(x, y, 10)
+    assert xs is x and ys is y
+    xs, ys = decimate_minmax(x[:1], y[:1], 0)
+    assert xs.size == 1
+
+
+def test_renderer_decimates_to_view(monkeypatch):
+    figure, ax = _axes()
+    renderer = CurveRenderer(ax, lambda index: f"C{index}")
+    depth = np.linspace(0.0, 200.0, 100001)
+    dose = np.sin(depth)
+    dose[50000] = 5.0
+    line = renderer.set_curve('a', depth, dose, label='a.csv')
+    width = int(ax.bbox.width)
+    assert len(line.get_xdata()) <= POINTS_PER_PIXEL * (width + 1)
+    assert max(line.get_ydata()) == 5.0 and line.get_color() == 'C0'
+
+    # 같은 배열이면 다시 설정하지 않고, 확대하면 보이는 범위만 다시 줄인다
+    monkeypatch.setattr(line, 'set_data', lambda *args: pytest.fail('set_data'))
+    assert renderer.set_curve('a', depth, dose) is line
+    monkeypatch.undo()
+    ax.set_xlim(99.0, 101.0)
+    shown = np.asarray(line.get_xdata())
+    assert shown[0] < 99.0 < 101.0 < shown[-1] and shown[-1] - shown[0] < 3.0
+    assert max(line.get_ydata()) == 5.0
+
+    renderer.set_curve('b', depth[:50], dose[:50])
+    renderer.draw()
+    assert [text.get_text() for text in ax.get_legend().get_texts()] == ['a.csv', 'b']
+    renderer.sync({'b': (depth[:50], dose[:50], {})})
+    assert renderer.keys() == ['b'] and line not in ax.lines
+
+
+def test_probe_dose_at_and_edges():
+    probe = CurveProbe()
+    # 정렬되지 않은 입력도 깊이 순으로 준비
+    probe.set_curve('a', [3.0, 0.0, 1.0, 2.0], [40.0, 10.0, 20.0, 30.0])
+    probe.set_curve('short', [1.0], [50.0])
+    assert probe.dose_at(1.5) == {'a': 25.0, 'short': pytest.approx(np.nan, nan_ok=True)}
+    # 데이터 양 끝에서는 끝 점 값, 바깥은 NaN
+    assert probe.dose_at(0.0)['a'] == 10.0 and probe.dose_at(3.0)['a'] == 40.0
+    assert probe.dose_at(2.0)['a'] == 30.0
+    assert np.isnan(probe.dose_at(-1e-9)['a']) and np.isnan(probe.dose_at(3.0 + 1e-9)['a'])
+
+
+def test_probe_matches_numpy_and_metrics():
+    depth, dose = _sobp(0.7)
+    probe = CurveProbe()
+    probe.set_curve('sobp', depth, dose)
+    for x in np.linspace(depth[0], depth[-1], 97):
+        assert probe.dose_at(x)['sobp'] == pytest.approx(np.interp(x, depth, dose))
+    for level in (99.0, 90.0, 50.0, 10.0):
+        assert probe.depth_at(level)['sobp'] == pytest.approx(
+            float(distal_depths(depth, dose, [level])[0]))
+    # 최대값보다 높거나 마지막 점보다 낮은 레벨에는 distal 교차점이 없다
+    assert np.isnan(probe.depth_at(dose.max() + 1.0)['sobp'])
+    assert np.isnan(probe.depth_at(dose[-1] - 1.0)['sobp'])
+
+
+def test_probe_sync_reuses_prepared_curves():
+    depth, dose = _sobp()
+    probe = CurveProbe()
+    probe.sync({'a': (depth, dose), 'b': (depth, 2 * dose)})
+    prepared = probe._curves['a']
+    probe.sync({'a': (depth, dose)})
+    assert probe.keys() == ['a'] and probe._curves['a'] is prepared
+    probe.sync({'a': (depth, dose[::-1])})
+    assert probe._curves['a'] is not prepared
+
+
+def test_blitter_saves_background_on_draw(monkeypatch):
+    figure, ax = _axes()
+    blitter = OverlayBlitter(figure.canvas)
+    line, = ax.plot([0.0, 1.0], [0.0, 1.0])
+    blitter.add_artist(line)
+    assert line.get_animated()
+    # 처음 그리기 전에는 배경이 없으므로 전체 다시 그리기를 예약
+    idle = []
+    monkeypatch.setattr(figure.canvas, 'draw_idle', lambda: idle.append(True))
+    blitter.update()
+    assert idle and blitter._background is None
+    figure.canvas.draw()
+    assert blitter._background is not None
+    before = np.asarray(figure.canvas.buffer_rgba()).copy()
+    line.set_ydata([1.0, 0.0])
+    blitter.update()
+    assert not np.array_equal(before, np.asarray(figure.canvas.buffer_rgba()))
+    blitter.remove_artist(line)
+    assert line not in ax.lines
+
+
+def test_crosshair_readout_and_fixed_level():
+    figure, ax = _axes()
+    depth, dose = _sobp()
+    ax.plot(depth, dose)
+    ax.set_xlim(0.0, 200.0)
+    ax.set_ylim(0.0, 110.0)
+    blitter = OverlayBlitter(figure.canvas)
+    calls = []
+    crosshair = Crosshair(ax, blitter, callback=lambda *args: calls.append(args))
+    crosshair.set_curves({'m': (depth, dose, 'measured.csv')})
+    figure.canvas.draw()
+
+    crosshair.on_move(_event(ax, 'motion_notify_event', 100.0, 50.0))
+    x, level, rows = calls[-1]
+    assert x == pytest.approx(100.0) and level == pytest.approx(50.0)
+    assert rows == [('measured.csv', pytest.approx(np.interp(x, depth, dose)),
+                     pytest.approx(float(distal_depths(depth, dose, [level])[0])))]
+    assert crosshair.vline.get_visible()
+
+    # 타이머가 돌기 전의 이동은 모아 두었다가 한 번만 그린다
+    crosshair.on_move(_event(ax, 'motion_notify_event', 120.0, 80.0))
+    crosshair.on_move(_event(ax, 'motion_notify_event', 130.0, 80.0))
+    assert len(calls) == 1
+    crosshair._on_timer()
+    assert len(calls) == 2 and calls[-1][0] == pytest.approx(130.0)
+
+    crosshair.on_click(_event(ax, 'button_press_event', 130.0, 90.0, button=1))
+    assert crosshair.level == pytest.approx(90.0)
+    crosshair._on_timer()
+    crosshair.on_move(_event(ax, 'motion_notify_event', 60.0, 20.0))
+    assert calls[-1][1] == pytest.approx(90.0)
+    assert 'fixed' in format_readout(*calls[-1], fixed=True)
+
+    crosshair.on_leave(None)
+    assert calls[-1] == (None, None, []) and not crosshair.vline.get_visible()
@@ -0,0 +1,101 @@
+import os
+
+import numpy as np
+import pytest
+
+from linedose.analysis import load_curve
+from linedose.pairs import GAMMA_ROW
+from linedose.report import (REPORT_ROWS, ReportRenderer, render_pair, render_reports,
+                             table_values)
+from linedose.synthetic import generate_dataset, write_zebra_csv
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+@pytest.fixture
+def pair(tmp_path):
+    return generate_dataset(str(tmp_path / 'data'), 1, noise=0.0)[0]
+
+
+def _curve(path):
+    depth, dose, _ = load_curve(path)
+    return os.path.basename(path), depth, dose, {}
+
+
+def test_table_values(pair, capsys):
+    plan, measured = (_curve(path) for path in pair)
+    plan_values, measured_values = table_values(plan, measured)
+    assert set(plan_values) == set(REPORT_ROWS)
+    assert set(measured_values) == set(REPORT_ROWS) - {GAMMA_ROW}
+    assert plan_values['file'] == 'plan_00000.txt'
+    assert plan_values['D90'].endswith(' mm') and float(plan_values['D90'][:-3]) > 0
+    assert 0.0 <= float(plan_values[GAMMA_ROW][:-2]) <= 100.0
+    # 한쪽만 있으면 감마 없이 그 열만
+    assert table_values(None, measured) == ({}, measured_values)
+
+
+def test_table_values_errors_are_returned(pair, capsys):
+    plan = _curve(pair[0])
+    depth = np.arange(0.0, 100.0, 0.5)
+    flat = ('flat.csv', depth, np.ones_like(depth), {})
+    plan_values, measured_values = table_values(plan, flat)
+    assert 'D90' not in measured_values
+    assert measured_values['error'].startswith('flat.csv: ValueError: D90')
+    assert 'error' not in plan_values and GAMMA_ROW in plan_values
+
+    single = ('single.txt', depth[:1], depth[:1], {})
+    plan_values, _ = table_values(single, flat)
+    assert plan_values['error'].startswith('single.txt: ValueError')
+    assert f"; {GAMMA_ROW}: ValueError" in plan_values['error']
+    # 라이브러리는 표준 출력에 쓰지 않는다
+    assert capsys.readouterr().out == ''
+
+
+def test_renderer_reuses_figure(tmp_path, pair):
+    renderer = ReportRenderer(figsize=(4, 5), dpi=50)
+    plan, measured = (_curve(path) for path in pair)
+    plan_values, measured_values = table_values(plan, measured)
+    curves = [(plan[0], plan[1], plan[2], 'plan'), (measured[0], measured[1], measured[2], 'measurement')]
+    outputs = [str(tmp_path / 'a.png'), str(tmp_path / 'a.pdf')]
+    renderer.render(outputs, curves, plan_values, measured_values, 'a / b')
+    with open(outputs[0], 'rb') as file:
+        assert file.read(8) == PNG_SIGNATURE
+    with open(outputs[1], 'rb') as file:
+        assert file.read(5) == b'%PDF-'
+    lines = renderer.ax.get_lines()
+    assert [line.get_linestyle() for line in lines] == ['-', '--']
+    d90 = REPORT_ROWS.index('D90') + 1
+    assert renderer.table[d90, 1].get_text().get_text() == plan_values['D90']
+
+    # 곡선이 줄면 남는 선은 숨기고, 긴 파일 이름은 앞부분을 줄인다
+    name = 'x' * 60 + '.csv'
+    renderer.render([str(tmp_path / 'b.png')], curves[1:], {}, {'file': name}, 'b')
+    assert renderer.ax.get_lines() == lines
+    assert [line.get_visible() for line in lines] == [True, False]
+    text = renderer.table[1, 2].get_text().get_text()
+    assert len(text) == 40 and text.startswith('...') and text.endswith('.csv')
+    assert renderer.table[d90, 1].get_text().get_text() == ''
+    assert renderer.title.get_text() == 'b'
+
+
+def test_render_pair_keeps_report_with_errors(tmp_path, pair):
+    depth = np.arange(0.0, 100.0, 0.5)
+    flat = str(tmp_path / 'data' / 'measured_00000.csv')
+    write_zebra_csv(flat, depth, np.ones_like(depth))
+    row = render_pair(pair, str(tmp_path))
+    assert row['reports'] == str(tmp_path / 'plan_00000.png')
+    assert os.path.exists(row['reports'])
+    assert row['error'].startswith('measured_00000.csv: ValueError')
+
+    row = render_pair((None, str(tmp_path / 'missing.csv')), str(tmp_path))
+    assert row['reports'] == '' and row['error'].startswith('FileNotFoundError')
+
+
+def test_render_reports_numbers_duplicate_names(tmp_path, pair):
+    other = generate_dataset(str(tmp_path / 'other'), 1, noise=0.0)[0]
+    rows = render_reports([pair, other], str(tmp_path / 'out'), workers=1)
+    assert [os.path.basename(row['reports']) for row in rows] == ['plan_00000.png',
+                                                                 'plan_00000_2.png']
+    assert [row['error'] for row in rows] == ['', '']
+    with pytest.raises(ValueError):
+        render_reports([pair], str(tmp_path / 'out'), formats=('svg',))
@@ -0,0 +1,89 @@
+import numpy as np
+
+from linedose.loader import load_entries
+from linedose.parsers import iter_curves, read_meta
+from linedose.results import NO_CURVES, ResultsDB
+from linedose.synthetic import generate_dataset
+
+MULTI_CSV = """Device: ZEBRA-01
+Date: 2024-05-02 10:00:00
+
+Energy: 150 MeV
+Curve depth: [mm]
+0;1;2
+Curve gains: [counts]
+1;2;3
+
+"""
+
+
+def test_read_meta_matches_first_curve(tmp_path):
+    path = tmp_path / 'multi.csv'
+    path.write_text(MULTI_CSV)
+    assert read_meta(str(path)) == next(iter_curves(str(path))).meta
+    assert read_meta(str(path))['Energy'] == '150 MeV'
+
+
+def test_add_uses_given_hash_and_meta_without_reading(tmp_path):
+    # 파일이 없어도 저장된다 (GUI 는 작업자에서 구한 값을 넘김)
+    row = {'path': str(tmp_path / 'gone.csv'), 'kind': 'measurement', 'content_hash': 'abc',
+           'meta': {'Energy': '150 MeV', 'Device': 'Z1', 'Date': '2024-05-02'}, 'D90': 150.0}
+    with ResultsDB(':memory:') as db:
+        assert db.add([row]) == 1
+        assert db.trend('D90') == [('2024-05-02 00:00:00', 150.0, 150.0, 'Z1', 'gone.csv')]
+
+
+def test_failed_rows_are_retried_and_replaced():
+    failed = {'path': 'a.csv', 'kind': 'measurement', 'content_hash': 'h1', 'meta': {},
+              'error': 'ValueError: bad'}
+    with ResultsDB(':memory:') as db:
+        db.add([failed])
+        assert db.known_hashes(['h1']) == set()
+        fixed = dict(failed, error='', D90=100.0)
+        assert db.add([fixed]) == 1
+        assert db.known_hashes(['h1']) == {'h1'}
+        assert len(db) == 1
+        # 성공한 행은 덮어쓰지 않는다
+        db.add([dict(fixed, D90=1.0)])
+        assert [value for _, value, *_ in db.trend('D90')] == [100.0]
+
+
+def test_ingest_marks_files_without_curves_known(tmp_path):
+    empty = tmp_path / 'empty.csv'
+    empty.write_text("Zebra;nothing here\n")
+    plan, measured = generate_dataset(str(tmp_path / 'data'), 1)[0]
+    with ResultsDB(':memory:') as db:
+        assert db.ingest([str(empty), plan, measured], workers=1) == (3, 0)
+        assert db.ingest([str(empty), plan, measured], workers=1) == (0, 3)
+        errors = db.connection.execute("SELECT error FROM results WHERE file = 'empty.csv'")
+        assert errors.fetchall() == [(NO_CURVES,)]
+
+
+def test_loader_describes_entries(tmp_path):
+    paths = list(generate_dataset(str(tmp_path / 'data'), 1)[0])
+    entries = load_entries(paths, describe=True)
+    with ResultsDB(':memory:') as db:
+        rows = [dict(entry['metrics'], path=entry['path'], kind=entry['kind'],
+                     content_hash=entry['content_hash'], meta=entry['meta']) for entry in entries]
+        assert db.add(rows) == 2
+        assert db.known_hashes([entry['content_hash'] for entry in entries]) \
+            == {entry['content_hash'] for entry in entries}
+    assert all(np.isfinite(entry['metrics']['D90']) for entry in entries)
+
+
+def test_rows_of_unreadable_files_are_skipped(tmp_path):
+    missing = str(tmp_path / 'missing.csv')
+    with ResultsDB(':memory:') as db:
+        assert db.add([{'path': missing, 'kind': '', 'error': 'FileNotFoundError: x'}]) == 0
+        plan, measured = generate_dataset(str(tmp_path / 'data'), 1)[0]
+        # 읽을 수 없는 파일은 ingest 를 멈추지 않고 건너뛴 파일로 센다
+        assert db.ingest([missing, plan, measured], workers=1) == (2, 1)
+
+
+def test_batch_db_with_missing_file(tmp_path):
+    from linedose.batch import main
+    db_path = str(tmp_path / 'results.sqlite')
+    assert main(['-j', '1', '-q', '-o', str(tmp_path / 'out.csv'), '--db', db_path,
+                 str(tmp_path / 'missing.csv')]) == 2
+    with ResultsDB(db_path) as db:
+        assert len(db) == 0
@@ -0,0 +1,111 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from linedose import service as service_module
+from linedose.service import AnalysisService, ServiceBusy, make_server
+from linedose.synthetic import generate_dataset
+
+
+@pytest.fixture
+def pair(tmp_path):
+    plan, measured = generate_dataset(str(tmp_path / 'data'), 1, noise=0.0)[0]
+    with open(plan, 'rb') as file:
+        plan_data = file.read()
+    with open(measured, 'rb') as file:
+        measured_data = file.read()
+    return plan_data, measured_data
+
+
+@pytest.fixture
+def serve():
+    started = []
+
+    def start(**options):
+        options.setdefault('use_processes', False)
+        options.setdefault('workers', 1)
+        service = AnalysisService(**options)
+        server = make_server(service, port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        started.append((server, service))
+        return service, 'http://127.0.0.1:%d' % server.server_address[1]
+
+    yield start
+    for server, service in started:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+
+def _post(url, data, **params):
+    query = '&'.join(f"{key}={value}" for key, value in params.items())
+    request = urllib.request.Request(f"{url}?{query}", data=data, method='POST')
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_requests_are_batched(pair):
+    service = AnalysisService(workers=1, use_processes=False, batch_wait=0.5)
+    try:
+        futures = [service.submit_content(f"m{i}.csv", pair[1] + b' ' * i) for i in range(4)]
+        futures.append(service.submit_content('p.txt', pair[0]))
+        entries = [future.result(10) for future in futures]
+    finally:
+        service.close()
+    assert [entry['error'] for entry in entries] == [''] * 5
+    assert [entry['kind'] for entry in entries] == ['measurement'] * 4 + ['plan']
+    assert service.stats['batches'] == 1
+
+
+def test_same_content_uses_cache_per_extension(pair):
+    service = AnalysisService(workers=1, use_processes=False)
+    try:
+        first = service.submit_content('a.csv', pair[1]).result(10)
+        again = service.submit_content('b.csv', pair[1]).result(10)
+        # 같은 내용이라도 확장자가 다르면 다른 파서로 다시 읽는다
+        other = service.submit_content('b.txt', pair[1]).result(10)
+    finally:
+        service.close()
+    assert again is first and service.stats['cache_hits'] == 1
+    assert other is not first and other.get('kind') != 'measurement'
+
+
+def test_upload_and_errors(serve, pair, monkeypatch):
+    service, url = serve()
+    status, data = _post(url + '/upload', pair[1], name='m.csv', curves=0)
+    assert status == 200 and data['kind'] == 'measurement' and 'depth' not in data
+    assert data['metrics']['D90'] > 0
+
+    status, data = _post(url + '/upload', pair[1], name='m.xyz')
+    assert status == 400
+
+    monkeypatch.setattr(service_module, 'MAX_BODY_BYTES', 10)
+    status, data = _post(url + '/upload', pair[1], name='m.csv')
+    assert status == 413
+
+
+def test_busy_and_timeout(serve, pair, monkeypatch):
+    service, url = serve(max_pending=1, batch_wait=2.0, batch_size=16)
+    monkeypatch.setattr(service_module, 'REQUEST_TIMEOUT', 0.2)
+    # 첫 파일은 batch_wait 동안 기다리므로 시간 초과 (504), 그동안 다른 파일은 503
+    results = {}
+    thread = threading.Thread(
+        target=lambda: results.update(first=_post(url + '/upload', pair[1], name='a.csv')))
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not service.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with pytest.raises(ServiceBusy):
+        service.submit_content('b.txt', pair[0])
+    status, data = _post(url + '/upload', pair[0], name='b.txt')
+    assert status == 503
+    thread.join()
+    assert results['first'][0] == 504
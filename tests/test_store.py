@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from linedose.store import CurveStore
+
+
+def _curve(n, scale=1.0):
+    depth = np.linspace(0.0, 100.0, n)
+    return depth, scale * np.sin(depth / 30.0)
+
+
+def _filled(count=5, dtype=np.float64):
+    store = CurveStore(dtype=dtype)
+    for i in range(count):
+        store.add(f"/data/{i}/curve.csv", *_curve(10 + i, scale=i + 1), 'measurement',
+                  metrics={'D90': 100.0 + i})
+    return store
+
+
+def _assert_same(store, other):
+    assert other.keys() == store.keys()
+    for key in store:
+        for a, b in zip(store.curve(key), other.curve(key)):
+            assert np.array_equal(a, b)
+        assert other.meta(key) == store.meta(key)
+        assert other.metrics(key) == store.metrics(key)
+
+
+def test_add_and_views():
+    store = _filled()
+    assert len(store) == 5
+    assert store.points == sum(10 + i for i in range(5))
+    depth, dose = store.curve('/data/2/curve.csv')
+    assert np.array_equal(depth, _curve(12)[0])
+    assert store.meta('/data/2/curve.csv').modality == 'Zebra/IBA'
+    # 같은 파일 이름이면 상위 폴더를 붙여 표시
+    assert store.display_name('/data/2/curve.csv') == '2/curve.csv'
+    with pytest.raises(ValueError):
+        store.add('bad', np.arange(3.0), np.arange(4.0), 'plan')
+
+
+def test_remove_keeps_views_and_order():
+    store = _filled()
+    view = store.curve('/data/3/curve.csv')
+    expected = [array.copy() for array in view]
+    store.remove('/data/1/curve.csv')
+    assert store.keys() == [f"/data/{i}/curve.csv" for i in (0, 2, 3, 4)]
+    assert store.index('/data/3/curve.csv') == 2
+    for old, new, value in zip(view, store.curve('/data/3/curve.csv'), expected):
+        assert np.array_equal(old, value) and np.array_equal(new, value)
+    assert store.points == sum(10 + i for i in (0, 2, 3, 4))
+
+
+def test_replace_in_place():
+    store = _filled()
+    old = store.curve('/data/1/curve.csv')[1].copy()
+    store.add('/data/1/curve.csv', *_curve(30, scale=-1.0), 'measurement')
+    assert store.keys()[1] == '/data/1/curve.csv'
+    assert store.curve('/data/1/curve.csv')[0].size == 30
+    assert store.metrics('/data/1/curve.csv') == {}
+    assert not np.array_equal(store.curve('/data/1/curve.csv')[1][:old.size], old)
+
+
+def test_removing_many_compacts_rarely(monkeypatch):
+    store = _filled(200)
+    calls = []
+    compact = store._compact
+    monkeypatch.setattr(store, '_compact', lambda capacity: calls.append(capacity) or compact(capacity))
+    for key in store.keys()[:199]:
+        store.remove(key)
+    # 하나씩 지울 때마다가 아니라 빈 영역이 남은 곡선보다 많아질 때만 모은다
+    assert len(calls) < 20
+    assert store.keys() == ['/data/199/curve.csv']
+    assert np.array_equal(store.curve('/data/199/curve.csv')[1], _curve(209, scale=200)[1])
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_save_load_round_trip(tmp_path, mmap, dtype):
+    store = _filled(dtype=dtype)
+    store.remove('/data/0/curve.csv')
+    store.add('/data/2/curve.csv', *_curve(7), 'plan', metrics={'D50': 1.5})
+    path = str(tmp_path / 'session.lds')
+    store.save(path)
+
+    loaded = CurveStore.load(path, mmap=mmap)
+    assert loaded.dtype == np.dtype(dtype)
+    _assert_same(store, loaded)
+    if mmap:
+        assert isinstance(loaded.curve('/data/2/curve.csv')[0], np.memmap)
+
+    # 불러온 (읽기 전용) 버퍼 위에 추가/삭제 후 다시 저장
+    loaded.add('/data/new/curve.csv', *_curve(5), 'plan')
+    loaded.remove('/data/3/curve.csv')
+    store.add('/data/new/curve.csv', *_curve(5), 'plan')
+    store.remove('/data/3/curve.csv')
+    _assert_same(store, loaded)
+    loaded.save(str(tmp_path / 'again.lds'))
+    _assert_same(store, CurveStore.load(str(tmp_path / 'again.lds')))
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / 'other.lds'
+    path.write_bytes(b'NOPE' + b'\0' * 16)
+    with pytest.raises(ValueError):
+        CurveStore.load(str(path))
@@ -0,0 +1,162 @@
+import numpy as np
+
+from linedose.analysis import compute_metrics, normalize_dose
+from linedose.pairs import GAMMA_ROW
+from linedose.store import CurveStore
+from linedose.synthetic import sobp_curve
+from linedose.table import (MIN_COLUMN_WIDTH, ComparisonTable, VirtualTable, _sort_value,
+                            match_plans)
+
+
+class FakeTree:
+    """Treeview 대신 항목 값과 호출 수만 기억"""
+
+    def __init__(self):
+        self.items = {}
+        self.selected = ()
+        self.writes = 0
+        self.widths = {}
+
+    def heading(self, column, **options):
+        pass
+
+    def bind(self, sequence, func):
+        pass
+
+    def insert(self, parent, index):
+        item = f"I{len(self.items)}"
+        self.items[item] = ()
+        return item
+
+    def delete(self, item):
+        del self.items[item]
+
+    def item(self, item, values, tags):
+        self.items[item] = tuple(values)
+        self.writes += 1
+
+    def column(self, column, width, **options):
+        self.widths[column] = width
+
+    def selection(self):
+        return self.selected
+
+    def selection_set(self, items):
+        self.selected = tuple(items)
+
+
+class FakeScrollbar:
+    def config(self, **options):
+        pass
+
+    def set(self, first, last):
+        self.view = (first, last)
+
+
+class Event:
+    def __init__(self, height):
+        self.height = height
+
+
+def _add(store, path, range_mm, kind):
+    depth = np.arange(0.0, 250.0, 0.5)
+    depth, dose = normalize_dose(depth, sobp_curve(depth, range_mm, 60.0))
+    store.add(path, depth, dose, kind, metrics=compute_metrics(depth, dose))
+
+
+def _store():
+    store = CurveStore()
+    _add(store, '/qa/plan_001.txt', 150.0, 'plan')
+    _add(store, '/qa/measured_001.csv', 151.0, 'measurement')
+    _add(store, '/qa/plan_002.txt', 120.0, 'plan')
+    _add(store, '/qa/measured_002.csv', 120.0, 'measurement')
+    _add(store, '/other/m.csv', 100.0, 'measurement')
+    return store
+
+
+def test_match_plans():
+    store = _store()
+    assert match_plans(store) == {'/qa/measured_001.csv': '/qa/plan_001.txt',
+                                  '/qa/measured_002.csv': '/qa/plan_002.txt',
+                                  '/other/m.csv': None}
+    # 계획이 하나뿐이면 이름이 달라도 그 계획과 짝짓는다
+    store.remove('/qa/plan_002.txt')
+    assert match_plans(store)['/other/m.csv'] == '/qa/plan_001.txt'
+
+
+def test_sort_value_order():
+    values = ['', 'b', '10.5', '-2', 'a', '99.0 %', '3']
+    assert sorted(values, key=_sort_value) == ['-2', '3', '10.5', '99.0 %', 'a', 'b', '']
+
+
+def test_update_is_incremental():
+    store = _store()
+    table = ComparisonTable()
+    added, changed, removed = table.update(store)
+    assert added == store.keys() and not changed and not removed
+    row = dict(zip(table.columns, table.rows['/qa/measured_001.csv']))
+    assert row['plan'] == 'plan_001.txt' and row['type'] == 'measurement'
+    assert float(row['ΔD90']) > 0.5
+    assert row[GAMMA_ROW].endswith('%')
+    assert dict(zip(table.columns, table.rows['/other/m.csv']))['plan'] == ''
+
+    assert table.update(store) == ([], [], [])
+    # 계획을 바꾸면 그 계획과 짝지은 측정 행도 다시 계산
+    _add(store, '/qa/plan_001.txt', 151.0, 'plan')
+    assert table.update(store) == ([], ['/qa/plan_001.txt', '/qa/measured_001.csv'], [])
+    store.remove('/other/m.csv')
+    assert table.update(store) == ([], [], ['/other/m.csv'])
+    assert table.keys == store.keys() and set(table.rows) == set(store.keys())
+
+
+def test_sort_and_widths():
+    store = _store()
+    table = ComparisonTable()
+    table.update(store)
+    table.sort_by('D90')
+    d90 = [float(table.rows[key][table.columns.index('D90')]) for key in table.keys]
+    assert d90 == sorted(d90)
+    # 같은 열을 다시 누르면 역순
+    table.sort_by('D90')
+    assert [float(table.rows[key][table.columns.index('D90')]) for key in table.keys] == d90[::-1]
+
+    def expected():
+        return {column: max(MIN_COLUMN_WIDTH, int(max(
+            [len(column)] + [len(table.rows[key][i]) for key in table.keys]) * 8 * 1.2))
+            for i, column in enumerate(table.columns)}
+    assert table.widths() == expected()
+    _add(store, '/qa/a_very_long_measurement_file_name_0001.csv', 130.0, 'measurement')
+    table.update(store)
+    assert table.widths() == expected()
+    store.remove('/qa/a_very_long_measurement_file_name_0001.csv')
+    table.update(store)
+    assert table.widths() == expected()
+
+
+def test_virtual_table_shows_only_visible_rows():
+    store = CurveStore()
+    for i in range(50):
+        _add(store, f"/qa/m{i:03d}.csv", 100.0 + i, 'measurement')
+    table = ComparisonTable()
+    table.update(store)
+    tree = FakeTree()
+    view = VirtualTable(tree, FakeScrollbar(), table, row_height=25)
+    view.on_resize(Event(25 * 11))
+    assert len(tree.items) == 10
+    assert [values[0] for values in tree.items.values()] == [f"m{i:03d}.csv" for i in range(10)]
+
+    writes = tree.writes
+    view.refresh()
+    assert tree.writes == writes
+
+    # 선택은 행 키로 기억 - 스크롤해도 유지
+    tree.selected = ('I2',)
+    view.on_select()
+    assert view.selected_keys() == ['/qa/m002.csv']
+    view.scroll(20)
+    assert tree.selected == () and view.selected_keys() == ['/qa/m002.csv']
+    assert [values[0] for values in tree.items.values()][0] == 'm020.csv'
+    view.scroll(-20)
+    assert tree.selected == ('I2',)
+    view.scroll(1000)
+    assert view.first == 40
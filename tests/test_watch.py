@@ -0,0 +1,61 @@
+import os
+
+from linedose.synthetic import generate_dataset
+from linedose.watch import FolderWatcher
+
+
+def _halves(path):
+    with open(path, 'rb') as file:
+        data = file.read()
+    return data[:len(data) // 2], data[len(data) // 2:]
+
+
+def test_partial_write_fires_once_after_settle(tmp_path):
+    measured = generate_dataset(str(tmp_path / 'source'), 1, noise=0.0)[0][1]
+    first, second = _halves(measured)
+    folder = tmp_path / 'watch'
+    folder.mkdir()
+    watcher = FolderWatcher(str(folder), settle=2.0)
+    path = str(folder / 'measured.csv')
+
+    with open(path, 'wb') as file:
+        file.write(first)
+    assert watcher.poll(now=0.0) == [] and watcher.pending == 1
+    # 쓰는 도중에 바뀌면 settle 시간을 다시 센다
+    with open(path, 'ab') as file:
+        file.write(second)
+    assert watcher.poll(now=1.5) == []
+    assert watcher.poll(now=3.4) == []
+    events = [watcher.poll(now=now) for now in (3.5, 4.0, 10.0)]
+    assert events == [[path], [], []] and watcher.pending == 0
+
+    # 다시 바뀌면 한 번 더
+    with open(path, 'ab') as file:
+        file.write(b'\n')
+    assert watcher.poll(now=11.0) == [] and watcher.poll(now=13.0) == [path]
+
+
+def test_existing_and_ignored_files(tmp_path):
+    (tmp_path / 'old.csv').write_text('1,2\n')
+    (tmp_path / 'sub').mkdir()
+    watcher = FolderWatcher(str(tmp_path), settle=0.0)
+    (tmp_path / 'notes.md').write_text('not data')
+    (tmp_path / 'empty.txt').write_bytes(b'')
+    (tmp_path / 'sub' / 'deep.csv').write_text('1,2\n')
+    # 이미 있던 파일, 지원하지 않는 확장자, 빈 파일, 하위 폴더 (recursive 아님) 는 제외
+    assert watcher.poll(now=0.0) == [] and watcher.poll(now=1.0) == []
+    assert watcher.pending == 1
+
+    old = str(tmp_path / 'old.csv')
+    assert FolderWatcher(str(tmp_path), settle=1.0, include_existing=True).poll() == [old]
+    recursive = FolderWatcher(str(tmp_path), recursive=True, settle=0.0)
+    (tmp_path / 'sub' / 'new.csv').write_text('3,4\n')
+    recursive.poll(now=0.0)
+    assert recursive.poll(now=0.0) == [str(tmp_path / 'sub' / 'new.csv')]
+
+    # 지웠다가 같은 이름으로 다시 생기면 새 파일
+    os.remove(old)
+    assert watcher.poll(now=2.0) == []
+    (tmp_path / 'old.csv').write_text('1,2\n')
+    watcher.poll(now=3.0)
+    assert watcher.poll(now=3.0) == [old]